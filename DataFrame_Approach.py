@@ -11,10 +11,16 @@
 # Generic Imports
 import pandas as pd
 import numpy as np
+import concurrent.futures
+import collections
+import functools
 # Unique imports
 import common_functions as common
 import data_comparison as comparison
-import collections
+import output_formats as output
+import data_validation as validation
+import gsp_hierarchy
+import stage_profiler
 
 # GLOBAL constants
 # Target filename to use
@@ -22,6 +28,14 @@ FILE_NAME_INPUT = common.excel_file_names.FILE_NAME_INPUT
 #FILE_NAME_OUTPUT = 'Processed Load Estimates_p_non_modified.xlsx'
 FILE_PTH_INPUT = common.get_local_file_path(file_name=FILE_NAME_INPUT)
 #FILE_PTH_OUTPUT = common.get_local_file_path(file_name=FILE_NAME_OUTPUT)
+# Format used to write the processed DataFrames (see output_formats.OutputFormat)
+OUTPUT_FORMAT = output.OUTPUT_FORMAT
+# If True the time used by each stage is recorded and written to a JSON and CSV report, with PROFILE_MEMORY also True
+# the peak memory is traced as well (which slows the stages so the times are from a separate run without it) and
+# with PROFILE_CPROFILE also True each stage is run under cProfile as well
+PROFILE_STAGES = False
+PROFILE_MEMORY = False
+PROFILE_CPROFILE = False
 
 
 # Functions
@@ -35,27 +49,86 @@ def assign_gsp(df_raw):
     # TODO: Potential risk here if the GSP name box is empty then an error will occur
     # Only forward fills where the GSP row has been identified by the sub_gsp column
     # k=df_raw[common.Headers.gsp] = df_raw[common.Headers.gsp].ffill()
-    df_raw[common.Headers.gsp] = df_raw[common.Headers.gsp].where(df_raw[common.Headers.sub_gsp] == True).ffill()
+    hierarchy = gsp_hierarchy.GspHierarchy.from_dataframe(df_raw=df_raw)
+    gsp_names = df_raw[common.Headers.gsp].iloc[hierarchy.gsp_positions].ffill().values
+    df_raw[common.Headers.gsp] = hierarchy.broadcast(gsp_values=gsp_names)
 
     return df_raw
 
 
-def determine_gsp_primary_flag(df_raw):
+def gsp_rows(df_raw):
     """
-		Determines whether a row contains GSP or Primary substation data
+		Function returns True for each row of the raw load estimate which contains GSP substation data
 	:param pd.DataFrame df_raw:
-	:return pd.DataFrame df:
+	:return pd.Series idx:
 	"""
-
     # If no entry in Name but an entry in GSP then assume GSP substation
     # TODO: There may be situations where this rule is not true
-    # The following line determines all the rows for which this is True
     idx = (
             df_raw[common.Headers.name].isna() &  # Confirm that no Primary substation name entry exists
             ~df_raw[common.Headers.gsp].isna() &  # Confirm that a GSP name entry exists
             ~df_raw[common.Headers.voltage].isna()  # Confirm that a voltage ratio for the substation exists
         # TODO: Checking the voltage ratio may not be reliable
     )
+
+    return idx
+
+
+def gsp_block_ids(df_raw):
+    """
+		Function numbers the GSP blocks of the raw load estimate, a block is a GSP row and all of the rows below it up
+		to the next GSP.  Any rows before the first GSP are block 0 and the first GSP is block 1.
+	:param pd.DataFrame df_raw:
+	:return np.ndarray block_ids:  Block number of each row
+	"""
+    return np.cumsum(gsp_rows(df_raw=df_raw).values)
+
+
+def independent_block_ids(df_raw, per_year=False):
+    """
+		Function numbers groups of GSP blocks which give the same result when processed on their own as when the whole
+		load estimate is processed.  A block is kept with the block before it if its GSP has no aggregate demand, since
+		the GSP then takes the diversity factor of the GSP before it (see diversity_factors), or if the last row of the
+		block before is a GSP or Primary, since the aggregate demand and bus percentages are read from the row below.
+	:param pd.DataFrame df_raw:  Raw load estimate
+	:param bool per_year:  (optional) If True then the aggregate demand of every forecast year is needed, otherwise only
+							the first forecast year is used (see diversity_factors)
+	:return np.ndarray group_ids:  Group number of each row, increasing down the load estimate
+	"""
+    block_ids = gsp_block_ids(df_raw=df_raw)
+    if len(block_ids) == 0:
+        return block_ids
+    is_gsp = gsp_rows(df_raw=df_raw).values
+    is_primary = (
+            df_raw[common.Headers.name].notna() & df_raw[common.Headers.gsp].isna() &
+            df_raw[common.Headers.nrn].notna()).values
+
+    # Aggregate demand read from the row below each GSP in the same way as extract_aggregate_demand
+    layout = common.column_layout(df_raw=df_raw)
+    year_positions = layout.positions('forecast_years')
+    if not per_year:
+        year_positions = year_positions[:1]
+    aggregate_below = df_raw.iloc[:, year_positions].shift(-1).apply(
+        pd.to_numeric, errors='coerce').values.astype(float)
+    no_aggregate = is_gsp & np.isnan(aggregate_below).any(axis=1)
+
+    starts = np.flatnonzero(np.r_[True, block_ids[1:] != block_ids[:-1]])
+    previous_reads_below = np.r_[False, (is_gsp | is_primary)[starts[1:] - 1]]
+    new_group = ~(no_aggregate[starts] | previous_reads_below)
+    new_group[0] = True
+
+    return np.repeat(np.cumsum(new_group) - 1, np.diff(np.r_[starts, len(block_ids)]))
+
+
+def determine_gsp_primary_flag(df_raw):
+    """
+		Determines whether a row contains GSP or Primary substation data
+	:param pd.DataFrame df_raw:
+	:return pd.DataFrame df:
+	"""
+
+    # The following line determines all the rows which are GSPs
+    idx = gsp_rows(df_raw=df_raw)
     # The following line sets those rows under the column sub_gsp to True
     df_raw.loc[idx, common.Headers.sub_gsp] = True
 
@@ -80,92 +153,51 @@ def bus_percentage_adder(df_raw):
 	:param pd.DataFrame df_raw:
 	:return pd.DataFrame df_raw:
 	"""
-    Bus_list = filter(lambda x: x.startswith('PS'), df.columns)
-    Percentage_List = ['{}_{}'.format(common.Headers.percentage, x) for x in
-                       Bus_list]  # makes a new list of column headers with the existing psse bus list
-
-    bus_percentage_dict = collections.OrderedDict()
-    percentage_miss_list=[]
-    #df_raw[common.Headers.sum_percentages] = np.nan
-    df_raw[common.Headers.sum_percentages] = pd.Series([0 for x in range(len(df_raw.index))])
-
-    for b in Percentage_List:  # this adds nan columns for the headers listed
-        df_raw[b] = np.nan
-
-    for b in Bus_list:
-        idx = (
-                (~df_raw[common.Headers.sub_gsp].isna() |  # filters the rows that are gsp
-                 ~df_raw[common.Headers.sub_primary].isna()) &  # filters the rows that are primary
-                ~df_raw[b].isna())  # Confirm that the pss bus column has a name assigned to it
-
-        bus_percentage_dict[b] = idx[
-            idx == True].index  # makes a dictionary with psse bus column names as keys and with the index of the
-        # rows with bus names as the values
-
-    for n in range(0, len(Bus_list)):
-        for id in bus_percentage_dict[Bus_list[n]]:
-            if pd.isnull(df_raw.loc[id + 1, Bus_list[n]]):
-                df_raw.loc[id, Percentage_List[n]]='missing'
-                percentage_miss_list.append(id)
-            else:
-                df_raw.loc[id, Percentage_List[n]] = df_raw.loc[
-                id + 1, Bus_list[n]]  # the percentages of each bus is extracted and added as a new
-                df_raw.loc[id,common.Headers.sum_percentages]=df_raw.loc[id,common.Headers.sum_percentages]+df_raw.loc[id,Percentage_List[n]]
-            k=1
-
-    for i in percentage_miss_list:
-
-        miss_row=df_raw.loc[i,Percentage_List]
-        miss_row_subset=miss_row.loc[miss_row[Percentage_List]=='missing'].index
-        df_raw.loc[i,miss_row_subset]=(1-df_raw.loc[i,common.Headers.sum_percentages])/len(miss_row_subset)
+    df_raw = bus_percentage_adder_modified(df_raw=df_raw, fill=True)
 
     return df_raw
 
 def bus_percentage_adder_modified(df_raw,fill):
     """
-		adds the buses percentages as a new column
+		adds the buses percentages as a new column, the percentage for each bus is the value in the row below the GSP or
+		Primary.  Where a bus is named but no percentage is given the percentage is left as NaN, or if fill is True then
+		the remaining percentage (1 - sum_percentages) is split evenly between the missing buses
 	:param pd.DataFrame df_raw:
+	:param bool fill:  If True then the missing percentages are estimated
 	:return pd.DataFrame df_raw:
 	"""
-    Bus_list = filter(lambda x: x.startswith('PS'), df.columns)
-    Percentage_List = ['{}_{}'.format(common.Headers.percentage, x) for x in
-                       Bus_list]  # makes a new list of column headers with the existing psse bus list
-
-    bus_percentage_dict = collections.OrderedDict()
-    percentage_miss_list=[]
-    #df_raw[common.Headers.sum_percentages] = np.nan
-    df_raw[common.Headers.sum_percentages] = pd.Series([0 for x in range(len(df_raw.index))])
-
-    for b in Percentage_List:  # this adds nan columns for the headers listed
-        df_raw[b] = np.nan
-
-    for b in Bus_list:
-        idx = (
-                (~df_raw[common.Headers.sub_gsp].isna() |  # filters the rows that are gsp
-                 ~df_raw[common.Headers.sub_primary].isna()) &  # filters the rows that are primary
-                ~df_raw[b].isna())  # Confirm that the pss bus column has a name assigned to it
-
-        bus_percentage_dict[b] = idx[
-            idx == True].index  # makes a dictionary with psse bus column names as keys and with the index of the
-        # rows with bus names as the values
-
-    for n in range(0, len(Bus_list)):
-        for id in bus_percentage_dict[Bus_list[n]]:
-            if pd.isnull(df_raw.loc[id + 1, Bus_list[n]]):
-                df_raw.loc[id, Percentage_List[n]]='missing'
-                percentage_miss_list.append(id)
-            else:
-                df_raw.loc[id, Percentage_List[n]] = df_raw.loc[
-                id + 1, Bus_list[n]]  # the percentages of each bus is extracted and added as a new
-                df_raw.loc[id,common.Headers.sum_percentages]=df_raw.loc[id,common.Headers.sum_percentages]+df_raw.loc[id,Percentage_List[n]]
-            k=1
+    layout = common.column_layout(df_raw=df_raw)
+    bus_positions = layout.positions('bus')
+    Percentage_List = layout.labels[common.Headers.percentage]  # column headers for the percentage of each psse bus
+
+    idx_sub = (
+            ~df_raw[common.Headers.sub_gsp].isna() |  # filters the rows that are gsp
+            ~df_raw[common.Headers.sub_primary].isna())  # filters the rows that are primary
+
+    # Confirm that the pss bus column has a name assigned to it for a gsp or primary row
+    has_bus = df_raw.iloc[:, bus_positions].notna().values & idx_sub.values[:, np.newaxis]
+
+    # The percentages of each bus are in the row below the gsp or primary
+    percentages_below = df_raw.iloc[:, bus_positions].shift(-1).apply(pd.to_numeric, errors='coerce').values.astype(float)
+
+    percentages = np.where(has_bus, percentages_below, np.nan)
+    missing = has_bus & np.isnan(percentages_below)
+
+    # Summed one bus at a time so the result is identical to adding the percentages up in bus order
+    sum_percentages = np.zeros(len(df_raw.index))
+    for n in range(len(bus_positions)):
+        sum_percentages = sum_percentages + np.where(np.isnan(percentages[:, n]), 0, percentages[:, n])
 
     if fill==True:
-        for i in percentage_miss_list:
+        # Remaining percentage is split evenly between the buses with missing percentages
+        missing_count = missing.sum(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            missing_share = (1 - sum_percentages) / missing_count
+        percentages = np.where(missing, missing_share[:, np.newaxis], percentages)
 
-            miss_row=df_raw.loc[i,Percentage_List]
-            miss_row_subset=miss_row.loc[miss_row[Percentage_List]=='missing'].index
-            df_raw.loc[i,miss_row_subset]=(1-df_raw.loc[i,common.Headers.sum_percentages])/len(miss_row_subset)
+    df_raw[common.Headers.sum_percentages] = sum_percentages
+    for n in range(len(Percentage_List)):
+        df_raw[Percentage_List[n]] = percentages[:, n]
 
     return df_raw
 
@@ -185,21 +217,25 @@ def extract_aggregate_demand(df_raw):
 	:param pd.DataFrame df_raw:
 	:return pd.DataFrame df_raw:
 	"""
-    # Find the years being considered for the forecast
-    forecast_years = common.adjust_years(headers_list=list(df_raw.columns))
+    # Find the positions of the years being considered for the forecast
+    layout = common.column_layout(df_raw=df_raw)
 
-    # Adjust the list to include a leading string value to identify this as a certain type of forecast (i.e aggregate)
-    # TODO: Could make use of MultiIndex Pandas DataFrame Columns instead which would allow for more efficient filtering
-    adjusted_list = ['{}_{}'.format(common.Headers.aggregate, x) for x in forecast_years]
-    # Add columns to DataFrame with no files by adding in empty
-    df_raw = pd.concat([df_raw, pd.DataFrame(columns=adjusted_list)], sort=False)
+    # The list of years with a leading string value to identify this as a certain type of forecast (i.e aggregate)
+    # common.forecast_blocks provides these columns as MultiIndex (kind, year) columns for more efficient filtering
+    adjusted_list = layout.labels[common.Headers.aggregate]
 
     # For columns which have been identified as GSP extract the aggregate demand from the row below and add to the GSP
     # row under the new sections for aggregate demand
-    idx_gsp = df_raw[df_raw[common.Headers.sub_gsp] == True].index
-    # loop through these index values for each GSP and get the aggregate values from the row below
-    for idx in idx_gsp:
-        df_raw.loc[idx, adjusted_list] = df_raw.loc[idx + 1, forecast_years].values
+    idx_gsp = (df_raw[common.Headers.sub_gsp] == True).values
+    aggregate_below = df_raw.iloc[:, layout.positions('forecast_years')].shift(-1).apply(pd.to_numeric, errors='coerce').values.astype(float)
+    df_aggregate = pd.DataFrame(
+        np.where(idx_gsp[:, np.newaxis], aggregate_below, np.nan),
+        index=df_raw.index,
+        columns=adjusted_list
+    )
+
+    # Add the aggregate demand columns to the DataFrame
+    df_raw = pd.concat([df_raw, df_aggregate], axis=1)
 
     return df_raw
 
@@ -232,20 +268,17 @@ def missing_year_load_estimator(df_raw,fill):
 	:return pd.DataFrame df_out:  Output DataFrame after processing
 	"""
 
-    forecast_years = common.adjust_years(headers_list=list(df_raw.columns))
-
-    df_raw['available_years'] = np.nan
-    df_raw['year_forecasted'] = np.nan
+    layout = common.column_layout(df_raw=df_raw)
+    forecast_years = layout.labels['forecast_years']
+    year_positions = layout.positions('forecast_years')
 
-    year_estimate_list = ['{}_{}'.format(common.Headers.estimate, x) for x in forecast_years]
-    # Add columns to DataFrame with no files by adding in empty
-    df_raw = pd.concat([df_raw, pd.DataFrame(columns=year_estimate_list)], sort=False)
+    year_estimate_list = layout.labels[common.Headers.estimate]
+    # Add columns to DataFrame with no values, these are added after the existing columns so year_positions is unchanged
+    df_raw = df_raw.reindex(columns=list(df_raw.columns) + ['available_years', 'year_forecasted'] + year_estimate_list)
+    estimate_positions = common.column_layout(df_raw=df_raw).positions(common.Headers.estimate)
 
-    forecast_years = common.adjust_years(headers_list=list(df_raw.columns))
     # todo: maybe add to idx to identify the rows which the values of the loads are negative
-    idx = df_raw[forecast_years].isna()
-
-    z = (~idx.loc[1, :]).sum()
+    idx = df_raw.iloc[:, year_positions].isna()
 
     df_raw['available_years'] = (~idx).sum(1)
 
@@ -253,271 +286,396 @@ def missing_year_load_estimator(df_raw,fill):
 
     df_raw['year_forecasted'] = d
 
-    est_row_list = d[d == True].index
+    if fill==True and d.any():
+        # All rows with missing years are estimated together, common.batch_interpolator uses the year positions as x
+        # and the loads as y to inter/extrapolate the missing values of each row
+        rows = d.values
+        years_estimate = df_raw.iloc[rows, year_positions].values.astype(float)
+        estimated_array = common.batch_interpolator(years_estimate)
 
-    years_estimate_df = df_raw.loc[est_row_list, forecast_years]
+        df_raw.iloc[rows, year_positions] = estimated_array
+        df_raw.iloc[rows, estimate_positions] = np.where(np.isnan(years_estimate), estimated_array, np.nan)
 
-    number_of_years = len(years_estimate_df.columns)
-    years_estimate_df.columns = range(number_of_years)
+    return df_raw
 
-    if fill==True:
 
-        for j in range(len(est_row_list)):
-
-            year_row1 = years_estimate_df.loc[est_row_list[j], :]
-            t1 = year_row1.to_frame()
-            estimated_array = common.interpolator(t1).T  # common.interpolator gets a dataframe with one column and
-            # number of indexes equal to the number of years and the missing values as nan, then interpolate the missing
-            # values by using indexes as x and y being the values in the dataframe, then gives out a df with
-            # the interpolated values
-            n = 0
-            for i in range(len(forecast_years)):
-                if pd.isnull(df_raw.loc[est_row_list[j], forecast_years[i]]):
-                    df_raw.loc[est_row_list[j], forecast_years[i]] = 1
-                    df_raw.loc[est_row_list[j], forecast_years[i]] = estimated_array.iloc[0, n]
-                    df_raw.loc[est_row_list[j], year_estimate_list[i]] = estimated_array.iloc[0, n]
-                    n += 1
+def diversity_factors(df_raw, per_year=False):
+    """
+		Function calculates the divers factor (diversified / aggregate load) of each gsp sub and maps it to every row
+		below the gsp using the gsp hierarchy (see gsp_hierarchy.GspHierarchy).  A factor of 1 is assumed for gsps with a zero or NA peak load
+		(this is to avoid division by zero), a gsp without an aggregate load takes the factor of the gsp before it and
+		the factors are capped at 1.
+	:param pd.DataFrame df_raw: Input DataFrame including the aggregate load columns
+	:param bool per_year:  (optional) If True then a factor is calculated for each forecast year, otherwise only the
+							first forecast year is used
+	:return np.ndarray factors:  Factor for each row (rows x years or rows x 1), NaN for rows before the first gsp
+	"""
+    layout = common.column_layout(df_raw=df_raw)
+    n_years = len(layout.labels['forecast_years']) if per_year else 1
+    diversified = df_raw.iloc[:, layout.positions('forecast_years')[:n_years]].apply(
+        pd.to_numeric, errors='coerce').values.astype(float)
+    aggregate = df_raw.iloc[:, layout.positions(common.Headers.aggregate)[:n_years]].apply(
+        pd.to_numeric, errors='coerce').values.astype(float)
+
+    hierarchy = gsp_hierarchy.GspHierarchy.from_dataframe(df_raw=df_raw)
+    diversified = diversified[hierarchy.gsp_positions]
+    aggregate = aggregate[hierarchy.gsp_positions]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        gsp_factors = np.where(diversified > 0, diversified / aggregate, 1)
+    gsp_factors = np.minimum(pd.DataFrame(gsp_factors).ffill().values, 1)
 
-    return df_raw
+    return hierarchy.broadcast(gsp_values=gsp_factors)
 
 
-def primary_diversload_adder(df_raw):
+def primary_diversload_adder(df_raw, per_year=False):
     """
 		Function calculates the divers factor for all gsp subs and then fill it for primary sub the same value as their gsp subs and add it as a new column
 		then it replaces the aggregate value of primary loads with the values written under the years for each primary
 		then use the gsp divers factors to calculate the diversed loads of the primaries and write it in loads for primaries for each year
 	:param pd.DataFrame df_raw: Input DataFrame to be processed
+	:param bool per_year:  (optional) If True then the factor for each year is used and added as a column for each
+							year, otherwise the factor from the first forecast year is used for all years
 	:return pd.DataFrame df_out:  Output DataFrame after processing
 	"""
-
-    forecast_years = common.adjust_years(headers_list=list(df_raw.columns))
-    adjusted_list = ['{}_{}'.format(common.Headers.aggregate, x) for x in forecast_years]
-    df_raw[common.Headers.diverse_factor] = np.nan
-
-    idx_change = (
-            ~df_raw[common.Headers.sub_gsp].isna() &  # Confirm that its a gsp
-            (~df_raw[forecast_years[0]].le(0)) & ~df_raw[
-        forecast_years[0]].isna())  # # Confirm that the the aggregated load value of the gsp is not zero or NA
-
-    df_raw.loc[idx_change, common.Headers.diverse_factor] = df_raw.loc[idx_change, forecast_years[0]] / df_raw.loc[
-        idx_change, adjusted_list[0]]
-
-    idx_change = (
-            ~df_raw[common.Headers.sub_gsp].isna() &  # Confirm that its a gsp
-            (df_raw[forecast_years[0]].le(0)) | df[
-                forecast_years[
-                    0]].isna())  # # Confirm that the the aggregated load value of the gsp is either zero or NA
-
-    df_raw.loc[
-        idx_change, common.Headers.diverse_factor] = 1  # if the aggregated value of the gsp (peak value) is zero or
-    # NA then assume 1 as the diversity factor (this is to avoid division by zero)
-
-
-    df_raw[common.Headers.diverse_factor] = df_raw[common.Headers.diverse_factor].where(
-        df_raw[common.Headers.sub_gsp] == True).ffill()
-
-    year_numbers = len(forecast_years)
-    clipped_df = df_raw.clip(upper=pd.Series({common.Headers.diverse_factor: 1}), axis=1)
-    df_raw[common.Headers.diverse_factor] = clipped_df[common.Headers.diverse_factor]
-
-
-    for i in range(0, year_numbers):
-        df_raw.loc[df_raw[common.Headers.sub_gsp].isna(), adjusted_list[i]] = df_raw.loc[
-            df_raw[common.Headers.sub_gsp].isna(), forecast_years[i]]
-        df_raw.loc[df_raw[common.Headers.sub_gsp].isna(), forecast_years[i]] = df_raw.loc[
-                                                                                   df_raw[
-                                                                                       common.Headers.sub_gsp].isna(),
-                                                                                   forecast_years[i]] * \
-                                                                               df_raw.loc[df[
-                                                                                           common.Headers.sub_gsp].isna(), common.Headers.diverse_factor]
-
-    #df_raw[common.Headers.diverse_factor].clip(1)
-    #df_raw[common.Headers.diverse_factor].set_max(1)
-    #df_raw[common.Headers.diverse_factor].where(df_raw[common.Headers.diverse_factor] <= 1, 1)
-
-    # clipped_df=df_raw.clip(upper=pd.Series({common.Headers.diverse_factor: 1}), axis=1)
-    # df_raw[common.Headers.diverse_factor]=clipped_df[common.Headers.diverse_factor]
+    layout = common.column_layout(df_raw=df_raw)
+    year_positions = layout.positions('forecast_years')
+    aggregate_positions = layout.positions(common.Headers.aggregate)
+
+    factors = diversity_factors(df_raw=df_raw, per_year=per_year)
+    df_raw[common.Headers.diverse_factor] = factors[:, 0]
+    if per_year:
+        df_factors = pd.DataFrame(factors, index=df_raw.index, columns=layout.labels[common.Headers.diverse_factor])
+        df_raw = pd.concat([df_raw, df_factors], axis=1)
+
+    # The load given for each primary is its aggregate load and the diversified load is found by applying the factor
+    # of its gsp to all years at once
+    idx_primary = df_raw[common.Headers.sub_gsp].isna().values
+    loads = df_raw.iloc[idx_primary, year_positions].apply(pd.to_numeric, errors='coerce').values.astype(float)
+    df_raw.iloc[idx_primary, aggregate_positions] = loads
+    df_raw.iloc[idx_primary, year_positions] = loads * factors[idx_primary]
 
     return df_raw
 
 
-def season_load_filler(df_raw,fill):
+def season_load_filler(df_raw,fill,quantiles=None,sketch_error=None):
     """
 		Function calculates the quantile values for season loads for both GSP and primary substations using available values (non zero and non NA)
-		then saves them as attributes of class seasons (in common), where the percentile values are also setup.
-		Then fill in the missing values for season loads using the calculated quantile values.
+		(see common.season_quantiles) then fill in the missing values for season loads using the calculated quantile values.
 	:param pd.DataFrame df_raw: Input DataFrame to be processed
+	:param bool fill:  If True then the missing season loads are filled
+	:param dict quantiles:  (optional) Quantile for each season column, defaults to the values in common.Seasons
+	:param float sketch_error:  (optional) If given then the quantiles are approximated with a
+								quantile_sketch.QuantileSketch with this rank error rather than calculated exactly
 	:return pd.DataFrame df_out:  Output DataFrame after processing
 	"""
     if fill==True:
-        idx = (
-                ~df_raw[common.Headers.sub_gsp].isna() &  # Confirm that it's a gsp
-                ~df_raw[common.Headers.spring_autumn].isna() &  # Confirm that a season value is not NA
-                ~df_raw[common.Headers.spring_autumn].le(0))  # Confirm that season value is not negative
+        available_values = None
+        if sketch_error is not None:
+            available_values = common.season_summary(df_raw=df_raw, sketch_error=sketch_error,
+                                                     seasons=None if quantiles is None else tuple(quantiles))
+        season_fill = common.season_quantiles(df_raw=df_raw, quantiles=quantiles, available_values=available_values)
+        df_raw = season_fill.apply(df_raw=df_raw)
 
-        common.Seasons.gsp_spring_autumn_val = np.percentile(df_raw.loc[idx, common.Headers.spring_autumn],
-                                                             common.Seasons.spring_autumn_q)
+    return df_raw
 
-        idx_change = (
-                ~df_raw[common.Headers.sub_gsp].isna() &  # Confirm that it's a gsp
-                (df_raw[common.Headers.spring_autumn].isna() |  #
-                 df_raw[common.Headers.spring_autumn].le(0)))  #
+def load_columns(df_raw):
+    """
+		Function returns the columns of the processed load estimate which contain loads (forecast years, aggregate and
+		estimated loads, season loads, bus percentages and diversity factors)
+	:param pd.DataFrame df_raw:
+	:return list load_columns:
+	"""
+    layout = common.column_layout(df_raw=df_raw)
+    columns = {common.Headers.sum_percentages, common.Headers.diverse_factor}
+    for group in ('forecast_years', common.Headers.aggregate, common.Headers.estimate, common.Headers.percentage,
+                  'seasons', common.Headers.diverse_factor):
+        columns.update(layout.labels[group])
 
-        df_raw.loc[idx_change, common.Headers.spring_autumn] = common.Seasons.gsp_spring_autumn_val
+    return [x for x in df_raw.columns if x in columns]
 
-        idx = (
-                ~df_raw[common.Headers.sub_gsp].isna() &  #
-                ~df_raw[common.Headers.summer].isna() &  #
-                ~df_raw[common.Headers.summer].le(0))  #
 
-        common.Seasons.gsp_summer_val = np.percentile(df_raw.loc[idx, common.Headers.summer], common.Seasons.summer_q)
+def normalise_dtypes(df_raw, compact, float_dtype='float64'):
+    """
+		Function converts the processed load estimate to a compact set of dtypes.  The substation flags become bool, the
+		GSP and Primary names category and the loads float_dtype with anything which is not a number (i.e. text
+		sentinels) set to NaN.  Other columns are only converted if they contain a single type.
+	:param pd.DataFrame df_raw: Input DataFrame to be processed
+	:param bool compact:  If True then the dtypes are converted
+	:param str float_dtype:  (optional) dtype used for the loads, float64 or float32
+	:return pd.DataFrame df_out:  Output DataFrame after processing
+	"""
+    if compact==True:
+        df_raw = df_raw.copy()
+        for x in (common.Headers.sub_gsp, common.Headers.sub_primary, 'year_forecasted'):
+            if x in df_raw.columns:
+                df_raw[x] = (df_raw[x] == True).values
+        for x in (common.Headers.gsp, common.Headers.name):
+            if x in df_raw.columns:
+                df_raw[x] = df_raw[x].astype('category')
+        for x in load_columns(df_raw=df_raw):
+            df_raw[x] = pd.to_numeric(df_raw[x], errors='coerce').astype(float_dtype)
+        # Any other columns which only contain numbers (i.e. NRN, PSS/E bus numbers) or dates are given a numeric or
+        # datetime dtype and text which is mostly repeated (i.e. voltage ratios) becomes category.  Columns with a mix
+        # of types are left as they are.
+        for x in df_raw.columns[(df_raw.dtypes == object).values]:
+            inferred_type = pd.api.types.infer_dtype(df_raw[x], skipna=True)
+            if inferred_type in ('integer', 'floating', 'mixed-integer-float', 'empty'):
+                df_raw[x] = pd.to_numeric(df_raw[x])
+            elif inferred_type == 'datetime':
+                df_raw[x] = pd.to_datetime(df_raw[x])
+            elif inferred_type == 'string' and df_raw[x].nunique() <= len(df_raw.index) // 2:
+                df_raw[x] = df_raw[x].astype('category')
 
-        idx_change = (
-                ~df_raw[common.Headers.sub_gsp].isna() &  #
-                (df_raw[common.Headers.summer].isna() |  #
-                 df_raw[common.Headers.summer].le(0)))  #
+    return df_raw
 
-        df_raw.loc[idx_change, common.Headers.summer] = common.Seasons.gsp_summer_val
 
-        idx = (
-                ~df_raw[common.Headers.sub_gsp].isna() &  #
-                ~df_raw[common.Headers.min_demand].isna() &  #
-                ~df_raw[common.Headers.min_demand].le(0))  #
+def dtype_memory_report(df_before, df_after):
+    """
+		Function compares the dtype and memory used by each column before and after normalise_dtypes
+	:param pd.DataFrame df_before:  DataFrame before the dtypes were converted
+	:param pd.DataFrame df_after:  DataFrame after the dtypes were converted
+	:return pd.DataFrame df_report:  dtype and memory (bytes) of each column before and after with the totals in the
+										last row
+	"""
+    df_report = pd.DataFrame(collections.OrderedDict((
+        ('dtype_before', df_before.dtypes.astype(str)),
+        ('dtype_after', df_after.dtypes.astype(str)),
+        ('memory_before', df_before.memory_usage(index=False, deep=True)),
+        ('memory_after', df_after.memory_usage(index=False, deep=True)),
+    )))
+    df_report.loc['Total', ['memory_before', 'memory_after']] = df_report[['memory_before', 'memory_after']].sum()
 
-        common.Seasons.gsp_min_demand_val = np.percentile(df_raw.loc[idx, common.Headers.summer],
-                                                          common.Seasons.min_demand_q)
+    return df_report
 
-        idx_change = (
-                ~df_raw[common.Headers.sub_gsp].isna() &  #
-                (df_raw[common.Headers.min_demand].isna() |  #
-                 df_raw[common.Headers.min_demand].le(0)))
 
-        df_raw.loc[idx_change, common.Headers.min_demand] = common.Seasons.gsp_min_demand_val
+class PipelineConfig(collections.namedtuple(
+        'PipelineConfig', ['fill_bus_percentages', 'fill_missing_years', 'fill_seasons', 'season_quantiles',
+                           'compact_dtypes', 'float_dtype', 'diversity_per_year', 'season_sketch_error'])):
+    """
+		Configuration of the processing steps
+		fill_bus_percentages:  If True then missing bus percentages are estimated (bus_percentage_adder_modified)
+		fill_missing_years:  If True then missing year loads are estimated (missing_year_load_estimator)
+		fill_seasons:  If True then missing season loads are filled (season_load_filler)
+		season_quantiles:  Quantile for each season column, if None the values in common.Seasons are used
+		compact_dtypes:  If True then the processed load estimate is converted to compact dtypes (normalise_dtypes)
+		float_dtype:  dtype used for the loads when compact_dtypes is True, float64 or float32
+		diversity_per_year:  If True then a diversity factor is calculated for each forecast year rather than only using
+							the first year (primary_diversload_adder)
+		season_sketch_error:  If given then the season quantiles are approximated with mergeable sketches with this rank
+							error rather than calculated exactly (see quantile_sketch), if None they are exact
+	"""
+    __slots__ = ()
 
-        # assessing primary season load values
+    def __new__(cls, fill_bus_percentages=True, fill_missing_years=True, fill_seasons=True, season_quantiles=None,
+                compact_dtypes=True, float_dtype='float64', diversity_per_year=False, season_sketch_error=None):
+        return super(PipelineConfig, cls).__new__(
+            cls, fill_bus_percentages, fill_missing_years, fill_seasons, season_quantiles, compact_dtypes, float_dtype,
+            diversity_per_year, season_sketch_error)
 
-        idx = (
-                ~df_raw[common.Headers.sub_primary].isna() &  #
-                ~df_raw[common.Headers.spring_autumn].isna() &  #
-                ~df_raw[common.Headers.spring_autumn].le(0))  #
+    @classmethod
+    def from_fill(cls, fill):
+        """
+			Returns the config with all filling either turned on or off
+		:param bool fill:
+		:return PipelineConfig config:
+		"""
+        return cls(fill_bus_percentages=fill, fill_missing_years=fill, fill_seasons=fill)
 
-        common.Seasons.primary_spring_autumn_val = np.percentile(df_raw.loc[idx, common.Headers.spring_autumn],
-                                                                 common.Seasons.spring_autumn_q)
 
-        idx_change = (
-                ~df_raw[common.Headers.sub_primary].isna() &  #
-                (df_raw[common.Headers.spring_autumn].isna() |  #
-                 df_raw[common.Headers.spring_autumn].le(0)))
+class LoadEstimatePipeline:
+    """
+		Runs all of the processing steps on a raw load estimate.  Each step only depends on the DataFrame passed to it
+		and the config so any number of pipelines can be run at the same time from different threads or processes.
+	"""
+    def __init__(self, config=None):
+        """
+		:param PipelineConfig config:  (optional) Configuration, defaults to all filling turned on
+		"""
+        if config is None:
+            config = PipelineConfig()
+        self.config = config
+
+    def stages(self):
+        """
+			Returns the processing steps in the order they are run
+		:return list stages:  List of (name, function) where the function takes and returns the DataFrame
+		"""
+        config = self.config
+        return [
+            # Identify whether a GSP or Primary substation for each row
+            ('determine_gsp_primary_flag', determine_gsp_primary_flag),
+            # Extract aggregate demand for each GSP
+            ('extract_aggregate_demand', extract_aggregate_demand),
+            # Assign GSPs
+            ('assign_gsp', assign_gsp),
+            # Extract bus percentages as new columns
+            ('bus_percentage_adder_modified',
+             functools.partial(bus_percentage_adder_modified, fill=config.fill_bus_percentages)),
+            ('remove_unnecessary_rows', remove_unnecessary_rows),
+            #  Estimates the missing load values for each year by inter/extrapolation.
+            ('missing_year_load_estimator',
+             functools.partial(missing_year_load_estimator, fill=config.fill_missing_years)),
+            # Calculate the diversity factors as new column then fill in the aggregate and actual(divers) loads and
+            # assumes divers factor of 1 for gsps with 0 or NA peak loads
+            ('primary_diversload_adder',
+             functools.partial(primary_diversload_adder, per_year=config.diversity_per_year)),
+            # Fill in the missing season load values by the quantiles
+            ('season_load_filler',
+             functools.partial(season_load_filler, fill=config.fill_seasons, quantiles=config.season_quantiles,
+                               sketch_error=config.season_sketch_error)),
+            # Convert to compact dtypes (bool flags, category names and float loads)
+            ('normalise_dtypes',
+             functools.partial(normalise_dtypes, compact=config.compact_dtypes, float_dtype=config.float_dtype)),
+        ]
+
+    def run(self, df_raw, profiler=None, group=None):
+        """
+			Processes the raw load estimate, the DataFrame passed in is not changed
+		:param pd.DataFrame df_raw: Raw load estimate (as returned by common.import_raw_load_estimates)
+		:param stage_profiler.StageProfiler profiler:  (optional) If given then each stage is profiled and the memory
+														saved by normalise_dtypes is recorded (see dtype_memory_report)
+		:param str group:  (optional) Name the stages are grouped under in the profile
+		:return pd.DataFrame df_out:  Output DataFrame after processing
+		"""
+        df = df_raw.copy()
+        for name, stage in self.stages():
+            if profiler is None:
+                df = stage(df_raw=df)
+            else:
+                df_before = df
+                df = profiler.call(name=name, func=stage, df_in=df, group=group)
+                if name == 'normalise_dtypes' and self.config.compact_dtypes and profiler.enabled:
+                    # Memory saved by the compact dtypes is recorded alongside the profile of the stage
+                    profiler.add_report(
+                        name=name, report=dtype_memory_report(df_before=df_before, df_after=df), group=group)
 
-        df_raw.loc[idx_change, common.Headers.spring_autumn] = common.Seasons.primary_spring_autumn_val
+        return df
 
-        idx = (
-                ~df_raw[common.Headers.sub_primary].isna() &  #
-                ~df_raw[common.Headers.summer].isna() &  #
-                ~df_raw[common.Headers.summer].le(0))  #
 
-        common.Seasons.primary_summer_val = np.percentile(df_raw.loc[idx, common.Headers.summer], common.Seasons.summer_q)
+def run(df_raw, config=None, profiler=None):
+    """
+		Function processes the raw load estimate with the given config
+	:param pd.DataFrame df_raw: Raw load estimate (as returned by common.import_raw_load_estimates)
+	:param PipelineConfig config:  (optional) Configuration, if a bool then all filling is turned on or off
+	:param stage_profiler.StageProfiler profiler:  (optional) If given then each stage is profiled and grouped under
+													the config
+	:return pd.DataFrame df_out:  Output DataFrame after processing
+	"""
+    if isinstance(config, bool):
+        config = PipelineConfig.from_fill(fill=config)
+    pipeline = LoadEstimatePipeline(config=config)
 
-        idx_change = (
-                ~df_raw[common.Headers.sub_primary].isna() &  #
-                (df_raw[common.Headers.summer].isna() |  #
-                 df_raw[common.Headers.summer].le(0)))  #
+    return pipeline.run(df_raw=df_raw, profiler=profiler, group=repr(pipeline.config))
 
-        df_raw.loc[idx_change, common.Headers.summer] = common.Seasons.primary_summer_val
 
-        idx = (
-                ~df_raw[common.Headers.sub_primary].isna() &  #
-                ~df_raw[common.Headers.min_demand].isna() &  #
-                ~df_raw[common.Headers.min_demand].le(0))  #
+def run_fill_configurations(df_raw, config_list, processes=None, profiler=None):
+    """
+		Function processes the raw load estimate once for each of the fill configurations in a pool of processes, the
+		already parsed raw load estimate is passed to each process rather than the workbook being read again
+	:param pd.DataFrame df_raw: Raw load estimate (as returned by common.import_raw_load_estimates)
+	:param list config_list:  PipelineConfig (or bool to turn all filling on or off) for each run
+	:param int processes:  (optional) Number of processes to use, defaults to the number of CPUs and if 1 then the
+							configurations are run one after the other in this process
+	:param stage_profiler.StageProfiler profiler:  (optional) If given and enabled then the configurations are run one
+													after the other in this process so that each stage is profiled
+	:return list df_out_list:  Output DataFrames in the same order as config_list
+	"""
+    if profiler is not None and profiler.enabled:
+        return [run(df_raw=df_raw, config=x, profiler=profiler) for x in config_list]
 
-        common.Seasons.primary_min_demand_val = np.percentile(df_raw.loc[idx, common.Headers.min_demand],
-                                                              common.Seasons.min_demand_q)
+    if processes == 1 or len(config_list) <= 1:
+        return [run(df_raw=df_raw, config=x) for x in config_list]
 
-        idx_change = (
-                ~df_raw[common.Headers.sub_primary].isna() &  #
-                (df_raw[common.Headers.min_demand].isna() |  #
-                 df_raw[common.Headers.min_demand].le(0)))  #
+    with concurrent.futures.ProcessPoolExecutor(max_workers=processes) as executor:
+        # map returns the results in the same order as config_list irrespective of which process finishes first
+        df_out_list = list(executor.map(run, [df_raw] * len(config_list), config_list))
 
-        df_raw.loc[idx_change, common.Headers.min_demand] = common.Seasons.primary_min_demand_val
+    return df_out_list
 
-    return df_raw
 
-def bad_data_identifier(df_raw):
+def bad_data_identifier(df_raw, output_format=OUTPUT_FORMAT, rules=validation.BAD_DATA_RULES, output_dir=None):
     """
-		Function removes all of the rows which do not correspond to the usable data for GSP or Primary substations
+		Function splits the rows into the bad data, which break any of the rules (see data_validation), and the good data.
+		The bad data includes a column with the bitmask of all of the registered rules that each row breaks.
 	:param pd.DataFrame df_raw: Input DataFrame to be processed
-	:return pd.DataFrame df_out:  Output DataFrame after processing
+	:param str output_format:  (optional) Format to write the bad and good data in (see output_formats.OutputFormat)
+	:param tuple rules:  (optional) Names of the rules which identify bad data
+	:param str output_dir:  (optional) Folder to write the bad and good data to, defaults to the folder containing
+							these scripts
+	:return (pd.DataFrame, pd.DataFrame) (bad_data, good_data):
 	"""
-    # Target filename to use
-    # FILE_NAME_INPUT = 'Processed Load Estimates_p_modified.xlsx'
-    # FILE_NAME_OUTPUT = 'bad_data_identified.xlsx'
-    # FILE_PTH_INPUT = common.get_local_file_path(file_name=FILE_NAME_INPUT)
-    # FILE_PTH_OUTPUT = common.get_local_file_path(file_name=FILE_NAME_OUTPUT)
-    #
-    # df = common.import_excel(pth_load_est=FILE_PTH_INPUT)
-
-    forecast_years = common.adjust_years(headers_list=list(df_raw.columns))
-    Bus_list = filter(lambda x: x.startswith('PS'), df_raw.columns)
-
-    idx = (
-            df_raw[forecast_years].isna().all(axis='columns') |  #
-            df_raw[forecast_years].le(0).all(axis='columns') |
-            df_raw[Bus_list].isna().all(axis='columns') | df_raw[Bus_list].le(0).all(
-        axis='columns'))
+    result = validation.validate(df=df_raw)
+    idx = result.violations[list(rules)].any(axis='columns')
 
-    bad_data = df_raw.loc[idx, :]
+    bad_data = df_raw.loc[idx, :].assign(**{validation.VIOLATIONS: result.bitmask[idx]})
     good_data= df_raw.loc[~idx, :]
-    bad_data.to_excel(common.excel_file_names.bad_data_excel_name)
-    good_data.to_excel(common.excel_file_names.good_data_excel_name)
+    output.write_output(df=bad_data, file_name=common.excel_file_names.bad_data_excel_name, output_format=output_format,
+                        output_dir=output_dir)
+    output.write_output(df=good_data, file_name=common.excel_file_names.good_data_excel_name,
+                        output_format=output_format, output_dir=output_dir)
     return bad_data,good_data
 
 
-
-
-if __name__ == '__main__':
-    # Import raw DF
-    fill_estimate=False
+def process_workbook(pth_load_est, output_dir=None, output_format=OUTPUT_FORMAT, profiler=None, processes=None):
+    """
+		Function processes a load estimate workbook without and with the missing data filled, writes the processed
+		load estimates, the bad and good data and the comparison workbook
+	:param str pth_load_est:  Full path to the load estimate workbook
+	:param str output_dir:  (optional) Folder to write the outputs to, defaults to the folder containing these scripts
+	:param str output_format:  (optional) Format to write the processed DataFrames in (see output_formats.OutputFormat)
+	:param stage_profiler.StageProfiler profiler:  (optional) If given then each stage is profiled
+	:param int processes:  (optional) Number of processes used for the fill configurations (see
+							run_fill_configurations)
+	:return (list, pd.DataFrame, pd.DataFrame) (df_processed_list, bad_data, good_data):
+	"""
+    if profiler is None:
+        profiler = stage_profiler.StageProfiler(enabled=False)
     fill_estimate_list=[False,True]
     excel_output_name_list=[common.excel_file_names.df_raw_excel_name,common.excel_file_names.df_modified_excel_name]
 
-    for i in range(len(fill_estimate_list)):
-        df = common.import_raw_load_estimates(pth_load_est=FILE_PTH_INPUT)
-        # Identify whether a GSP or Primary substation for each row
-        raw_dataframe = common.sse_load_xl_to_df(xl_filename=FILE_PTH_INPUT,
-                                                 xl_ws_name='MASTER Based on SubstationLoad', headers=True)
-        df = determine_gsp_primary_flag(df_raw=df)
-        # Extract aggregate demand for each GSP
-        df = extract_aggregate_demand(df_raw=df)
-        # Assign GSPs
-        df = assign_gsp(df_raw=df)
-        # Extract bus percentages as new columns
-        df = bus_percentage_adder_modified(df_raw=df,fill=fill_estimate_list[i])  # Neg added
-
-        df = remove_unnecessary_rows(df_raw=df)
-
-        #  Estimates the missing load values for each year by inter/extrapolation.
-        df = missing_year_load_estimator(df_raw=df,fill=fill_estimate_list[i])  # Neg added
-
-        # Calculate the diversity factors as new column then fill in the aggregate and actual(divers) loads and assumes
-        # divers factor of 1 for gsps with 0 or NA peak loads
-        df = primary_diversload_adder(df_raw=df)  # Neg added
-
-        # Fill in the missing season load values by the quantiles
-        df = season_load_filler(df_raw=df,fill=fill_estimate_list[i])  # Neg added
+    # Workbook is only parsed once and each fill configuration is processed in parallel from the same data
+    workbook = common.LoadEstimateWorkbook(pth_load_est=pth_load_est)
+    df_raw_load_estimates = profiler.call(name='import_raw_load_estimates', func=workbook.raw_load_estimates)
+    df_processed_list = run_fill_configurations(
+        df_raw=df_raw_load_estimates, config_list=fill_estimate_list, processes=processes, profiler=profiler)
 
+    for i in range(len(fill_estimate_list)):
+        df = df_processed_list[i]
         # Export processed DataFrame
-        FILE_PTH_OUTPUT = common.get_local_file_path(file_name=excel_output_name_list[i])
-        df.to_excel(FILE_PTH_OUTPUT)
+        profiler.call(name='write_output', func=output.write_output, df=df, file_name=excel_output_name_list[i],
+                      output_format=output_format, output_dir=output_dir)
+
+    # make a file of bad data
+    bad_data,good_data=profiler.call(name='bad_data_identifier', func=bad_data_identifier, df_in=df,
+                                     output_format=output_format, output_dir=output_dir)
+
+    # DataFrames passed directly so the files written above do not need to be read back in
+    profiler.call(name='excel_data_comparison_writer', func=comparison.excel_data_comparison_writer,
+                  df_raw=df_processed_list[0], df_modified=df_processed_list[1], df_bad=bad_data, df_good=good_data,
+                  output_dir=output_dir)
 
-    # make an excel file of bad data
-    bad_data,good_data=bad_data_identifier(df)
+    return df_processed_list, bad_data, good_data
 
-    comparison.excel_data_comparison_maker(FILE_NAME_INPUT_1=common.excel_file_names.df_raw_excel_name,\
-                                           FILE_NAME_INPUT_2=common.excel_file_names.df_modified_excel_name,\
-                                           Bad_Data_Input_Name= common.excel_file_names.bad_data_excel_name,\
-                                           Good_Data_Input_Name=common.excel_file_names.good_data_excel_name)
 
-    raw_dataframe = common.sse_load_xl_to_df(xl_filename=FILE_PTH_INPUT, xl_ws_name='MASTER Based on SubstationLoad', headers=True)
 
 
+if __name__ == '__main__':
+    # Each stage is only profiled if PROFILE_STAGES is True (see stage_profiler)
+    profiler = stage_profiler.StageProfiler(
+        enabled=PROFILE_STAGES, trace_memory=PROFILE_MEMORY, use_cprofile=PROFILE_CPROFILE)
+
+    # Processes the workbook FILE_PTH_INPUT, see batch to process several workbooks
+    df_processed_list, bad_data, good_data = process_workbook(
+        pth_load_est=FILE_PTH_INPUT, output_format=OUTPUT_FORMAT, profiler=profiler)
+
+    if profiler.enabled:
+        profiler.write_json(pth_file=common.get_local_file_path(file_name=common.excel_file_names.stage_profile_json_name))
+        profiler.write_csv(pth_file=common.get_local_file_path(file_name=common.excel_file_names.stage_profile_csv_name))
+        if PROFILE_CPROFILE:
+            profiler.write_cprofile(
+                pth_file=common.get_local_file_path(file_name=common.excel_file_names.stage_profile_cprofile_name))
+        print(profiler.summary())
+        for group, name, report in profiler.reports:
+            print('{} {}:\n{}'.format(group, name, report.loc['Total', ['memory_before', 'memory_after']]))
+
     k = 1
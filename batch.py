@@ -0,0 +1,178 @@
+"""
+#######################################################################################################################
+###											Batch Processing														###
+###																													###
+###		Processes every load estimate workbook in a folder (or matching a glob pattern) in a bounded pool of		###
+###		processes.  The outputs of each workbook are written to their own folder of the results tree and an index	###
+###		of all of the workbooks is written to the top of the tree.  A workbook which fails is recorded in the index	###
+###		with its error and does not stop the others being processed.												###
+###																													###
+#######################################################################################################################
+"""
+
+# Generic Imports
+import collections
+import concurrent.futures
+import glob
+import os
+import time
+import traceback
+import pandas as pd
+
+# Unique imports
+import common_functions as common
+import DataFrame_Approach as approach
+import output_formats as output
+
+# Folder or glob pattern of the workbooks to process and the folder the results are written to
+BATCH_INPUT = common.get_local_file_path(file_name='releases')
+BATCH_RESULTS_DIR = common.get_local_file_path(file_name=common.excel_file_names.batch_results_dir_name)
+# Maximum number of workbooks processed at the same time, if None then the number of CPUs
+MAX_WORKERS = None
+
+# Extensions of the workbooks found when a folder is given
+WORKBOOK_EXTENSIONS = ('.xlsx', '.xlsm', '.xls')
+
+
+# noinspection PyClassHasNoInit
+class Status:
+	"""
+		Result of processing a workbook
+	"""
+	ok = 'ok'
+	failed = 'failed'
+
+
+BatchRecord = collections.namedtuple('BatchRecord', [
+	'workbook', 'output_dir', 'status', 'rows', 'bad_rows', 'good_rows', 'seconds', 'error'
+])
+BatchRecord.__doc__ = """
+	Entry in the batch index for a single workbook
+	workbook:  Full path to the workbook
+	output_dir:  Folder the outputs of the workbook were written to
+	status:  One of Status
+	rows:  Number of rows in the processed load estimate (with the missing data filled), None if it failed
+	bad_rows, good_rows:  Number of rows of bad and good data, None if it failed
+	seconds:  Time taken to process the workbook
+	error:  Traceback of the error if it failed, otherwise None
+"""
+
+
+def find_workbooks(pattern):
+	"""
+		Function returns the workbooks to process in name order, temporary files excel creates for open workbooks
+		(starting ~$) are ignored
+	:param str pattern:  Folder containing the workbooks or a glob pattern (i.e. 'releases/**/*.xlsx')
+	:return list workbooks:  Full path to each workbook
+	"""
+	if os.path.isdir(pattern):
+		paths = [os.path.join(pattern, x) for x in os.listdir(pattern) if x.lower().endswith(WORKBOOK_EXTENSIONS)]
+	else:
+		paths = glob.glob(pattern, recursive=True)
+
+	return sorted(os.path.abspath(x) for x in paths if os.path.isfile(x) and not os.path.basename(x).startswith('~$'))
+
+
+def input_root(pattern):
+	"""
+		Function returns the folder the workbooks are found in, for a glob pattern this is the folder before the first
+		part of the pattern containing a wildcard
+	:param str pattern:  Folder containing the workbooks or a glob pattern
+	:return str root:  Full path to the folder
+	"""
+	if os.path.isdir(pattern):
+		return os.path.abspath(pattern)
+
+	parts = os.path.abspath(pattern).split(os.sep)
+	magic = [n for n, x in enumerate(parts) if glob.has_magic(x)]
+	if not magic:
+		# A single workbook
+		return os.path.dirname(os.path.abspath(pattern))
+
+	return os.sep.join(parts[:magic[0]]) or os.sep
+
+
+def output_dirs(workbooks, results_dir, root):
+	"""
+		Function returns the folder of the results tree for each workbook, the results tree mirrors the folders below
+		root and each folder is named after the workbook without its extension.  If workbooks in the same folder only
+		differ by their extension then the extension is kept in the name.
+	:param list workbooks:  Full path to each workbook
+	:param str results_dir:  Top folder of the results tree
+	:param str root:  Folder the workbooks are found in (see input_root)
+	:return list output_dirs:
+	"""
+	relative = [os.path.relpath(x, root) for x in workbooks]
+	names = collections.Counter(os.path.splitext(x)[0] for x in relative)
+
+	return [
+		os.path.join(results_dir, x if names[os.path.splitext(x)[0]] > 1 else os.path.splitext(x)[0]) for x in relative
+	]
+
+
+def process_one(pth_workbook, output_dir, output_format=output.OUTPUT_FORMAT):
+	"""
+		Function processes a single workbook (see DataFrame_Approach.process_workbook), this is run in the worker
+		processes.  Any error is caught and returned in the record so that it does not affect the other workbooks.
+	:param str pth_workbook:  Full path to the workbook
+	:param str output_dir:  Folder to write the outputs to
+	:param str output_format:  (optional) Format to write the processed DataFrames in
+	:return BatchRecord record:
+	"""
+	start = time.perf_counter()
+	try:
+		os.makedirs(output_dir, exist_ok=True)
+		# Each worker only processes one workbook at a time so the fill configurations are run one after the other
+		df_processed_list, bad_data, good_data = approach.process_workbook(
+			pth_load_est=pth_workbook, output_dir=output_dir, output_format=output_format, processes=1)
+	except Exception:
+		return BatchRecord(
+			workbook=pth_workbook, output_dir=output_dir, status=Status.failed, rows=None, bad_rows=None,
+			good_rows=None, seconds=time.perf_counter() - start, error=traceback.format_exc())
+
+	return BatchRecord(
+		workbook=pth_workbook, output_dir=output_dir, status=Status.ok, rows=len(df_processed_list[-1].index),
+		bad_rows=len(bad_data.index), good_rows=len(good_data.index), seconds=time.perf_counter() - start, error=None)
+
+
+def run_batch(pattern, results_dir=BATCH_RESULTS_DIR, max_workers=MAX_WORKERS, output_format=output.OUTPUT_FORMAT):
+	"""
+		Function processes every workbook found by find_workbooks and writes the batch index to the results folder
+	:param str pattern:  Folder containing the workbooks or a glob pattern
+	:param str results_dir:  (optional) Top folder of the results tree
+	:param int max_workers:  (optional) Maximum number of workbooks processed at the same time, if 1 then the workbooks
+							are processed one after the other in this process
+	:param str output_format:  (optional) Format to write the processed DataFrames in
+	:return pd.DataFrame df_index:  BatchRecord of each workbook in the same order as the workbooks
+	"""
+	workbooks = find_workbooks(pattern=pattern)
+	dirs = output_dirs(workbooks=workbooks, results_dir=results_dir, root=input_root(pattern=pattern))
+	os.makedirs(results_dir, exist_ok=True)
+
+	if max_workers == 1 or len(workbooks) <= 1:
+		records = [process_one(x, y, output_format) for x, y in zip(workbooks, dirs)]
+	else:
+		records = [None] * len(workbooks)
+		with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+			futures = {
+				executor.submit(process_one, x, y, output_format): n for n, (x, y) in enumerate(zip(workbooks, dirs))
+			}
+			for future in concurrent.futures.as_completed(futures):
+				n = futures[future]
+				try:
+					records[n] = future.result()
+				except Exception:
+					# Only reached if the worker process itself fails (i.e. runs out of memory)
+					records[n] = BatchRecord(
+						workbook=workbooks[n], output_dir=dirs[n], status=Status.failed, rows=None, bad_rows=None,
+						good_rows=None, seconds=None, error=traceback.format_exc())
+
+	df_index = pd.DataFrame(records, columns=BatchRecord._fields)
+	df_index.to_csv(os.path.join(results_dir, common.excel_file_names.batch_index_csv_name), index=False)
+
+	return df_index
+
+
+if __name__ == '__main__':
+	df_batch_index = run_batch(pattern=BATCH_INPUT)
+	print(df_batch_index[['workbook', 'status', 'rows', 'seconds']])
@@ -0,0 +1,348 @@
+"""
+#######################################################################################################################
+###											Benchmark																###
+###																													###
+###		Produces synthetic load estimates with the same layout as the 'MASTER Based on SubstationLoad' worksheet	###
+###		at any size and times each stage of the processing so that any performance work can be checked against	###
+###		reproducible numbers.																						###
+###																													###
+#######################################################################################################################
+"""
+
+# Generic Imports
+import os
+import pandas as pd
+import numpy as np
+import xlsxwriter
+
+# Unique imports
+import common_functions as common
+import DataFrame_Approach as approach
+import stage_profiler
+
+# Size of the example load estimate, the scale multiplies the number of GSPs
+BASE_GSPS = 65
+PRIMARIES_PER_GSP = 6
+BUS_COLUMNS = 8
+FORECAST_YEARS = 14
+START_YEAR = 2019
+# Proportion of the loads, season loads and bus percentages which are missing
+MISSING_RATE = 0.05
+SEED = 0
+
+# Scales the benchmark is run at and whether the workbook is written so that the import can be timed as well, the
+# import is only timed where the worksheet fits within the excel row limit
+SCALES = (10, 100, 1000)
+TIME_IMPORT = False
+REPEAT = 1
+EXCEL_MAX_ROWS = 1048576
+SHEET_NAME = 'MASTER Based on SubstationLoad'
+
+# Report names
+BENCHMARK_JSON_NAME = 'benchmark.json'
+BENCHMARK_CSV_NAME = 'benchmark.csv'
+
+
+# noinspection PyClassHasNoInit
+class RowKind:
+	"""
+		Types of row making up each GSP block of the worksheet
+	"""
+	units = 0
+	header = 1
+	gsp = 2
+	aggregate = 3
+	generation_bsp = 4
+	power_factor = 5
+	primary = 6
+	committed = 7
+	generation = 8
+
+	# Rows at the start of each GSP block (the first block does not repeat the units and header rows) followed by the
+	# rows for each primary
+	gsp_rows = (units, header, gsp, aggregate, generation_bsp, power_factor)
+	primary_rows = (primary, committed, generation)
+
+
+def synthetic_headers(bus_columns=BUS_COLUMNS, forecast_years=FORECAST_YEARS, start_year=START_YEAR):
+	"""
+		Function returns the column headers as they appear in the worksheet (before common.clean_raw_load_estimates)
+	:param int bus_columns:  (optional) Number of PSS/E bus columns
+	:param int forecast_years:  (optional) Number of forecast years
+	:param int start_year:  (optional) First year of the forecast
+	:return list headers:
+	"""
+	headers = [
+		common.Headers.gsp, common.Headers.nrn, common.Headers.name, common.Headers.voltage, 'TX Details',
+		'Firm Capacity', 'Date & time of  Peak', '{} / {} Peak (MW)'.format(start_year, str(start_year + 1)[2:]),
+		'ACS Corr. Factor', 'Historic Trend', 'Forecasting'
+	]
+	headers += ['{} / {}'.format(start_year + n, start_year + n + 1) for n in range(forecast_years)]
+	headers += ['Commentary', 'Spring/\nAutumn', common.Headers.summer, common.Headers.min_demand]
+	headers += ['PSS/E \nBus #{}'.format(n + 1) for n in range(bus_columns)]
+	headers += ['{}/{} Peak (MW)'.format(start_year - 1, str(start_year)[2:]), 'Change']
+
+	return headers
+
+
+def synthetic_sheet(
+		n_gsp=BASE_GSPS, primaries_per_gsp=PRIMARIES_PER_GSP, bus_columns=BUS_COLUMNS, missing_rate=MISSING_RATE,
+		forecast_years=FORECAST_YEARS, start_year=START_YEAR, seed=SEED, missing_aggregates=()):
+	"""
+		Function produces a synthetic load estimate worksheet as it would be read by common.import_raw_load_estimates
+		before it is cleaned.  Each GSP block contains the GSP, aggregate, generation and power factor rows followed by
+		the primary, committed connections (bus percentages) and generation rows for each primary.
+	:param int n_gsp:  (optional) Number of GSPs
+	:param int primaries_per_gsp:  (optional) Number of primaries below each GSP
+	:param int bus_columns:  (optional) Number of PSS/E bus columns
+	:param float missing_rate:  (optional) Proportion of the loads, season loads and bus percentages which are missing
+	:param int forecast_years:  (optional) Number of forecast years, must be at least 2
+	:param int start_year:  (optional) First year of the forecast
+	:param int seed:  (optional) Seed for the random numbers so the same load estimate is always produced
+	:param tuple missing_aggregates:  (optional) Numbers of the GSPs whose aggregate row has no loads, these GSPs take
+										the diversity factor of the GSP before them
+	:return pd.DataFrame df_sheet:
+	"""
+	if forecast_years < 2:
+		raise ValueError('At least 2 forecast years are required, {} given'.format(forecast_years))
+	rng = np.random.RandomState(seed)
+	headers = synthetic_headers(bus_columns=bus_columns, forecast_years=forecast_years, start_year=start_year)
+
+	# Kind of each row, GSP number and primary number (within the whole load estimate) of each row
+	block_kinds = np.array(RowKind.gsp_rows + RowKind.primary_rows * primaries_per_gsp)
+	kinds = np.tile(block_kinds, n_gsp)[2:] if n_gsp else np.array([], int)
+	n_rows = len(kinds)
+	gsp_no = np.cumsum(kinds == RowKind.gsp) - 1
+	primary_no = np.cumsum(kinds == RowKind.primary) - 1
+	is_kind = {x: kinds == x for x in np.unique(kinds)} if n_rows else {}
+
+	def column():
+		return np.full(n_rows, np.nan, dtype=object)
+
+	def assign(values, kind, data):
+		idx = is_kind.get(kind, np.zeros(n_rows, dtype=bool))
+		values[idx] = data[idx] if isinstance(data, np.ndarray) else data
+
+	def with_missing(data):
+		data = data.astype(float)
+		data[rng.random_sample(data.shape) < missing_rate] = np.nan
+		return data
+
+	def date_times(size):
+		minutes = rng.randint(0, 365 * 24 * 60, size=size).astype('timedelta64[m]')
+		# Converted to datetime.datetime objects as they would be read from the worksheet
+		return (np.datetime64('{}-04-01'.format(start_year), 'm') + minutes).astype('datetime64[us]').astype(object)
+
+	columns = {x: column() for x in headers}
+	header_row = np.array(headers, dtype=object)
+	for n, x in enumerate(headers):
+		assign(columns[x], RowKind.header, header_row[n])
+
+	# Substation details
+	gsp_names = np.array(['GSP {:05d}'.format(x) for x in range(n_gsp)], dtype=object)
+	primary_names = np.array(['PRIMARY {:06d}'.format(x) for x in range(n_gsp * primaries_per_gsp)], dtype=object)
+	assign(columns[headers[0]], RowKind.gsp, gsp_names[gsp_no])
+	assign(columns[headers[1]], RowKind.gsp, (100 + gsp_no).astype(object))
+	assign(columns[headers[1]], RowKind.primary, (10000 + primary_no).astype(object))
+	assign(columns[headers[2]], RowKind.primary, primary_names[primary_no] if len(primary_names) else None)
+	assign(columns[headers[2]], RowKind.generation, 'Generation at this s/stn:')
+	assign(columns[headers[3]], RowKind.gsp, '132/33')
+	assign(columns[headers[3]], RowKind.primary, '33/11')
+	assign(columns[headers[3]], RowKind.generation_bsp, 'Generation at BSP:')
+	assign(columns[headers[4]], RowKind.gsp, '2 x 60')
+	assign(columns[headers[4]], RowKind.primary, '1 x 5')
+
+	# Date and time of the peak and the peak load
+	peak_dates = date_times(n_rows)
+	for kind in (RowKind.gsp, RowKind.aggregate, RowKind.primary, RowKind.committed):
+		assign(columns[headers[6]], kind, peak_dates)
+	assign(columns[headers[6]], RowKind.power_factor, 'Power Factor:')
+	assign(columns[headers[8]], RowKind.gsp, 1)
+	assign(columns[headers[8]], RowKind.primary, 1)
+	trend = np.array(['H', 'L', 0], dtype=object)[rng.randint(0, 3, size=n_rows)]
+	assign(columns[headers[9]], RowKind.primary, trend)
+	assign(columns[headers[10]], RowKind.primary, trend)
+	assign(columns[headers[10]], RowKind.gsp, 'Diverse')
+	assign(columns[headers[10]], RowKind.aggregate, 'Aggregate')
+	assign(columns[headers[10]], RowKind.power_factor, 'Div. (MW)')
+
+	# Forecast loads, the primary loads grow each year and the GSP aggregate load is the sum of its primaries
+	years = headers[11:11 + forecast_years]
+	primary_loads = rng.uniform(1, 20, size=(n_gsp * primaries_per_gsp, 1)) * np.cumprod(
+		rng.uniform(1, 1.03, size=(n_gsp * primaries_per_gsp, forecast_years)), axis=1)
+	aggregate_loads = primary_loads.reshape(n_gsp, primaries_per_gsp, forecast_years).sum(axis=1)
+	diversity = rng.uniform(0.8, 1.0, size=(n_gsp, 1))
+	gsp_loads = aggregate_loads * diversity
+	primary_loads_missing = with_missing(primary_loads)
+	gsp_loads_missing = with_missing(gsp_loads)
+	aggregate_loads_missing = aggregate_loads.copy()
+	aggregate_loads_missing[list(missing_aggregates)] = np.nan
+	for n, x in enumerate(years):
+		assign(columns[x], RowKind.primary, primary_loads_missing[primary_no, n].astype(object))
+		assign(columns[x], RowKind.gsp, gsp_loads_missing[gsp_no, n].astype(object))
+		assign(columns[x], RowKind.aggregate, aggregate_loads_missing[gsp_no, n].astype(object))
+		assign(columns[x], RowKind.power_factor, (gsp_loads[gsp_no, n] * 0.98).astype(object))
+	assign(columns[years[0]], RowKind.units, 'Average Cold Spell (ACS) (MVA)')
+	assign(columns[years[0]], RowKind.committed, 'Committed new connections:')
+	generation_column = min(6, forecast_years - 2)
+	assign(columns[years[generation_column]], RowKind.generation_bsp, 'Generation at time of BSP peak:')
+	assign(columns[years[generation_column]], RowKind.generation, 'Generation at time of peak:')
+	generation = rng.uniform(0, 2, size=n_rows).astype(object)
+	assign(columns[years[generation_column + 1]], RowKind.generation_bsp, generation)
+	assign(columns[years[generation_column + 1]], RowKind.generation, generation)
+
+	peak = np.where(kinds == RowKind.gsp, gsp_loads[gsp_no, 0] if n_gsp else 0, 0)
+	peak = np.where(kinds == RowKind.primary, primary_loads[primary_no, 0] if primary_no.size else 0, peak)
+	assign(columns[headers[7]], RowKind.gsp, peak.astype(object))
+	assign(columns[headers[7]], RowKind.primary, peak.astype(object))
+	assign(columns[headers[7]], RowKind.power_factor, 0.98)
+	diversity_text = np.array(['Diversity/Losses: {:.3f}'.format(1 / x) for x in diversity[:, 0]], dtype=object)
+	assign(columns['Commentary'], RowKind.gsp, diversity_text[gsp_no] if n_gsp else None)
+	last_peak = peak * rng.uniform(0.9, 1.1, size=n_rows)
+	for kind in (RowKind.gsp, RowKind.primary):
+		assign(columns[headers[-2]], kind, last_peak.astype(object))
+		assign(columns[headers[-1]], kind, (peak - last_peak).astype(object))
+
+	# Season loads, a proportion of the peak for the GSP and primary rows and in MW for the rows below
+	seasons = headers[11 + forecast_years + 1:11 + forecast_years + 4]
+	season_proportions = with_missing(rng.uniform(0, 1, size=(n_rows, len(seasons))))
+	season_proportions[rng.random_sample(season_proportions.shape) < missing_rate] = 0
+	for n, x in enumerate(seasons):
+		for kind in (RowKind.gsp, RowKind.primary):
+			assign(columns[x], kind, season_proportions[:, n].astype(object))
+		season_loads = (np.roll(season_proportions[:, n], 1) * np.roll(peak, 1)).astype(object)
+		assign(columns[x], RowKind.aggregate, season_loads)
+		assign(columns[x], RowKind.committed, season_loads)
+		season_dates = date_times(n_rows)
+		assign(columns[x], RowKind.generation_bsp, season_dates)
+		assign(columns[x], RowKind.generation, season_dates)
+
+	# PSS/E bus numbers for the GSP and primary rows and the percentage of the load on each bus in the row below
+	buses = headers[-2 - bus_columns:-2]
+	# GSPs have a single bus and most primaries have one or two
+	bus_count = np.where(kinds == RowKind.primary, rng.randint(1, min(bus_columns, 2) + 1, size=n_rows), 1)
+	has_bus = np.arange(bus_columns)[np.newaxis, :] < bus_count[:, np.newaxis]
+	bus_numbers = 80000 + np.arange(n_rows)[:, np.newaxis] * bus_columns + np.arange(bus_columns)[np.newaxis, :]
+	shares = rng.uniform(0.1, 1, size=(n_rows, bus_columns)) * has_bus
+	shares = shares / shares.sum(axis=1, keepdims=True)
+	shares = np.where(has_bus, with_missing(shares), 0)
+	# Percentages are in the row below the bus numbers
+	shares = np.roll(shares, 1, axis=0)
+	has_bus_above = np.roll(has_bus, 1, axis=0)
+	for n, x in enumerate(buses):
+		numbers = column()
+		numbers[has_bus[:, n]] = bus_numbers[has_bus[:, n], n].astype(object)
+		for kind in (RowKind.gsp, RowKind.primary):
+			assign(columns[x], kind, numbers)
+		percentages = np.where(has_bus_above[:, n], shares[:, n], 0).astype(object)
+		for kind in (RowKind.aggregate, RowKind.committed):
+			assign(columns[x], kind, percentages)
+
+	df_sheet = pd.DataFrame(columns, columns=headers)
+
+	return df_sheet
+
+
+def synthetic_raw_load_estimates(scale=1, **kwargs):
+	"""
+		Function produces a synthetic raw load estimate (as returned by common.import_raw_load_estimates) with scale
+		times the number of GSPs in the example load estimate
+	:param float scale:  (optional) Multiple of the size of the example load estimate
+	:param kwargs:  Other arguments passed to synthetic_sheet
+	:return pd.DataFrame df_raw:
+	"""
+	kwargs.setdefault('n_gsp', int(round(BASE_GSPS * scale)))
+
+	return common.clean_raw_load_estimates(df_raw=synthetic_sheet(**kwargs))
+
+
+def write_synthetic_workbook(pth_workbook, df_sheet, sheet_name=SHEET_NAME, start_year=START_YEAR):
+	"""
+		Function writes a synthetic worksheet to a workbook with the two title rows above the headers so it can be
+		read by common.import_raw_load_estimates
+	:param str pth_workbook:  Full path to the workbook
+	:param pd.DataFrame df_sheet:  Worksheet produced by synthetic_sheet
+	:param str sheet_name:  (optional) Name of the worksheet
+	:param int start_year:  (optional) First year of the forecast
+	:return None:
+	"""
+	if len(df_sheet.index) + 3 > EXCEL_MAX_ROWS:
+		raise ValueError('{} rows do not fit in a worksheet'.format(len(df_sheet.index)))
+
+	workbook = xlsxwriter.Workbook(pth_workbook, {'constant_memory': True, 'default_date_format': 'dd/mm/yyyy hh:mm'})
+	worksheet = workbook.add_worksheet(sheet_name)
+	first_year = df_sheet.columns.get_loc('{} / {}'.format(start_year, start_year + 1))
+	worksheet.write(0, 0, 'SHEPD')
+	worksheet.write(0, first_year, '{} / {}'.format(start_year, str(start_year + 1)[2:]))
+	worksheet.write(1, first_year, 'Average Cold Spell (ACS) (MVA)')
+	worksheet.write_row(2, 0, list(df_sheet.columns))
+	# Rows are written in order as required by constant memory mode and empty cells are skipped
+	for row_num, row in enumerate(df_sheet.itertuples(index=False, name=None), start=3):
+		for col_num, value in enumerate(row):
+			if isinstance(value, float) and np.isnan(value):
+				continue
+			worksheet.write(row_num, col_num, value)
+	workbook.close()
+
+	return None
+
+
+def run_benchmark(scales=SCALES, repeat=REPEAT, time_import=TIME_IMPORT, trace_memory=False, **kwargs):
+	"""
+		Function times each stage of the processing (see DataFrame_Approach.LoadEstimatePipeline) for synthetic load
+		estimates at each scale.  The stages are grouped by scale in the profile.
+	:param tuple scales:  (optional) Multiples of the size of the example load estimate
+	:param int repeat:  (optional) Number of times the processing is repeated at each scale
+	:param bool time_import:  (optional) If True then a workbook is written and the time to import it is included
+	:param bool trace_memory:  (optional) If True then the peak memory of each stage is traced, this slows the stages
+	:param kwargs:  Other arguments passed to synthetic_sheet
+	:return stage_profiler.StageProfiler profiler:
+	"""
+	profiler = stage_profiler.StageProfiler(trace_memory=trace_memory)
+	pipeline = approach.LoadEstimatePipeline()
+	for scale in scales:
+		group = 'x{}'.format(scale)
+		kwargs['n_gsp'] = int(round(BASE_GSPS * scale))
+		df_sheet = profiler.call(name='synthetic_sheet', func=synthetic_sheet, group=group, **kwargs)
+
+		if time_import and len(df_sheet.index) + 3 <= EXCEL_MAX_ROWS:
+			pth_workbook = common.get_local_file_path(file_name='benchmark_{}.xlsx'.format(group))
+			write_synthetic_workbook(pth_workbook=pth_workbook, df_sheet=df_sheet)
+			# Read directly rather than through the cache so the parsing is timed
+			reader = getattr(common.import_raw_load_estimates, '__wrapped__', common.import_raw_load_estimates)
+			df_raw = profiler.call(
+				name='import_raw_load_estimates', func=reader, group=group, pth_load_est=pth_workbook)
+			os.remove(pth_workbook)
+		else:
+			df_raw = common.clean_raw_load_estimates(df_raw=df_sheet)
+		del df_sheet
+
+		for _ in range(repeat):
+			pipeline.run(df_raw=df_raw, profiler=profiler, group=group)
+
+	return profiler
+
+
+def benchmark_summary(profiler):
+	"""
+		Function returns the mean wall time of each stage at each scale along with the end to end time of the
+		processing, which is the sum of the stages
+	:param stage_profiler.StageProfiler profiler:  Profiler returned by run_benchmark
+	:return pd.DataFrame df_summary:  Stages as rows and scales as columns
+	"""
+	df = profiler.to_dataframe()
+	df_summary = df.groupby(['name', 'group'])['wall_time'].mean().unstack('group')
+	# Stages and scales kept in the order they were run
+	df_summary = df_summary.loc[df['name'].unique(), df['group'].unique()]
+
+	stage_names = [x[0] for x in approach.LoadEstimatePipeline().stages()]
+	df_summary.loc['end_to_end'] = df_summary.loc[[x for x in stage_names if x in df_summary.index]].sum()
+
+	return df_summary
+
+
+if __name__ == '__main__':
+	benchmark_profiler = run_benchmark()
+	benchmark_profiler.write_json(pth_file=common.get_local_file_path(file_name=BENCHMARK_JSON_NAME))
+	benchmark_profiler.write_csv(pth_file=common.get_local_file_path(file_name=BENCHMARK_CSV_NAME))
+	print(benchmark_summary(profiler=benchmark_profiler))
@@ -0,0 +1,350 @@
+"""
+#######################################################################################################################
+###											Chunked Processing														###
+###																													###
+###		Processing of a large load estimate split into partitions along GSP block boundaries.  The steps which		###
+###		only look at the rows of a GSP block (including the row below lookups) are run on each partition in a		###
+###		local pool of processes, the season quantiles depend on all of the rows so each partition returns a summary	###
+###		of its season loads (or a quantile sketch of them) which are merged before the missing season loads are	###
+###		filled.																										###
+###																													###
+#######################################################################################################################
+"""
+
+# Generic Imports
+import collections
+import concurrent.futures
+import os
+import tempfile
+import pandas as pd
+import numpy as np
+
+# Unique imports
+import common_functions as common
+import DataFrame_Approach as approach
+import incremental
+import output_formats as output
+
+# Target number of rows in each partition, partitions only end at the start of a GSP block so may be larger
+PARTITION_ROWS = 50000
+
+# Number of partitions which can be waiting for or being processed by each process, this limits how much of the load
+# estimate is held in memory at once
+PENDING_PER_PROCESS = 2
+
+
+def partition_bounds(df_raw, partition_rows=PARTITION_ROWS, per_year=False):
+	"""
+		Function splits the rows of a raw load estimate into partitions which start at the first row of a GSP block.
+		A partition never starts at a block which depends on the block before it (see
+		DataFrame_Approach.independent_block_ids), i.e. a GSP without an aggregate demand.
+	:param pd.DataFrame df_raw:  Raw load estimate
+	:param int partition_rows:  (optional) Target number of rows in each partition
+	:param bool per_year:  (optional) PipelineConfig.diversity_per_year
+	:return list bounds:  (start, end) position of the rows in each partition
+	"""
+	block_ids = approach.independent_block_ids(df_raw=df_raw, per_year=per_year)
+	n_rows = len(block_ids)
+	if n_rows == 0:
+		return []
+	starts = np.flatnonzero(np.r_[True, block_ids[1:] != block_ids[:-1]])
+
+	# Each partition ends at the first block which starts on or after the next multiple of partition_rows
+	targets = np.arange(partition_rows, n_rows, partition_rows)
+	idx = np.searchsorted(starts, targets)
+	cuts = np.unique(starts[idx[idx < len(starts)]])
+	cuts = np.r_[0, cuts[cuts > 0], n_rows].astype(int)
+
+	return list(zip(cuts[:-1], cuts[1:]))
+
+
+def frame_partitions(df_raw, partition_rows=PARTITION_ROWS, per_year=False):
+	"""
+		Generator which yields the partitions of a raw load estimate which has already been read (see partition_bounds)
+	:param pd.DataFrame df_raw:  Raw load estimate
+	:param int partition_rows:  (optional) Target number of rows in each partition
+	:param bool per_year:  (optional) PipelineConfig.diversity_per_year
+	:return pd.DataFrame df_partition:
+	"""
+	for start, end in partition_bounds(df_raw=df_raw, partition_rows=partition_rows, per_year=per_year):
+		yield df_raw.iloc[start:end]
+
+
+def starts_group(df_before, df_block, per_year=False):
+	"""
+		Function returns True if a GSP block can be processed separately from the block before it (see
+		DataFrame_Approach.independent_block_ids)
+	:param pd.DataFrame df_before:  Block before
+	:param pd.DataFrame df_block:  Block
+	:param bool per_year:  (optional) PipelineConfig.diversity_per_year
+	:return bool starts_group:
+	"""
+	if df_before.empty or df_block.empty:
+		return True
+	group_ids = approach.independent_block_ids(df_raw=pd.concat([df_before, df_block], sort=False), per_year=per_year)
+
+	return group_ids[len(df_before.index)] != group_ids[len(df_before.index) - 1]
+
+
+def block_partitions(blocks, partition_rows=PARTITION_ROWS, per_year=False):
+	"""
+		Generator which combines GSP blocks (i.e. from common.iter_load_estimate_blocks) into partitions as they are
+		read, so only one partition is held at a time.  A block which depends on the block before it (see
+		DataFrame_Approach.independent_block_ids) is always added to the same partition.
+	:param iterable blocks:  DataFrame of each GSP block in order
+	:param int partition_rows:  (optional) Target number of rows in each partition
+	:param bool per_year:  (optional) PipelineConfig.diversity_per_year
+	:return pd.DataFrame df_partition:
+	"""
+	partition = []
+	n_rows = 0
+	for df_block in blocks:
+		if n_rows >= partition_rows and starts_group(df_before=partition[-1], df_block=df_block, per_year=per_year):
+			yield pd.concat(partition, sort=False)
+			partition = []
+			n_rows = 0
+		partition.append(df_block)
+		n_rows += len(df_block.index)
+
+	if partition:
+		yield pd.concat(partition, sort=False)
+
+
+def bounded_map(func, args_iter, processes=None):
+	"""
+		Generator which runs func for each set of arguments in a local pool of processes and yields the results in the
+		same order.  The arguments are only taken from args_iter as processes become free so that no more than
+		PENDING_PER_PROCESS tasks for each process are held at once.
+	:param function func:  Function to run, must be defined at the top of a module so it can be sent to the processes
+	:param iterable args_iter:  Tuple of the arguments for each call of func
+	:param int processes:  (optional) Number of processes to use, defaults to the number of CPUs and if 1 then func is
+							run in this process
+	:return result:  Value returned by func for each set of arguments
+	"""
+	if processes == 1:
+		for args in args_iter:
+			yield func(*args)
+		return
+
+	max_pending = PENDING_PER_PROCESS * (processes or os.cpu_count() or 1)
+	with concurrent.futures.ProcessPoolExecutor(max_workers=processes) as executor:
+		pending = collections.deque()
+		for args in args_iter:
+			pending.append(executor.submit(func, *args))
+			if len(pending) >= max_pending:
+				yield pending.popleft().result()
+		while pending:
+			yield pending.popleft().result()
+
+
+def process_partition(df_raw, config):
+	"""
+		Function runs the processing steps which only depend on the rows of each GSP block on a partition and
+		summarises its season loads, this is run in the worker processes
+	:param pd.DataFrame df_raw:  Partition of the raw load estimate
+	:param approach.PipelineConfig config:
+	:return (pd.DataFrame, dict) result:  Processed partition and the summary of its season loads
+	"""
+	df = df_raw.copy()
+	for _, stage in incremental.block_stages(pipeline=approach.LoadEstimatePipeline(config=config)):
+		df = stage(df_raw=df)
+
+	return df, common.season_summary(df_raw=df, sketch_error=config.season_sketch_error)
+
+
+def process_partition_to_file(df_raw, config, pth_spill):
+	"""
+		Function processes a partition (see process_partition) and writes the result to a file so that it does not need
+		to be sent back to the main process, this is run in the worker processes
+	:param pd.DataFrame df_raw:  Partition of the raw load estimate
+	:param approach.PipelineConfig config:
+	:param str pth_spill:  Full path to the file the processed partition is written to
+	:return (dict, pd.DataFrame) result:  Summary of the season loads and an empty DataFrame with the columns of the
+											processed partition
+	"""
+	df, summary = process_partition(df_raw=df_raw, config=config)
+	df.to_pickle(pth_spill)
+
+	return summary, df.iloc[:0]
+
+
+def apply_global_stages(df_raw, config, season_fill):
+	"""
+		Function runs the processing steps which depend on all of the GSP blocks (incremental.GLOBAL_STAGES) using the
+		season fill values found from the whole load estimate
+	:param pd.DataFrame df_raw:  Processed partition or combined partitions
+	:param approach.PipelineConfig config:
+	:param common.SeasonFill season_fill:  Season fill values, None if the season loads are not filled
+	:return pd.DataFrame df_out:
+	"""
+	df = df_raw
+	for name, stage in approach.LoadEstimatePipeline(config=config).stages():
+		if name not in incremental.GLOBAL_STAGES:
+			continue
+		if name == 'season_load_filler':
+			if season_fill is not None:
+				df = season_fill.for_dataframe(df_raw=df).apply(df_raw=df)
+		else:
+			df = stage(df_raw=df)
+
+	return df
+
+
+def finish_partition(pth_spill, config, season_fill, file_name, output_format, output_dir):
+	"""
+		Function runs the global processing steps on a processed partition written by process_partition_to_file and
+		writes the result, this is run in the worker processes
+	:param str pth_spill:  Full path to the processed partition, the file is deleted once it has been read
+	:param approach.PipelineConfig config:
+	:param common.SeasonFill season_fill:  Season fill values, None if the season loads are not filled
+	:param str file_name:  File name to write the partition to
+	:param str output_format:  Format to write the partition in (see output_formats.OutputFormat)
+	:param str output_dir:  Folder to write the partition to
+	:return str file_pth:  Full path to the file written
+	"""
+	df = pd.read_pickle(pth_spill)
+	os.remove(pth_spill)
+	df = apply_global_stages(df_raw=df, config=config, season_fill=season_fill)
+
+	return output.write_output(df=df, file_name=file_name, output_format=output_format, output_dir=output_dir)
+
+
+class ChunkedPipeline:
+	"""
+		Processes a raw load estimate with the steps of DataFrame_Approach.LoadEstimatePipeline with the data split
+		into partitions along GSP block boundaries which are processed in a local pool of processes.  Blocks which
+		depend on the block before them are kept in the same partition (see partition_bounds) so the result is the
+		same as processing the whole load estimate unless the season quantiles are approximated by sketches (see
+		PipelineConfig.season_sketch_error).
+	"""
+	def __init__(self, config=None, processes=None, partition_rows=PARTITION_ROWS):
+		"""
+		:param approach.PipelineConfig config:  (optional) Configuration, defaults to all filling turned on
+		:param int processes:  (optional) Number of processes to use, defaults to the number of CPUs and if 1 then the
+								partitions are processed one after the other in this process
+		:param int partition_rows:  (optional) Target number of rows in each partition
+		"""
+		self.pipeline = approach.LoadEstimatePipeline(config=config)
+		self.config = self.pipeline.config
+		self.processes = processes
+		self.partition_rows = partition_rows
+		# Number of partitions in the last run
+		self.stats = {'partitions': 0}
+
+	def season_fill(self, summaries, df_empty):
+		"""
+			Function merges the season summaries of the partitions and finds the season fill values from them
+		:param list summaries:  Season summary of each partition (see common.season_summary)
+		:param pd.DataFrame df_empty:  Empty DataFrame with the columns of the processed partitions
+		:return common.SeasonFill season_fill:  None if the season loads are not filled
+		"""
+		if not self.config.fill_seasons:
+			return None
+		available_values = common.merge_season_summaries(summaries=summaries)
+
+		return common.season_quantiles(
+			df_raw=df_empty, quantiles=self.config.season_quantiles, available_values=available_values)
+
+	def run(self, df_raw):
+		"""
+			Processes a raw load estimate which has already been read and returns the combined result, the whole load
+			estimate is held in memory (see run_streaming to process a load estimate which does not fit in memory).
+			The DataFrame passed in is not changed.
+		:param pd.DataFrame df_raw: Raw load estimate (as returned by common.import_raw_load_estimates)
+		:return pd.DataFrame df_out:  Output DataFrame after processing
+		"""
+		partitions = frame_partitions(
+			df_raw=df_raw, partition_rows=self.partition_rows, per_year=self.config.diversity_per_year)
+		results = list(bounded_map(
+			func=process_partition, args_iter=((x, self.config) for x in partitions), processes=self.processes))
+		self.stats = {'partitions': len(results)}
+		if not results:
+			return self.pipeline.run(df_raw=df_raw)
+
+		df_out = pd.concat([x[0] for x in results], sort=False)
+		season_fill = self.season_fill(summaries=[x[1] for x in results], df_empty=df_out.iloc[:0])
+
+		return apply_global_stages(df_raw=df_out, config=self.config, season_fill=season_fill)
+
+	def run_streaming(
+			self, blocks, output_dir, file_name=common.excel_file_names.df_raw_excel_name,
+			output_format=output.OUTPUT_FORMAT):
+		"""
+			Processes a load estimate read a GSP block at a time (i.e. common.iter_load_estimate_blocks) without ever
+			combining it.  The partitions are processed as they are read and each processed partition is written to
+			a temporary file in output_dir.  Once the season summaries of all partitions have been merged, each
+			partition is finished and written to its own file.  Only PENDING_PER_PROCESS partitions for each process and
+			the season summaries are held in memory, the summaries have a fixed size if
+			PipelineConfig.season_sketch_error is set.  The dtypes are normalised for each partition separately.
+		:param iterable blocks:  DataFrame of each GSP block in order
+		:param str output_dir:  Folder to write the processed partitions to
+		:param str file_name:  (optional) File name of the processed partitions, the partition number is added to each
+		:param str output_format:  (optional) Format to write the partitions in (see output_formats.OutputFormat)
+		:return list file_pths:  Full path to the file of each partition in order
+		"""
+		os.makedirs(output_dir, exist_ok=True)
+		stem = os.path.splitext(file_name)[0]
+		with tempfile.TemporaryDirectory(dir=output_dir) as spill_dir:
+			spill_files = []
+
+			def spill_args():
+				partitions = block_partitions(
+					blocks=blocks, partition_rows=self.partition_rows, per_year=self.config.diversity_per_year)
+				for n, df_partition in enumerate(partitions):
+					spill_files.append(os.path.join(spill_dir, 'partition_{:05d}.pkl'.format(n)))
+					yield df_partition, self.config, spill_files[-1]
+
+			# First phase processes the GSP blocks of each partition and summarises its season loads
+			results = list(bounded_map(func=process_partition_to_file, args_iter=spill_args(), processes=self.processes))
+			self.stats = {'partitions': len(results)}
+			if not results:
+				return []
+
+			# Second phase fills the season loads from the merged summaries and writes each partition
+			season_fill = self.season_fill(summaries=[x[0] for x in results], df_empty=results[0][1])
+			file_pths = list(bounded_map(
+				func=finish_partition,
+				args_iter=(
+					(x, self.config, season_fill, '{}_{:05d}'.format(stem, n), output_format, output_dir)
+					for n, x in enumerate(spill_files)),
+				processes=self.processes))
+
+		return file_pths
+
+
+def run(df_raw, config=None, processes=None, partition_rows=PARTITION_ROWS):
+	"""
+		Function processes a raw load estimate in partitions (see ChunkedPipeline)
+	:param pd.DataFrame df_raw: Raw load estimate (as returned by common.import_raw_load_estimates)
+	:param approach.PipelineConfig config:  (optional) Configuration, if a bool then all filling is turned on or off
+	:param int processes:  (optional) Number of processes to use, defaults to the number of CPUs
+	:param int partition_rows:  (optional) Target number of rows in each partition
+	:return pd.DataFrame df_out:  Output DataFrame after processing
+	"""
+	if isinstance(config, bool):
+		config = approach.PipelineConfig.from_fill(fill=config)
+
+	return ChunkedPipeline(config=config, processes=processes, partition_rows=partition_rows).run(df_raw=df_raw)
+
+
+def run_workbook(
+		pth_load_est, output_dir, config=None, processes=None, partition_rows=PARTITION_ROWS,
+		output_format=output.OUTPUT_FORMAT):
+	"""
+		Function processes a load estimate workbook a GSP block at a time (see ChunkedPipeline.run_streaming) so the
+		workbook never needs to be held in memory
+	:param str pth_load_est:  Full path to the load estimate workbook
+	:param str output_dir:  Folder to write the processed partitions to
+	:param approach.PipelineConfig config:  (optional) Configuration, if a bool then all filling is turned on or off
+	:param int processes:  (optional) Number of processes to use, defaults to the number of CPUs
+	:param int partition_rows:  (optional) Target number of rows in each partition
+	:param str output_format:  (optional) Format to write the partitions in (see output_formats.OutputFormat)
+	:return list file_pths:  Full path to the file of each partition in order
+	"""
+	if isinstance(config, bool):
+		config = approach.PipelineConfig.from_fill(fill=config)
+	pipeline = ChunkedPipeline(config=config, processes=processes, partition_rows=partition_rows)
+
+	return pipeline.run_streaming(
+		blocks=common.iter_load_estimate_blocks(pth_load_est=pth_load_est), output_dir=output_dir,
+		output_format=output_format)
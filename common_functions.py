@@ -11,9 +11,18 @@
 # Generic Imports
 import os
 import re
+import collections
+import functools
+import warnings
 import pandas as pd
 import numpy as np
+import openpyxl
+from openpyxl.cell.cell import ERROR_CODES
 from scipy import interpolate
+from pandas.io.parsers import TextParser
+# Unique imports
+from workbook_cache import cached_import, default_cache
+import quantile_sketch
 
 
 # Meta Data
@@ -26,6 +35,7 @@ __status__ = 'Alpha'
 from pandas import DataFrame
 
 
+@cached_import
 def import_raw_load_estimates(pth_load_est, sheet_name='MASTER Based on SubstationLoad'):
 	"""
 		Function imports the raw load estimate into a DataFrame with no processing of the data
@@ -42,6 +52,17 @@ def import_raw_load_estimates(pth_load_est, sheet_name='MASTER Based on Substati
 		header=0
 	)
 
+	df_raw = clean_raw_load_estimates(df_raw=df_raw)
+
+	return df_raw
+
+
+def clean_raw_load_estimates(df_raw):
+	"""
+		Function tidies up the raw load estimate DataFrame once it has been read from the worksheet
+	:param pd.DataFrame df_raw:  DataFrame as read from the worksheet
+	:return pd.DataFrame df_raw:
+	"""
 	# Remove any special characters from the column names (i.e. new line characters)
 	df_raw.columns = df_raw.columns.str.replace('\n', '')
 
@@ -61,6 +82,7 @@ def import_raw_load_estimates(pth_load_est, sheet_name='MASTER Based on Substati
 
 	return df_raw
 
+@cached_import
 def import_excel(pth_load_est, sheet_name='Sheet1'):
 	"""
 		Function imports an excel file with sheet1 as default sheet name - this is used for rereading the exported df to excel and continue codingn from \
@@ -85,6 +107,145 @@ def import_excel(pth_load_est, sheet_name='Sheet1'):
 	return df_raw
 
 
+# Cell values treated as missing when streaming a worksheet, these are the values and excel errors (i.e. #DIV/0!) that
+# pd.read_excel treats as NaN by default
+NA_VALUES = frozenset((
+	'', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN', '<NA>', 'N/A', 'NA',
+	'NULL', 'NaN', 'n/a', 'nan', 'null'
+)) | frozenset(ERROR_CODES)
+
+
+def iter_load_estimate_blocks(
+		pth_load_est, sheet_name='MASTER Based on SubstationLoad', skiprows=2, drop_empty_columns=True):
+	"""
+		Generator which reads the load estimate worksheet a row at a time and yields a DataFrame for each GSP block (the
+		GSP row, its aggregate row and all of the following Primary rows with their percentage rows) as soon as it has
+		been read, so only a single GSP block is held in memory at a time.  Any rows before the first GSP are yielded
+		as their own block.  The index continues from one block to the next and columns without a header are named
+		'Unnamed: n' as they are by pandas.  If drop_empty_columns is True then the columns with no values are found
+		by reading the worksheet once before the blocks are read (still one row at a time) and the blocks have the same
+		columns and values as import_raw_load_estimates.  Otherwise the worksheet is only read once and the empty
+		columns are kept.  The dtypes are inferred separately for each block so may differ from the full import.
+	:param str pth_load_est: Full path to file
+	:param str sheet_name:  (optional) Name of worksheet in load estimate
+	:param int skiprows:  (optional) Number of rows before the header row
+	:param bool drop_empty_columns:  (optional) If True then the columns with no values are not included
+	:return pd.DataFrame df_block:  DataFrame for each GSP block
+	"""
+	col_positions = None
+	if drop_empty_columns:
+		col_positions = non_empty_columns(pth_load_est=pth_load_est, sheet_name=sheet_name, skiprows=skiprows)
+
+	wb = openpyxl.load_workbook(filename=pth_load_est, read_only=True, data_only=True, keep_links=False)
+	try:
+		row_iter = wb[sheet_name].iter_rows(values_only=True)
+		# Skip first rows since they do not contain anything useful
+		for _ in range(skiprows):
+			next(row_iter, None)
+		header = next(row_iter, None)
+		if header is None:
+			return
+
+		all_columns = header_names(header=header)
+		if col_positions is None:
+			col_positions = list(range(len(all_columns)))
+		columns = [all_columns[n] for n in col_positions]
+
+		pos_gsp = columns.index(Headers.gsp)
+		pos_name = columns.index(Headers.name)
+		pos_voltage = columns.index(Headers.voltage)
+
+		rows = []
+		index = []
+		row_number = 0
+		for row in row_iter:
+			values = [cell_value(row=row, n=n) for n in col_positions]
+			# Remove empty rows
+			if all(x is None for x in values):
+				continue
+
+			# Same rule as DataFrame_Approach.determine_gsp_primary_flag, a new GSP starts a new block
+			is_gsp = values[pos_name] is None and values[pos_gsp] is not None and values[pos_voltage] is not None
+			if is_gsp and rows:
+				yield pd.DataFrame(data=rows, index=index, columns=columns)
+				rows = []
+				index = []
+
+			rows.append(values)
+			index.append(row_number)
+			row_number += 1
+
+		if rows:
+			yield pd.DataFrame(data=rows, index=index, columns=columns)
+	finally:
+		wb.close()
+
+
+def cell_value(row, n):
+	"""
+		Function returns the value of a cell in a row read by openpyxl, None if it is missing (see NA_VALUES)
+	:param tuple row:  Values of the row
+	:param int n:  Position of the cell
+	:return value:
+	"""
+	if n >= len(row) or row[n] in NA_VALUES:
+		return None
+
+	return row[n]
+
+
+def header_names(header):
+	"""
+		Function returns the column names for the header row of the worksheet in the same way as pandas.  Special
+		characters are removed, columns without a header are named 'Unnamed: n' and duplicate names are numbered.
+	:param tuple header:  Values of the header row
+	:return list columns:
+	"""
+	columns = []
+	for n, x in enumerate(header):
+		if x is None or x == '':
+			name = 'Unnamed: {}'.format(n)
+		else:
+			name = x.replace('\n', '') if isinstance(x, str) else x
+		unique_name = name
+		duplicate = 0
+		while unique_name in columns:
+			duplicate += 1
+			unique_name = '{}.{}'.format(name, duplicate)
+		columns.append(unique_name)
+
+	return columns
+
+
+def non_empty_columns(pth_load_est, sheet_name='MASTER Based on SubstationLoad', skiprows=2):
+	"""
+		Function reads the load estimate worksheet a row at a time and returns the positions of the columns which have
+		a value below the header row
+	:param str pth_load_est: Full path to file
+	:param str sheet_name:  (optional) Name of worksheet in load estimate
+	:param int skiprows:  (optional) Number of rows before the header row
+	:return list col_positions:
+	"""
+	wb = openpyxl.load_workbook(filename=pth_load_est, read_only=True, data_only=True, keep_links=False)
+	try:
+		row_iter = wb[sheet_name].iter_rows(values_only=True)
+		for _ in range(skiprows):
+			next(row_iter, None)
+		header = next(row_iter, None)
+		if header is None:
+			return []
+		# Only the columns which have not had a value yet are checked and reading stops once all of them have
+		empty = set(range(len(header)))
+		for row in row_iter:
+			empty.difference_update([n for n in empty if cell_value(row=row, n=n) is not None])
+			if not empty:
+				break
+	finally:
+		wb.close()
+
+	return [n for n in range(len(header)) if n not in empty]
+
+
 def adjust_years(headers_list):
 	"""
 		Function will find the headers which contain the years associated with the forecast so that they can be
@@ -101,12 +262,111 @@ def adjust_years(headers_list):
 	#  \s* = 0 or more spaces
 	#  [/] = / symbol
 	r = re.compile(r'(\d{4})\s*[/]\s*(\d{4})')
-	# The following extracts a list of all of the times the above is true
-	forecast_years = filter(r.match, headers_list)
+	# The following extracts a list of all of the times the above is true, returned as a list rather than a filter
+	# object so that it can be used more than once
+	forecast_years = list(filter(r.match, headers_list))
 
 	return forecast_years
 
 
+class ColumnLayout:
+	"""
+		Positional index of each group of columns in a load estimate DataFrame so that the processing steps can select
+		columns by position rather than searching the headers each time.  The groups added during processing
+		(aggregate, estimate, percentage and the diversity factor of each year) are named from the forecast years and
+		buses before they have been added, their positions are -1 until they are in the columns.  Use column_layout to
+		get the layout for a DataFrame.
+	"""
+	groups = ('forecast_years', 'aggregate', 'estimate', 'bus', 'percentage', 'seasons', 'Divers_Factor')
+
+	def __init__(self, columns):
+		"""
+		:param tuple columns:  Column headers of the DataFrame
+		"""
+		self.columns = pd.Index(columns)
+		forecast_years = adjust_years(headers_list=list(self.columns))
+		bus = [x for x in self.columns if str(x).startswith('PS')]
+
+		self.labels = {
+			'forecast_years': forecast_years,
+			Headers.aggregate: ['{}_{}'.format(Headers.aggregate, x) for x in forecast_years],
+			Headers.estimate: ['{}_{}'.format(Headers.estimate, x) for x in forecast_years],
+			'bus': bus,
+			Headers.percentage: ['{}_{}'.format(Headers.percentage, x) for x in bus],
+			'seasons': [x for x in (Headers.spring_autumn, Headers.summer, Headers.min_demand) if x in self.columns],
+			Headers.diverse_factor: ['{}_{}'.format(Headers.diverse_factor, x) for x in forecast_years],
+		}
+		self._positions = dict()
+		for group, labels in self.labels.items():
+			positions = self.columns.get_indexer(labels) if labels else np.array([], dtype=int)
+			positions.setflags(write=False)
+			self._positions[group] = positions
+
+	def has(self, group):
+		"""
+			Returns True if all of the columns in the group are in the DataFrame
+		:param str group:  One of ColumnLayout.groups
+		:return bool has_group:
+		"""
+		return bool((self._positions[group] >= 0).all())
+
+	def positions(self, group):
+		"""
+			Returns the positions of the columns in the group
+		:param str group:  One of ColumnLayout.groups
+		:return np.ndarray positions:
+		"""
+		if not self.has(group):
+			raise KeyError('Not all of the {} columns are in the DataFrame'.format(group))
+
+		return self._positions[group]
+
+
+@functools.lru_cache(maxsize=64)
+def layout_for_columns(columns):
+	"""
+		Returns the ColumnLayout for a tuple of column headers, the layout is only built once for each set of headers
+	:param tuple columns:
+	:return ColumnLayout layout:
+	"""
+	return ColumnLayout(columns=columns)
+
+
+def column_layout(df_raw):
+	"""
+		Returns the ColumnLayout of a DataFrame
+	:param pd.DataFrame df_raw:
+	:return ColumnLayout layout:
+	"""
+	return layout_for_columns(tuple(df_raw.columns))
+
+
+def forecast_blocks(df_raw):
+	"""
+		Function returns the forecast year columns with MultiIndex columns (kind, year) so that the diversified
+		(the original forecast years), aggregate and estimate loads can be selected without searching the headers,
+		i.e. df_blocks[Headers.aggregate].  Aggregate and estimate blocks are only included once they have been added.
+	:param pd.DataFrame df_raw:  Processed DataFrame
+	:return pd.DataFrame df_blocks:
+	"""
+	layout = column_layout(df_raw=df_raw)
+	forecast_years = layout.labels['forecast_years']
+
+	positions = []
+	keys = []
+	for kind in (Headers.diversified, Headers.aggregate, Headers.estimate):
+		group = 'forecast_years' if kind == Headers.diversified else kind
+		if not layout.has(group):
+			continue
+		positions.extend(layout.positions(group))
+		keys.extend((kind, x) for x in forecast_years)
+
+	df_blocks = df_raw.iloc[:, positions].copy()
+	df_blocks.columns = pd.MultiIndex.from_tuples(keys, names=['kind', 'year'])
+
+	return df_blocks
+
+
 def get_local_file_path(file_name):
 	"""
 		Function returns the full path to a file which is stored in the same directory as this script
@@ -141,6 +401,7 @@ class Headers:
 	diverse_factor = 'Divers_Factor'
 
 	# Header adjustments
+	diversified = 'diversified'
 	aggregate = 'aggregate'
 	percentage='percentage'
 	estimate='estimate'
@@ -148,17 +409,195 @@ class Headers:
 
 class Seasons:
 	"""
-		Headers used as part of the DataFrame
+		Default quantiles used to fill in the missing season loads
 	"""
 	spring_autumn_q = 75
 	summer_q=75
 	min_demand_q=25
-	gsp_spring_autumn_val = float
-	gsp_summer_val = float
-	gsp_min_demand_val = float
-	primary_spring_autumn_val = float
-	primary_summer_val = float
-	primary_min_demand_val = float
+
+
+class SeasonFill(collections.namedtuple('SeasonFill', ['seasons', 'quantiles', 'substation_types', 'values', 'fill_mask'])):
+	"""
+		Immutable result of season_quantiles
+		seasons:  Tuple of the season load columns
+		quantiles:  Tuple of the quantile used for each season
+		substation_types:  Tuple of the flag columns used to group the substations (i.e. Sub_GSP, Sub_Primary)
+		values:  Read only array (substation types x seasons) of the fill values
+		fill_mask:  Read only array (rows x seasons) which is True for each cell to be filled
+	"""
+	__slots__ = ()
+
+	def value(self, substation_type, season):
+		"""
+			Returns the fill value for a substation type and season
+		:param str substation_type:  i.e. Headers.sub_gsp
+		:param str season:  i.e. Headers.summer
+		:return float value:
+		"""
+		return self.values[self.substation_types.index(substation_type), self.seasons.index(season)]
+
+	def apply(self, df_raw):
+		"""
+			Fills in the cells identified by fill_mask with the fill value for the substation type of that row
+		:param pd.DataFrame df_raw:  DataFrame the fill values were calculated from
+		:return pd.DataFrame df_raw:
+		"""
+		cell_values = self.cell_values(df_raw=df_raw)
+		for n, season in enumerate(self.seasons):
+			df_raw.loc[self.fill_mask[:, n], season] = cell_values[self.fill_mask[:, n], n]
+
+		return df_raw
+
+	def for_dataframe(self, df_raw):
+		"""
+			Returns the season fill with the same fill values for the cells of another DataFrame, i.e. a partition of
+			the DataFrame the values were calculated from
+		:param pd.DataFrame df_raw:  Processed DataFrame including the substation flag columns
+		:return SeasonFill season_fill:
+		"""
+		season_values = df_raw[list(self.seasons)].apply(pd.to_numeric, errors='coerce').values.astype(float)
+		is_type = np.zeros(len(df_raw.index), dtype=bool)
+		for substation_type in self.substation_types:
+			is_type |= (df_raw[substation_type] == True).values
+		# Cells of the substations which are not available (NA or not greater than zero) are filled
+		fill_mask = is_type[:, np.newaxis] & ~(season_values > 0)
+		fill_mask.setflags(write=False)
+
+		return self._replace(fill_mask=fill_mask)
+
+	def cell_values(self, df_raw):
+		"""
+			Returns an array (rows x seasons) with the fill value for each cell to be filled and NaN elsewhere
+		:param pd.DataFrame df_raw:  DataFrame the fill values were calculated from
+		:return np.ndarray cell_values:
+		"""
+		cell_values = np.full(self.fill_mask.shape, np.nan)
+		for t, substation_type in enumerate(self.substation_types):
+			idx_type = (df_raw[substation_type] == True).values[:, np.newaxis] & self.fill_mask
+			cell_values = np.where(idx_type, self.values[t][np.newaxis, :], cell_values)
+
+		return cell_values
+
+
+def default_season_quantiles():
+	"""
+		Returns the quantile used for each season column by default
+	:return collections.OrderedDict quantiles:
+	"""
+	return collections.OrderedDict((
+		(Headers.spring_autumn, Seasons.spring_autumn_q),
+		(Headers.summer, Seasons.summer_q),
+		(Headers.min_demand, Seasons.min_demand_q)
+	))
+
+
+def season_available_values(df_raw, seasons=None):
+	"""
+		Function returns the available season loads (non zero and non NA) of the GSP and Primary substations.  The
+		quantiles of a DataFrame made up of several parts can be calculated exactly from the available values of each
+		part (see season_quantiles) so only these need to be kept for parts which have not changed.
+	:param pd.DataFrame df_raw:  Processed DataFrame including the substation flag columns
+	:param tuple seasons:  (optional) Season columns, defaults to the columns in default_season_quantiles
+	:return dict available_values:  Array of the available values for each (substation type, season)
+	"""
+	if seasons is None:
+		seasons = tuple(default_season_quantiles().keys())
+	season_values = df_raw[list(seasons)].apply(pd.to_numeric, errors='coerce').values.astype(float)
+	available = season_values > 0
+
+	available_values = dict()
+	for substation_type in (Headers.sub_gsp, Headers.sub_primary):
+		idx_type = (df_raw[substation_type] == True).values
+		for s, season in enumerate(seasons):
+			available_values[(substation_type, season)] = season_values[idx_type & available[:, s], s]
+
+	return available_values
+
+
+def season_summary(df_raw, sketch_error=None, seasons=None):
+	"""
+		Function returns the summary of the season loads needed to calculate the season quantiles, either the available
+		values (see season_available_values) or, if sketch_error is given, a quantile_sketch.QuantileSketch of them
+		which uses a fixed amount of memory however many rows there are.  The summaries of several parts can be
+		combined with merge_season_summaries.
+	:param pd.DataFrame df_raw:  Processed DataFrame including the substation flag columns
+	:param float sketch_error:  (optional) Rank error of the sketches, if None then the available values are returned
+	:param tuple seasons:  (optional) Season columns, defaults to the columns in default_season_quantiles
+	:return dict summary:  Available values or sketch for each (substation type, season)
+	"""
+	available_values = season_available_values(df_raw=df_raw, seasons=seasons)
+	if sketch_error is None:
+		return available_values
+
+	return {key: quantile_sketch.sketch_of(values=x, error=sketch_error) for key, x in available_values.items()}
+
+
+def merge_season_summaries(summaries):
+	"""
+		Function combines the season summaries (see season_summary) of several parts of a load estimate so that the
+		season quantiles can be found for the whole load estimate
+	:param list summaries:  Summary of each part
+	:return dict summary:
+	"""
+	keys = summaries[0].keys() if summaries else []
+	merged = dict()
+	for key in keys:
+		parts = [x[key] for x in summaries]
+		if isinstance(parts[0], quantile_sketch.QuantileSketch):
+			merged[key] = quantile_sketch.merge_sketches(sketches=parts)
+		else:
+			merged[key] = np.concatenate(parts)
+
+	return merged
+
+
+def season_quantiles(df_raw, quantiles=None, available_values=None):
+	"""
+		Function calculates the quantile values of the season loads for both GSP and Primary substations using the
+		available values (non zero and non NA) and identifies the cells which need to be filled with them.  Nothing is
+		stored globally so any number of fill configurations can be calculated at the same time.
+	:param pd.DataFrame df_raw:  Processed DataFrame including the substation flag columns
+	:param dict quantiles:  (optional) Quantile for each season column, defaults to the values in Seasons
+	:param dict available_values:  (optional) Available values or QuantileSketch for each (substation type, season) if
+									these have already been found (see season_summary), otherwise the available
+									values are found from df_raw
+	:return SeasonFill season_fill:
+	"""
+	if quantiles is None:
+		quantiles = default_season_quantiles()
+	seasons = tuple(quantiles.keys())
+	q = tuple(quantiles[x] for x in seasons)
+	substation_types = (Headers.sub_gsp, Headers.sub_primary)
+
+	season_values = df_raw[list(seasons)].apply(pd.to_numeric, errors='coerce').values.astype(float)
+	# Available values are those which are not NA and greater than zero
+	available = season_values > 0
+
+	values = np.full((len(substation_types), len(seasons)), np.nan)
+	fill_mask = np.zeros(season_values.shape, dtype=bool)
+	for t, substation_type in enumerate(substation_types):
+		idx_type = (df_raw[substation_type] == True).values[:, np.newaxis]
+		if available_values is None:
+			# Quantiles of all seasons calculated in one call with the values not available for this type set to NaN,
+			# only the quantile requested for each season is kept
+			with np.errstate(all='ignore'), warnings.catch_warnings():
+				warnings.simplefilter('ignore', RuntimeWarning)
+				all_quantiles = np.nanpercentile(np.where(idx_type & available, season_values, np.nan), q, axis=0)
+			values[t] = all_quantiles[np.arange(len(seasons)), np.arange(len(seasons))]
+		else:
+			for s, season in enumerate(seasons):
+				season_available = available_values[(substation_type, season)]
+				if isinstance(season_available, quantile_sketch.QuantileSketch):
+					values[t, s] = season_available.percentile(q[s])
+				elif len(season_available):
+					values[t, s] = np.percentile(season_available, q[s])
+		fill_mask |= idx_type & ~available
+
+	values.setflags(write=False)
+	fill_mask.setflags(write=False)
+
+	return SeasonFill(
+		seasons=seasons, quantiles=q, substation_types=substation_types, values=values, fill_mask=fill_mask)
 
 
 def interpolator(t1):
@@ -186,6 +625,42 @@ def interpolator(t1):
 
 	return y_estimated_df
 
+def batch_interpolator(values):
+	"""
+	Function fills the missing values in every row of a 2D array by linear interpolation, using the column positions as
+	x and extrapolating beyond the first and last values.  Gives the same values as calling interpolator on each row in
+	turn but all rows are estimated in a single pass.  Rows with less than 2 values are left unchanged.
+	:param np.ndarray values:  2D array (rows x years) with the missing values as nan
+	:return np.ndarray filled:  Copy of values with the missing values estimated
+	"""
+	values = np.asarray(values, dtype=float)
+	filled = values.copy()
+	known = ~np.isnan(values)
+	n_known = known.sum(axis=1)
+
+	# Rows and columns of all the values to estimate
+	rows, cols = np.nonzero(~known & (n_known >= 2)[:, np.newaxis])
+	if len(rows) == 0:
+		return filled
+
+	# Column positions of the known values in each row, listed in ascending order ahead of the missing positions
+	known_positions = np.argsort(~known, axis=1, kind='stable')
+
+	# The number of known values before each missing value determines which pair of known values are used, clipped in
+	# the same way as interp1d so that values outside the known range are extrapolated from the first or last pair
+	n_before = np.cumsum(known, axis=1)[rows, cols]
+	interval = np.clip(n_before, 1, n_known[rows] - 1)
+
+	x_lo = known_positions[rows, interval - 1]
+	x_hi = known_positions[rows, interval]
+	y_lo = values[rows, x_lo]
+	y_hi = values[rows, x_hi]
+
+	slope = (y_hi - y_lo) / (x_hi - x_lo)
+	filled[rows, cols] = slope * (cols - x_lo) + y_lo
+
+	return filled
+
 class excel_file_names:
 	"""
 		Headers used as part of the DataFrame
@@ -198,8 +673,16 @@ class excel_file_names:
 	df_modified_excel_name='processed_load_estimate_modified.xlsx'
 	bad_data_excel_name='bad_data.xlsx'
 	good_data_excel_name = 'good_data.xlsx'
+	# stage profile report names
+	stage_profile_json_name = 'stage_profile.json'
+	stage_profile_csv_name = 'stage_profile.csv'
+	stage_profile_cprofile_name = 'stage_profile.prof'
+	# batch results folder and index names
+	batch_results_dir_name = 'results'
+	batch_index_csv_name = 'batch_index.csv'
 
 
+@cached_import
 def sse_load_xl_to_df(xl_filename, xl_ws_name, headers=True):
 	"""
 	Function to open and perform initial formatting on spreadsheet
@@ -220,6 +703,18 @@ def sse_load_xl_to_df(xl_filename, xl_ws_name, headers=True):
 		sheet_name=xl_ws_name,
 		header=h,
 	)
+
+	df = remove_empty_rows_columns(df=df)
+
+	return df
+
+
+def remove_empty_rows_columns(df):
+	"""
+		Function removes the rows and columns which are entirely empty and resets the index
+	:param pd.DataFrame df:  DataFrame as read from the worksheet
+	:return pd.DataFrame df:
+	"""
 	# remove empty rows (i.e with all NaNs)
 	df.dropna(
 			axis=0,
@@ -235,4 +730,103 @@ def sse_load_xl_to_df(xl_filename, xl_ws_name, headers=True):
 	# reset index
 	df.reset_index(drop=True, inplace=True)
 
-	return df
\ No newline at end of file
+	return df
+
+
+class LoadEstimateWorkbook:
+	"""
+		Reads a worksheet of the load estimate workbook once and then provides each pass of the processing with its
+		own copy of the DataFrames that would otherwise be produced by import_raw_load_estimates and sse_load_xl_to_df
+	"""
+	def __init__(self, pth_load_est, sheet_name='MASTER Based on SubstationLoad'):
+		"""
+		:param str pth_load_est: Full path to file
+		:param str sheet_name:  (optional) Name of worksheet in load estimate
+		"""
+		self.pth_load_est = pth_load_est
+		self.sheet_name = sheet_name
+
+		self._rows = None
+		self._df_raw = None
+		self._df_sheet = dict()
+
+	@property
+	def rows(self):
+		"""
+			Cell values of the worksheet, only read from the workbook the first time they are needed
+		:return list rows:
+		"""
+		if self._rows is None:
+			# Single parse of the worksheet with every cell kept as the raw value so that pandas can infer the dtypes
+			# again for each of the layouts below
+			df_cells = pd.read_excel(
+				io=self.pth_load_est,
+				sheet_name=self.sheet_name,
+				header=None,
+				dtype=object
+			)
+			# pd.read_excel passes empty cells to the parser as empty strings, the same is done here so that the
+			# resulting DataFrames are identical to reading the worksheet directly
+			self._rows = df_cells.fillna('').values.tolist()
+
+		return self._rows
+
+	def raw_load_estimates(self):
+		"""
+			Returns a copy of the raw load estimate (same as import_raw_load_estimates)
+		:return pd.DataFrame df_raw:
+		"""
+		if self._df_raw is None:
+			# Shares the cache entry with import_raw_load_estimates
+			self._df_raw = default_cache.load(
+				pth_file=self.pth_load_est,
+				reader_name='import_raw_load_estimates',
+				read_options={'sheet_name': self.sheet_name},
+				reader=self._parse_raw_load_estimates
+			)
+
+		return self._df_raw.copy()
+
+	def _parse_raw_load_estimates(self):
+		"""
+			Produces the raw load estimate from the worksheet cells
+		:return pd.DataFrame df_raw:
+		"""
+		df_raw = TextParser(
+			self.rows,
+			skiprows=2,					# Skip first 2 rows since they do not contain anything useful
+			header=0
+		).read()
+
+		return clean_raw_load_estimates(df_raw=df_raw)
+
+	def sheet(self, headers=True):
+		"""
+			Returns a copy of the worksheet (same as sse_load_xl_to_df)
+		:param headers: where there is any data in row 0 of spreadsheet
+		:return pd.DataFrame df:
+		"""
+		if headers not in self._df_sheet:
+			# Shares the cache entry with sse_load_xl_to_df
+			self._df_sheet[headers] = default_cache.load(
+				pth_file=self.pth_load_est,
+				reader_name='sse_load_xl_to_df',
+				read_options={'xl_ws_name': self.sheet_name, 'headers': headers},
+				reader=lambda: self._parse_sheet(headers=headers)
+			)
+
+		return self._df_sheet[headers].copy()
+
+	def _parse_sheet(self, headers):
+		"""
+			Produces the worksheet DataFrame from the worksheet cells
+		:param headers: where there is any data in row 0 of spreadsheet
+		:return pd.DataFrame df:
+		"""
+		if headers:
+			h = 0
+		else:
+			h = None
+		df = TextParser(self.rows, header=h).read()
+
+		return remove_empty_rows_columns(df=df)
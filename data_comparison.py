@@ -9,12 +9,16 @@
 """
 
 # Generic Imports
+import collections
+import datetime
+import numbers
 import pandas as pd
 import numpy as np
 import unittest
 
 # Unique imports
 import common_functions as common
+import output_formats as output
 
 # General Constants
 FILE_NAME_INPUT_1 = 'Processed Load Estimates_p_non_modified.xlsx'
@@ -31,6 +35,10 @@ FILE_PTH_OUTPUT = common.get_local_file_path(file_name=FILE_NAME_OUTPUT)
 # Engine to use when writing excel workbooks (XlsxWriter needed for formatting of tabs)
 excel_engine = 'xlsxwriter'
 
+# Types of the values written as numbers in a single write_column call (bool is a number but written as a boolean)
+NUMBER_TYPES = {int, float, np.int8, np.int16, np.int32, np.int64, np.uint8, np.uint16, np.uint32, np.uint64,
+				np.float16, np.float32, np.float64}
+
 
 # Functions
 def produce_dataframe(dimensions, row_num):
@@ -68,7 +76,6 @@ def highlight_diff(full_dataset, cells_to_highlight, color='yellow'):
 	"""
 	# Set the attribute based on the colour input
 	attr = 'background-color: {}'.format(color)
-	print(attr)
 	# Is difference
 	is_diff = full_dataset == cells_to_highlight
 	# Return a DataFrame with the style matching
@@ -80,27 +87,306 @@ def highlight_diff(full_dataset, cells_to_highlight, color='yellow'):
 def compare_dataframes(df1, df2):
 	"""
 		Function compares two DataFrames of the same size and returns a dataframe of the same dimensions but with only
-		the differences shown.  Keeps values in df2
+		the differences shown (see diff_dataframes).  Keeps values in df2
 	:param pd.DataFrame df1:  DataFrame 1
 	:param pd.DataFrame df2:  DataFrame 2
 	:return (pd.DataFrame, pd.DataFrame.Styled) (df_diff, df2_styled):  Different values between DataFrames and
 																		original dataframe with changes highlighted
 	"""
+	local_df_diff = diff_dataframes(df1=df1, df2=df2).to_dense()
+
+	# Highlight the cells in df2 which have changed
+	df2_styled = df2.style.apply(highlight_diff, cells_to_highlight=local_df_diff, axis=None)
+
+	return local_df_diff, df2_styled
+
+
+class DataFrameDiff:
+	"""
+		Sparse record of the differences between two DataFrames of the same dimensions.  Each changed cell is stored
+		as one row of a table (coordinate format) giving its position, the old and new value and the kind of change.
+	"""
+	# Kinds of change
+	filled = 'filled'			# No value in df1 but a value in df2
+	modified = 'modified'		# Different values in df1 and df2
+	cleared = 'cleared'			# Value in df1 but no value in df2
+
+	def __init__(self, changes, index, columns):
+		"""
+		:param pd.DataFrame changes:  Table of changes with columns row, col, index, column, old, new and kind
+		:param pd.Index index:  Index of the DataFrames compared
+		:param pd.Index columns:  Columns of the DataFrames compared
+		"""
+		self.changes = changes
+		self.index = index
+		self.columns = columns
+
+	def __len__(self):
+		return len(self.changes.index)
+
+	@property
+	def shape(self):
+		return len(self.index), len(self.columns)
+
+	def mask(self, kinds=None):
+		"""
+			Returns a boolean array of the cells which have changed
+		:param tuple kinds:  (optional) Only include these kinds of change, defaults to all
+		:return np.ndarray is_diff:
+		"""
+		changes = self.changes
+		if kinds is not None:
+			changes = changes[changes['kind'].isin(kinds)]
+		is_diff = np.zeros(self.shape, dtype=bool)
+		is_diff[changes['row'].values, changes['col'].values] = True
+
+		return is_diff
+
+	def to_dense(self):
+		"""
+			Returns a DataFrame with the same dimensions as the DataFrames compared which contains the new value of the
+			changed cells and NaN everywhere else (the same layout as the difference from compare_dataframes)
+		:return pd.DataFrame df_diff:
+		"""
+		values = np.full(self.shape, np.nan, dtype=object)
+		values[self.changes['row'].values, self.changes['col'].values] = self.changes['new'].values
+		df_diff = pd.DataFrame(values, index=self.index, columns=self.columns).infer_objects()
+
+		return df_diff
+
+	def summary(self):
+		"""
+			Returns the number of changes of each kind for each column
+		:return pd.DataFrame df_summary:
+		"""
+		return self.changes.groupby(['column', 'kind'], sort=False).size().unstack(fill_value=0)
+
 
+def diff_dataframes(df1, df2, rtol=1e-9, atol=0.0):
+	"""
+		Function compares two DataFrames of the same size and returns a sparse record of the cells which are different.
+		Cells which are missing in both are treated as equal and numbers are compared to within a tolerance.
+	:param pd.DataFrame df1:  DataFrame 1 (old values)
+	:param pd.DataFrame df2:  DataFrame 2 (new values)
+	:param float rtol:  (optional) Relative tolerance when comparing numbers
+	:param float atol:  (optional) Absolute tolerance when comparing numbers
+	:return DataFrameDiff diff:
+	"""
 	# Confirm that DataFrames are the same dimensions otherwise raise error
 	if df1.shape != df2.shape:
 		raise ValueError('The two DataFrames provided are not the same dimensions ({} != {})'.format(df1.shape, df2.shape))
 
-	# Keeps the values in df2 which are different to df1, all other values are set to nan
-	local_df_diff = df2.where(df2 != df1)
+	rows = []
+	cols = []
+	kinds = []
+	for col in range(df1.shape[1]):
+		old = df1.iloc[:, col].values
+		new = df2.iloc[:, col].values
+		old_na = pd.isna(old)
+		new_na = pd.isna(new)
+
+		# Numbers are compared with a tolerance and everything else must be equal
+		old_num = pd.to_numeric(old, errors='coerce').astype(float) if old.dtype.kind != 'M' else np.full(len(old), np.nan)
+		new_num = pd.to_numeric(new, errors='coerce').astype(float) if new.dtype.kind != 'M' else np.full(len(new), np.nan)
+		both_num = ~np.isnan(old_num) & ~np.isnan(new_num)
+		with np.errstate(invalid='ignore'):
+			num_equal = np.isclose(old_num, new_num, rtol=rtol, atol=atol)
+		other_equal = (pd.Series(old, dtype=object) == pd.Series(new, dtype=object)).values
+		equal = np.where(both_num, num_equal, other_equal)
+
+		for kind, idx in (
+				(DataFrameDiff.filled, old_na & ~new_na),
+				(DataFrameDiff.modified, ~old_na & ~new_na & ~equal),
+				(DataFrameDiff.cleared, ~old_na & new_na)):
+			idx_rows = np.flatnonzero(idx)
+			rows.append(idx_rows)
+			cols.append(np.full(len(idx_rows), col))
+			kinds.append(np.full(len(idx_rows), kind, dtype=object))
+
+	rows = np.concatenate(rows)
+	cols = np.concatenate(cols)
+	kinds = np.concatenate(kinds)
+	# Order by cell position
+	order = np.lexsort((cols, rows))
+	rows = rows[order]
+	cols = cols[order]
+
+	changes = pd.DataFrame({
+		'row': rows,
+		'col': cols,
+		'index': df2.index[rows].to_flat_index(),
+		'column': df2.columns[cols].to_flat_index(),
+		'old': df1.values[rows, cols] if len(rows) else [],
+		'new': df2.values[rows, cols] if len(rows) else [],
+		'kind': pd.Categorical(
+			kinds[order], categories=[DataFrameDiff.filled, DataFrameDiff.modified, DataFrameDiff.cleared])
+	})
+
+	return DataFrameDiff(changes=changes, index=df2.index, columns=df2.columns)
+
+
+def key_value(value):
+	"""
+		Function returns a value as a string for use in a substation key so that the same value matches across releases
+		irrespective of how it was read in (i.e. NRN 242 and 242.0 are the same)
+	:param value:
+	:return str value:
+	"""
+	if pd.isna(value):
+		return ''
+	if isinstance(value, numbers.Number) and not isinstance(value, bool) and float(value).is_integer():
+		return str(int(value))
 
-	# Highlight the cells in df2 which have changed
-	df2_styled = df2.style.apply(highlight_diff, cells_to_highlight=local_df_diff, axis=None)
+	return str(value).strip()
 
-	return local_df_diff, df2_styled
 
+def substation_flags(df):
+	"""
+		Function returns which rows are GSPs and which are Primaries, from the Sub_GSP and Sub_Primary columns of a
+		processed release or, if they are not included (i.e. a raw release), using the same rules as
+		DataFrame_Approach.gsp_rows and DataFrame_Approach.determine_gsp_primary_flag
+	:param pd.DataFrame df:  Raw or processed load estimate
+	:return (np.ndarray, np.ndarray) is_gsp, is_primary:  A row is never both a GSP and a Primary
+	"""
+	is_name = df[common.Headers.name].notna().values
+	is_gsp_name = df[common.Headers.gsp].notna().values
+	if common.Headers.sub_gsp in df.columns:
+		is_gsp = (df[common.Headers.sub_gsp] == True).values
+	else:
+		is_gsp = ~is_name & is_gsp_name & df[common.Headers.voltage].notna().values
+	if common.Headers.sub_primary in df.columns:
+		is_primary = (df[common.Headers.sub_primary] == True).values & ~is_gsp
+	else:
+		is_primary = is_name & ~is_gsp_name & df[common.Headers.nrn].notna().values & ~is_gsp
+
+	return is_gsp, is_primary
+
+
+def release_keys(df):
+	"""
+		Function returns a key identifying each substation so that releases can be matched up row by row.  GSPs are
+		identified by their GSP name and Primaries by their GSP and NRN (or GSP and Name if there is no NRN), the GSP is
+		included since the same Primary can be listed under more than one GSP.  Any duplicates are numbered in order
+		of their name and then the order they appear.  Rows which are neither a GSP nor a Primary (see
+		substation_flags) have no key.
+	:param pd.DataFrame df:  Raw or processed load estimate
+	:return (pd.MultiIndex, np.ndarray) keys, is_keyed:  Index of (substation type, identifier, occurrence) for each
+														row with a key and True for each row which has a key
+	"""
+	is_gsp, is_primary = substation_flags(df=df)
+	is_keyed = is_gsp | is_primary
+
+	# Converted to object first since mapping a category column would leave missing values as NaN
+	gsp = df[common.Headers.gsp].astype(object).map(key_value).values.astype(object)[is_keyed]
+	name = df[common.Headers.name].astype(object).map(key_value).values.astype(object)[is_keyed]
+	nrn = df[common.Headers.nrn].astype(object).map(key_value).values.astype(object)[is_keyed]
+	is_gsp = is_gsp[is_keyed]
 
-def write_dataframe(workbook, df, sheet_name, tab_color=None):
+	kind = np.where(is_gsp, 'GSP', 'Primary')
+	identifier = np.where(is_gsp, gsp, np.where(nrn != '', gsp + '/' + nrn, gsp + '/' + name))
+	# Duplicates are numbered in order of their name so that they are matched irrespective of the row order
+	df_keys = pd.DataFrame({'kind': kind, 'identifier': identifier, 'name': name})
+	occurrence = df_keys.sort_values(['kind', 'identifier', 'name']).groupby(['kind', 'identifier']).cumcount()
+	occurrence = occurrence.sort_index().values
+	keys = pd.MultiIndex.from_arrays([kind, identifier, occurrence], names=['kind', 'identifier', 'occurrence'])
+
+	return keys, is_keyed
+
+
+class ReleaseComparison:
+	"""
+		Result of comparing two releases of the load estimate which may contain different substations and columns
+		added:  Rows of the new release for substations which are not in the old release
+		removed:  Rows of the old release for substations which are not in the new release
+		unkeyed_old / unkeyed_new:  Rows of the old / new release which are not a substation (see release_keys) so
+									cannot be matched and are not compared
+		added_columns / removed_columns:  Columns only in the new / old release
+		diff:  DataFrameDiff of the substations and columns in both releases, indexed by the substation key
+	"""
+	def __init__(self, added, removed, added_columns, removed_columns, diff, unkeyed_old, unkeyed_new):
+		self.added = added
+		self.removed = removed
+		self.unkeyed_old = unkeyed_old
+		self.unkeyed_new = unkeyed_new
+		self.added_columns = added_columns
+		self.removed_columns = removed_columns
+		self.diff = diff
+
+	@property
+	def changed_substations(self):
+		"""
+			Keys of the substations in both releases which have at least one changed cell
+		:return pd.Index keys:
+		"""
+		return pd.Index(self.diff.changes['index']).unique()
+
+	def summary(self):
+		"""
+			Returns the number of substations and columns added, removed and changed
+		:return pd.Series summary:
+		"""
+		return pd.Series(collections.OrderedDict((
+			('substations_added', len(self.added.index)),
+			('substations_removed', len(self.removed.index)),
+			('substations_changed', len(self.changed_substations)),
+			('unkeyed_rows_old', len(self.unkeyed_old.index)),
+			('unkeyed_rows_new', len(self.unkeyed_new.index)),
+			('columns_added', len(self.added_columns)),
+			('columns_removed', len(self.removed_columns)),
+			('cells_changed', len(self.diff)),
+		)))
+
+
+def compare_releases(df_old, df_new, rtol=1e-9, atol=0.0):
+	"""
+		Function compares two releases of the processed load estimate which can have different substations, in a
+		different order, and different columns.  Substations are matched on their key (see release_keys) using hash
+		based lookups and columns are matched on their name.
+	:param pd.DataFrame df_old:  Old release
+	:param pd.DataFrame df_new:  New release
+	:param float rtol:  (optional) Relative tolerance when comparing numbers
+	:param float atol:  (optional) Absolute tolerance when comparing numbers
+	:return ReleaseComparison comparison:
+	"""
+	keys_old, is_keyed_old = release_keys(df=df_old)
+	keys_new, is_keyed_new = release_keys(df=df_new)
+	unkeyed_old = df_old[~is_keyed_old]
+	unkeyed_new = df_new[~is_keyed_new]
+	df_old = df_old[is_keyed_old]
+	df_new = df_new[is_keyed_new]
+
+	# Position of each new substation in the old release (-1 if not included)
+	pos_old = keys_old.get_indexer(keys_new)
+	idx_common = pos_old >= 0
+	idx_removed = np.ones(len(keys_old), dtype=bool)
+	idx_removed[pos_old[idx_common]] = False
+
+	old_columns = set(df_old.columns)
+	new_columns = set(df_new.columns)
+	columns_common = [x for x in df_new.columns if x in old_columns]
+	added_columns = [x for x in df_new.columns if x not in old_columns]
+	removed_columns = [x for x in df_old.columns if x not in new_columns]
+
+	# Common substations aligned in the order of the new release
+	df_old_aligned = df_old[columns_common].iloc[pos_old[idx_common]]
+	df_new_aligned = df_new[columns_common].iloc[np.flatnonzero(idx_common)]
+	df_old_aligned.index = keys_new[idx_common]
+	df_new_aligned.index = keys_new[idx_common]
+
+	diff = diff_dataframes(df1=df_old_aligned, df2=df_new_aligned, rtol=rtol, atol=atol)
+
+	return ReleaseComparison(
+		added=df_new[~idx_common],
+		removed=df_old[idx_removed],
+		added_columns=added_columns,
+		removed_columns=removed_columns,
+		diff=diff,
+		unkeyed_old=unkeyed_old,
+		unkeyed_new=unkeyed_new
+	)
+
+
+def write_dataframe(workbook, df, sheet_name, tab_color=None, highlight=None, color='yellow'):
 	"""
 		Function deals with writing a DataFrame to new worksheet in excel whilst also formatting the worksheet tab
 		color
@@ -108,6 +394,8 @@ def write_dataframe(workbook, df, sheet_name, tab_color=None):
 	:param pd.DataFrame df:  Data to be written (if is a df.Styled) then will include highlighting and colour)
 	:param str sheet_name:  Name to give worksheet
 	:param str tab_color:  Color for tab
+	:param np.ndarray highlight:  (optional) Boolean array (see DataFrameDiff.mask) of the cells to highlight
+	:param str color:  (optional) Colour to highlight the cells
 	:return: None
 	"""
 	# Create a new worksheet
@@ -122,54 +410,186 @@ def write_dataframe(workbook, df, sheet_name, tab_color=None):
 		wksh.set_tab_color(tab_color)
 
 	# Write DataFrame to excel worksheet
-	df.to_excel(workbook, sheet_name=sheet_name)
+	if isinstance(df, pd.DataFrame):
+		write_cells(workbook=workbook, worksheet=wksh, df=df, highlight=highlight, color=color)
+	else:
+		df.to_excel(workbook, sheet_name=sheet_name)
 	return None
 
 
-def excel_data_comparison_maker(FILE_NAME_INPUT_1,FILE_NAME_INPUT_2,Bad_Data_Input_Name,Good_Data_Input_Name):
+def write_cells(workbook, worksheet, df, highlight=None, color='yellow'):
 	"""
-			Function compares two DataFrames of the same size and returns a dataframe of the same dimensions but with only
-			the differences shown.  Keeps values in df2
-		:param pd.DataFrame df1:  DataFrame 1
-		:param pd.DataFrame df2:  DataFrame 2
-		:return (pd.DataFrame, pd.DataFrame.Styled) (df_diff, df2_styled):  Different values between DataFrames and
-																			original dataframe with changes highlighted
-		"""
-	# todo: modify the description
+		Function writes a DataFrame straight to an XlsxWriter worksheet in the same layout as df.to_excel.  Each column
+		is written in one call (see write_values) and only the cells to highlight are given a format.
+	:param pd.ExcelWriter workbook:  Handle to workbook writer to use (must use the xlsxwriter engine)
+	:param xlsxwriter.worksheet.Worksheet worksheet:  Worksheet to write to
+	:param pd.DataFrame df:  Data to be written
+	:param np.ndarray highlight:  (optional) Boolean array (see DataFrameDiff.mask) of the cells to highlight
+	:param str color:  (optional) Colour to highlight the cells
+	:return: None
+	"""
+	book = workbook.book
+	# Formats matching those used by pandas for the header and index and for dates
+	header_format = book.add_format({'bold': True, 'border': 1, 'align': 'center', 'valign': 'top'})
+	formats = dict()
+	for highlighted in (False, True):
+		for num_format in (None, 'YYYY-MM-DD HH:MM:SS', 'YYYY-MM-DD', 'HH:MM:SS'):
+			properties = dict()
+			if highlighted:
+				properties['bg_color'] = color
+			if num_format:
+				properties['num_format'] = num_format
+			formats[(highlighted, num_format)] = book.add_format(properties) if properties else None
+
+	# Header row and index column
+	if df.index.name is not None:
+		worksheet.write(0, 0, df.index.name, header_format)
+	for col, name in enumerate(df.columns, start=1):
+		write_cell(worksheet, 0, col, name, header_format, formats, False)
+	write_values(worksheet=worksheet, first_row=1, col=0, values=df.index.values, formats=formats,
+				 cell_format=header_format)
+
+	for col in range(len(df.columns)):
+		write_values(
+			worksheet=worksheet, first_row=1, col=col + 1, values=df.iloc[:, col].values, formats=formats,
+			highlight=None if highlight is None else highlight[:, col])
+
+	return None
+
+
+def write_values(worksheet, first_row, col, values, formats, highlight=None, cell_format=None):
+	"""
+		Function writes the values of a column to the worksheet.  The finite numbers which are not highlighted are
+		written with a single write_column call, missing values are left blank and the remaining values (text, dates,
+		highlighted cells, etc.) are written one at a time by write_cell so they get the right type and format.
+	:param xlsxwriter.worksheet.Worksheet worksheet:  Worksheet to write to
+	:param int first_row:  Row number of the first value
+	:param int col:  Column number
+	:param np.ndarray values:  Values to write
+	:param dict formats:  Formats produced by write_cells
+	:param np.ndarray highlight:  (optional) Boolean array of the values to highlight
+	:param xlsxwriter.format.Format cell_format:  (optional) Format of the values which are not highlighted
+	:return: None
+	"""
+	# Categorical columns give the categories of each value
+	values = np.asarray(values)
+	if values.dtype.kind in 'fiu':
+		is_number = np.isfinite(values.astype(float))
+	else:
+		is_number = np.fromiter((type(x) in NUMBER_TYPES for x in values), dtype=bool, count=len(values))
+		is_number[is_number] = np.isfinite(values[is_number].astype(float))
+	is_other = ~is_number & pd.notna(values)
+	if highlight is None:
+		highlight = np.zeros(len(values), dtype=bool)
+	else:
+		is_other |= is_number & highlight
+		is_number &= ~highlight
+
+	# Each run of numbers is written in one call so the blank cells between them are skipped
+	edges = np.flatnonzero(np.diff(np.r_[False, is_number, False]))
+	numbers_list = values.tolist()
+	for start, end in zip(edges[::2], edges[1::2]):
+		worksheet.write_column(first_row + start, col, numbers_list[start:end], cell_format)
+	for row in np.flatnonzero(is_other):
+		highlighted = bool(highlight[row])
+		write_cell(worksheet, first_row + row, col, values[row], formats[(True, None)] if highlighted else cell_format,
+				   formats, highlighted)
+
+	return None
 
-	FILE_PTH_INPUT_1 = common.get_local_file_path(file_name=FILE_NAME_INPUT_1)
-	FILE_PTH_INPUT_2 = common.get_local_file_path(file_name=FILE_NAME_INPUT_2)
-	FILE_PTH_INPUT_Bad_Data = common.get_local_file_path(file_name=Bad_Data_Input_Name)
-	FILE_PTH_INPUT_Good_Data = common.get_local_file_path(file_name=Good_Data_Input_Name)
 
+def write_cell(worksheet, row, col, value, cell_format, formats, highlighted):
+	"""
+		Function writes a single value to the worksheet using the XlsxWriter method for its type
+	:param xlsxwriter.worksheet.Worksheet worksheet:  Worksheet to write to
+	:param int row:  Row number
+	:param int col:  Column number
+	:param value:  Value to write
+	:param xlsxwriter.format.Format cell_format:  Format of the cell
+	:param dict formats:  Formats produced by write_cells, used for dates and times
+	:param bool highlighted:  Whether the cell is highlighted
+	:return: None
+	"""
+	if isinstance(value, (bool, np.bool_)):
+		worksheet.write_boolean(row, col, bool(value), cell_format)
+	elif isinstance(value, numbers.Number):
+		if np.isinf(value):
+			worksheet.write_string(row, col, 'inf' if value > 0 else '-inf', cell_format)
+		else:
+			worksheet.write_number(row, col, value, cell_format)
+	elif isinstance(value, (datetime.datetime, np.datetime64)):
+		worksheet.write_datetime(
+			row, col, pd.Timestamp(value).to_pydatetime(), formats[(highlighted, 'YYYY-MM-DD HH:MM:SS')])
+	elif isinstance(value, datetime.date):
+		worksheet.write_datetime(row, col, value, formats[(highlighted, 'YYYY-MM-DD')])
+	elif isinstance(value, datetime.time):
+		worksheet.write_datetime(row, col, value, formats[(highlighted, 'HH:MM:SS')])
+	else:
+		worksheet.write_string(row, col, str(value), cell_format)
+
+	return None
+
+
+def excel_data_comparison_writer(df_raw, df_modified, df_bad, df_good, output_dir=None):
+	"""
+		Function compares the raw and modified processed data and writes them to a single excel workbook along with
+		the differences and the bad and good data
+	:param pd.DataFrame df_raw:  Raw (not filled) processed data
+	:param pd.DataFrame df_modified:  Modified (filled) processed data
+	:param pd.DataFrame df_bad:  Bad data
+	:param pd.DataFrame df_good:  Good data
+	:param str output_dir:  (optional) Folder the workbook is written to, defaults to the folder containing these
+							scripts
+	:return None:
+	"""
 	FILE_NAME_OUTPUT = common.excel_file_names.data_comparison_excel_name
-	FILE_PTH_OUTPUT = common.get_local_file_path(file_name=FILE_NAME_OUTPUT)
+	FILE_PTH_OUTPUT = output.output_file_path(
+		file_name=FILE_NAME_OUTPUT, output_format=output.OutputFormat.excel, output_dir=output_dir)
 
 	# Engine to use when writing excel workbooks (XlsxWriter needed for formatting of tabs)
 	excel_engine = 'xlsxwriter'
 
-
-	df_main=common.import_excel(pth_load_est=FILE_PTH_INPUT_1)
-	df_modified = common.import_excel(pth_load_est=FILE_PTH_INPUT_2)
-	df_bad_data = common.import_excel(pth_load_est=FILE_PTH_INPUT_Bad_Data)
-	df_good_data = common.import_excel(pth_load_est=FILE_PTH_INPUT_Good_Data)
-
-	# Compare DataFrames to get differences and an updated df_modified with cells highlighted
-	df_diff, df_modified_styled = compare_dataframes(df1=df_main, df2=df_modified)
+	# Compare DataFrames to get differences and the cells in df_modified to highlight (those with a new value)
+	diff = diff_dataframes(df1=df_raw, df2=df_modified)
+	df_diff = diff.to_dense()
+	is_diff = diff.mask(kinds=(DataFrameDiff.filled, DataFrameDiff.modified))
 
 	# Write DataFrames to excel workbook
 	# Create an instance of excel
 	with pd.ExcelWriter(path=FILE_PTH_OUTPUT, engine=excel_engine) as wkbk:
 		# Write main data
-		write_dataframe(workbook=wkbk, df=df_main, sheet_name='Raw Data')
+		write_dataframe(workbook=wkbk, df=df_raw, sheet_name='Raw Data')
 		# Write modified data
-		write_dataframe(workbook=wkbk, df=df_modified_styled, sheet_name='Modified Data', tab_color='green')
+		write_dataframe(workbook=wkbk, df=df_modified, sheet_name='Modified Data', tab_color='green', highlight=is_diff)
 		# Write difference data
 		write_dataframe(workbook=wkbk, df=df_diff, sheet_name='Difference Data', tab_color='blue')
-		write_dataframe(workbook=wkbk, df=df_bad_data, sheet_name='Bad Data', tab_color='red')
-		write_dataframe(workbook=wkbk, df=df_good_data, sheet_name='Good Data')
-	k=1
+		write_dataframe(workbook=wkbk, df=df_bad, sheet_name='Bad Data', tab_color='red')
+		write_dataframe(workbook=wkbk, df=df_good, sheet_name='Good Data')
+
+	return None
+
+
+def excel_data_comparison_maker(FILE_NAME_INPUT_1,FILE_NAME_INPUT_2,Bad_Data_Input_Name,Good_Data_Input_Name,
+								output_format=output.OUTPUT_FORMAT, output_dir=None):
+	"""
+			Function reads the files written by DataFrame_Approach and writes the comparison workbook (see
+			excel_data_comparison_writer)
+		:param str FILE_NAME_INPUT_1:  File name of the raw (not filled) processed data
+		:param str FILE_NAME_INPUT_2:  File name of the modified (filled) processed data
+		:param str Bad_Data_Input_Name:  File name of the bad data
+		:param str Good_Data_Input_Name:  File name of the good data
+		:param str output_format:  (optional) Format the input files were written in (see output_formats.OutputFormat)
+		:param str output_dir:  (optional) Folder the input files are in and the workbook is written to, defaults to
+								the folder containing these scripts
+		:return None:
+		"""
+	df_raw, df_modified, df_bad, df_good = [
+		output.read_output(file_name=x, output_format=output_format, output_dir=output_dir)
+		for x in (FILE_NAME_INPUT_1, FILE_NAME_INPUT_2, Bad_Data_Input_Name, Good_Data_Input_Name)
+	]
 
+	return excel_data_comparison_writer(
+		df_raw=df_raw, df_modified=df_modified, df_bad=df_bad, df_good=df_good, output_dir=output_dir)
 
 
 if __name__ == '__main__':
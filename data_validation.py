@@ -0,0 +1,226 @@
+"""
+#######################################################################################################################
+###											Data Validation															###
+###																													###
+###		Rules used to identify bad data in the processed load estimate.  Each rule is registered with register_rule	###
+###		and evaluated over the whole DataFrame at once, the results are combined into a violation matrix and a		###
+###		bitmask for each row so the reason a row has been flagged is kept.											###
+###																													###
+#######################################################################################################################
+"""
+
+# Generic Imports
+import collections
+import pandas as pd
+import numpy as np
+
+# Unique imports
+import common_functions as common
+
+# Name of the column the bitmask of rule violations is stored in
+VIOLATIONS = 'violations'
+
+# Tolerance when checking that the bus percentages add up to 1
+PERCENTAGE_SUM_TOLERANCE = 1e-6
+
+
+class Rule:
+	"""
+		Single validation rule, check is a function taking the DataFrame and its column groups (see column_groups) and
+		returning a boolean array which is True for each row that breaks the rule
+	"""
+	def __init__(self, name, description, check, bit):
+		"""
+		:param str name:  Name of the rule
+		:param str description:  Description of the problem the rule identifies
+		:param function check:  Function returning the boolean array of violations
+		:param int bit:  Position of the rule in the bitmask
+		"""
+		self.name = name
+		self.description = description
+		self.check = check
+		self.bit = bit
+
+	def evaluate(self, df, columns):
+		"""
+			Returns a boolean array which is True for each row that breaks the rule
+		:param pd.DataFrame df:  Processed load estimate
+		:param dict columns:  Column groups (see column_groups)
+		:return np.ndarray idx:
+		"""
+		return np.asarray(self.check(df, columns), dtype=bool)
+
+
+# All registered rules in the order they were registered
+RULES = collections.OrderedDict()
+
+
+def register_rule(name, description):
+	"""
+		Decorator which registers a function as a validation rule
+	:param str name:  Name of the rule
+	:param str description:  Description of the problem the rule identifies
+	:return function decorator:
+	"""
+	def decorator(check):
+		if name in RULES:
+			raise ValueError('A rule named {} has already been registered'.format(name))
+		# The bitmask is stored as int64
+		if len(RULES) >= 63:
+			raise ValueError('No more than 63 rules can be registered')
+		RULES[name] = Rule(name=name, description=description, check=check, bit=len(RULES))
+		return check
+
+	return decorator
+
+
+def column_groups(df):
+	"""
+		Function finds the groups of columns used by the rules so that they are only searched for once
+	:param pd.DataFrame df:  Processed load estimate
+	:return dict columns:
+	"""
+	layout = common.column_layout(df_raw=df)
+
+	columns = {
+		'forecast_years': layout.labels['forecast_years'],
+		'aggregate': layout.labels['aggregate'],
+		'bus': layout.labels['bus'],
+		'percentage': [x for x in layout.labels['percentage'] if x in df.columns],
+	}
+
+	return columns
+
+
+def numeric_values(df, columns):
+	"""
+		Function returns the values of the columns as a float array, anything which is not a number is NaN
+	:param pd.DataFrame df:
+	:param list columns:
+	:return np.ndarray values:
+	"""
+	if not columns:
+		return np.empty((len(df.index), 0))
+
+	return df[columns].apply(pd.to_numeric, errors='coerce').values.astype(float)
+
+
+def is_gsp(df):
+	"""
+		Function returns True for each row which is a GSP
+	:param pd.DataFrame df:
+	:return np.ndarray idx:
+	"""
+	if common.Headers.sub_gsp not in df.columns:
+		return np.zeros(len(df.index), dtype=bool)
+
+	return (df[common.Headers.sub_gsp] == True).values
+
+
+# Rules which were used to identify the bad data originally
+@register_rule('forecast_missing', 'All forecast year loads are missing')
+def forecast_missing(df, columns):
+	return df[columns['forecast_years']].isna().all(axis='columns').values
+
+
+@register_rule('forecast_not_positive', 'All forecast year loads are zero or negative')
+def forecast_not_positive(df, columns):
+	return df[columns['forecast_years']].le(0).all(axis='columns').values
+
+
+@register_rule('bus_missing', 'No PSS/E bus numbers are given')
+def bus_missing(df, columns):
+	return df[columns['bus']].isna().all(axis='columns').values
+
+
+@register_rule('bus_not_positive', 'All PSS/E bus numbers are zero or negative')
+def bus_not_positive(df, columns):
+	return df[columns['bus']].le(0).all(axis='columns').values
+
+
+# Additional rules
+@register_rule('negative_load', 'At least one forecast year load is negative')
+def negative_load(df, columns):
+	values = numeric_values(df, columns['forecast_years'])
+	with np.errstate(invalid='ignore'):
+		return (values < 0).any(axis=1)
+
+
+@register_rule('percentage_sum', 'Bus percentages do not add up to 1')
+def percentage_sum(df, columns):
+	values = numeric_values(df, columns['percentage'])
+	has_percentage = ~np.isnan(values).all(axis=1) if values.shape[1] else np.zeros(len(df.index), dtype=bool)
+	total = np.nansum(values, axis=1)
+
+	return has_percentage & (np.abs(total - 1) > PERCENTAGE_SUM_TOLERANCE)
+
+
+@register_rule('diversity_factor', 'GSP diversified load is greater than the aggregate load (diversity factor > 1)')
+def diversity_factor(df, columns):
+	if not columns['forecast_years'] or not all(x in df.columns for x in columns['aggregate']):
+		return np.zeros(len(df.index), dtype=bool)
+	diversified = numeric_values(df, columns['forecast_years'][:1])[:, 0]
+	aggregate = numeric_values(df, columns['aggregate'][:1])[:, 0]
+	with np.errstate(invalid='ignore'):
+		return is_gsp(df) & (aggregate > 0) & (diversified > aggregate)
+
+
+@register_rule('missing_nrn', 'No NRN is given')
+def missing_nrn(df, columns):
+	return df[common.Headers.nrn].isna().values
+
+
+@register_rule('discontinuous_years', 'Forecast year loads are missing between years which have loads')
+def discontinuous_years(df, columns):
+	known = ~np.isnan(numeric_values(df, columns['forecast_years']))
+	if known.shape[1] == 0:
+		return np.zeros(len(df.index), dtype=bool)
+	# A gap is a missing year with a known year both before and after it
+	known_before = np.maximum.accumulate(known, axis=1)
+	known_after = np.maximum.accumulate(known[:, ::-1], axis=1)[:, ::-1]
+
+	return (~known & known_before & known_after).any(axis=1)
+
+
+# Rules used by bad_data_identifier to split the good and bad data
+BAD_DATA_RULES = ('forecast_missing', 'forecast_not_positive', 'bus_missing', 'bus_not_positive')
+
+
+ValidationResult = collections.namedtuple('ValidationResult', ['violations', 'bitmask'])
+ValidationResult.__doc__ = """
+	Result of validate
+	violations:  Boolean DataFrame (rows x rules) which is True where a row breaks a rule
+	bitmask:  Series with the violations of each row as an integer, bit n is set if the rule with bit n is broken
+"""
+
+
+def validate(df, rules=None):
+	"""
+		Function evaluates the rules over the whole DataFrame
+	:param pd.DataFrame df:  Processed load estimate
+	:param list rules:  (optional) Names of the rules to evaluate, defaults to all registered rules
+	:return ValidationResult result:
+	"""
+	if rules is None:
+		rules = list(RULES)
+	columns = column_groups(df=df)
+
+	violations = pd.DataFrame(
+		collections.OrderedDict((x, RULES[x].evaluate(df=df, columns=columns)) for x in rules),
+		index=df.index,
+		columns=list(rules)
+	)
+
+	bits = np.array([1 << RULES[x].bit for x in rules], dtype=np.int64)
+	bitmask = pd.Series(violations.values.astype(np.int64).dot(bits), index=df.index, name=VIOLATIONS)
+
+	return ValidationResult(violations=violations, bitmask=bitmask)
+
+
+def describe_bitmask(bitmask):
+	"""
+		Function returns the names of the rules which are set in a bitmask
+	:param int bitmask:
+	:return list rule_names:
+	"""
+	return [x.name for x in RULES.values() if int(bitmask) >> x.bit & 1]
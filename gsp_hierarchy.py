@@ -0,0 +1,134 @@
+"""
+#######################################################################################################################
+###											GSP Hierarchy															###
+###																													###
+###		Explicit index of which Primary substations are supplied by each GSP.  The GSPs are numbered in row order,	###
+###		the Primary rows of each GSP are held CSR style (positions and offsets) and each row maps back to its GSP	###
+###		so the hierarchy can be queried and reduced over without masking the DataFrame each time.					###
+###																													###
+#######################################################################################################################
+"""
+
+# Generic Imports
+import numpy as np
+
+# Unique imports
+import common_functions as common
+
+
+def read_only(values):
+	"""
+		Function marks a numpy array as read only so the index cannot be changed once built
+	:param np.ndarray values:
+	:return np.ndarray values:
+	"""
+	values.setflags(write=False)
+	return values
+
+
+class GspHierarchy:
+	"""
+		Index of the GSP and Primary rows of a load estimate.  Each GSP supplies the Primary rows below it up to the
+		next GSP, any Primary rows before the first GSP do not belong to a GSP.
+			gsp_positions:  Row position of each GSP (GSP id n is at row gsp_positions[n])
+			row_gsp:  GSP id of each row, -1 for rows before the first GSP
+			primary_positions:  Row positions of the Primaries ordered by GSP
+			offsets:  The Primaries of GSP n are primary_positions[offsets[n]:offsets[n + 1]]
+	"""
+	def __init__(self, is_gsp, is_primary):
+		"""
+		:param np.ndarray is_gsp:  True for each row which is a GSP
+		:param np.ndarray is_primary:  True for each row which is a Primary
+		"""
+		is_gsp = np.asarray(is_gsp, dtype=bool)
+		is_primary = np.asarray(is_primary, dtype=bool) & ~is_gsp
+
+		self.n_rows = len(is_gsp)
+		self.gsp_positions = read_only(np.flatnonzero(is_gsp))
+		self.row_gsp = read_only(np.cumsum(is_gsp) - 1)
+
+		has_gsp = is_primary & (self.row_gsp >= 0)
+		self.primary_positions = read_only(np.flatnonzero(has_gsp))
+		counts = np.bincount(self.row_gsp[has_gsp], minlength=self.n_gsps)
+		self.offsets = read_only(np.concatenate(([0], np.cumsum(counts))).astype(int))
+
+	@classmethod
+	def from_dataframe(cls, df_raw):
+		"""
+			Builds the hierarchy from the GSP and Primary flags (see DataFrame_Approach.determine_gsp_primary_flag)
+		:param pd.DataFrame df_raw:
+		:return GspHierarchy hierarchy:
+		"""
+		flags = []
+		for x in (common.Headers.sub_gsp, common.Headers.sub_primary):
+			if x in df_raw.columns:
+				flags.append((df_raw[x] == True).values)
+			else:
+				flags.append(np.zeros(len(df_raw.index), dtype=bool))
+
+		return cls(is_gsp=flags[0], is_primary=flags[1])
+
+	@property
+	def n_gsps(self):
+		"""
+			Number of GSPs
+		:return int n_gsps:
+		"""
+		return len(self.gsp_positions)
+
+	def primaries(self, gsp_id):
+		"""
+			Returns the row positions of the Primaries of a GSP
+		:param int gsp_id:
+		:return np.ndarray positions:
+		"""
+		return self.primary_positions[self.offsets[gsp_id]:self.offsets[gsp_id + 1]]
+
+	def gsp_of(self, position):
+		"""
+			Returns the GSP id of a row (or array of rows), -1 if the row is before the first GSP
+		:param int position:
+		:return int gsp_id:
+		"""
+		return self.row_gsp[position]
+
+	def primary_counts(self):
+		"""
+			Returns the number of Primaries of each GSP
+		:return np.ndarray counts:
+		"""
+		return np.diff(self.offsets)
+
+	def broadcast(self, gsp_values, fill_value=np.nan):
+		"""
+			Function maps a value for each GSP to every row belonging to the GSP
+		:param np.ndarray gsp_values:  Value for each GSP (n_gsps or n_gsps x columns)
+		:param fill_value:  (optional) Value for rows before the first GSP
+		:return np.ndarray values:  Value for each row
+		"""
+		gsp_values = np.asarray(gsp_values)
+		has_gsp = self.row_gsp >= 0
+		dtype = np.result_type(gsp_values, np.array(fill_value))
+		values = np.full((self.n_rows, ) + gsp_values.shape[1:], fill_value, dtype=dtype)
+		values[has_gsp] = gsp_values[self.row_gsp[has_gsp]]
+
+		return values
+
+	def reduce_primaries(self, values, ufunc=np.add, identity=0):
+		"""
+			Function reduces the values of the Primaries of each GSP (i.e. sums the Primary loads) in one call of
+			ufunc.reduceat
+		:param np.ndarray values:  Value for each row (n_rows or n_rows x columns)
+		:param np.ufunc ufunc:  (optional) Function used to combine the values, np.add, np.maximum, etc.
+		:param identity:  (optional) Result for GSPs without any Primaries
+		:return np.ndarray reduced:  Value for each GSP
+		"""
+		values = np.asarray(values)[self.primary_positions]
+		dtype = np.result_type(values, np.array(identity))
+		reduced = np.full((self.n_gsps, ) + values.shape[1:], identity, dtype=dtype)
+		has_primaries = self.primary_counts() > 0
+		if has_primaries.any():
+			# reduceat returns a single value for empty segments so only GSPs with Primaries are reduced
+			reduced[has_primaries] = ufunc.reduceat(values, self.offsets[:-1][has_primaries], axis=0)
+
+		return reduced
@@ -0,0 +1,176 @@
+"""
+#######################################################################################################################
+###											Incremental Processing													###
+###																													###
+###		Processing of a load estimate which only recalculates the GSP blocks which have changed since the last		###
+###		run.  Each block is identified by a fingerprint of its contents and the processed block is kept until a		###
+###		later run no longer contains it.  The season quantiles depend on every block so are recalculated from the	###
+###		summary of the season loads kept for each block.															###
+###																													###
+#######################################################################################################################
+"""
+
+# Generic Imports
+import collections
+import hashlib
+import pandas as pd
+import numpy as np
+
+# Unique imports
+import common_functions as common
+import DataFrame_Approach as approach
+
+# Processing steps which depend on all GSP blocks and so are run on the combined DataFrame
+GLOBAL_STAGES = ('season_load_filler', 'normalise_dtypes')
+
+
+def block_stages(pipeline):
+	"""
+		Function returns the processing steps which only depend on the rows of a single GSP block
+	:param approach.LoadEstimatePipeline pipeline:
+	:return list stages:  List of (name, function)
+	"""
+	return [x for x in pipeline.stages() if x[0] not in GLOBAL_STAGES]
+
+
+def row_hashes(df_raw):
+	"""
+		Function returns a hash of the contents of each row, the index is not included so a row which has only moved
+		still has the same hash
+	:param pd.DataFrame df_raw:
+	:return np.ndarray hashes:  uint64 hash of each row
+	"""
+	return pd.util.hash_pandas_object(df_raw, index=False).values
+
+
+def block_fingerprint(hashes, columns):
+	"""
+		Function returns a fingerprint of the contents of a GSP block from the hashes of its rows
+	:param np.ndarray hashes:  Hash of each row of the block (see row_hashes)
+	:param list columns:  Columns of the raw load estimate
+	:return str fingerprint:
+	"""
+	h = hashlib.sha1()
+	h.update(repr(list(columns)).encode('utf-8'))
+	h.update(hashes.tobytes())
+
+	return h.hexdigest()
+
+
+ProcessedBlock = collections.namedtuple('ProcessedBlock', ['df', 'available_values'])
+ProcessedBlock.__doc__ = """
+	Processed GSP block kept between runs
+	df:  Processed rows of the block (before the season loads are filled) indexed by position within the block
+	available_values:  Summary of the season loads of the block (see common.season_summary)
+"""
+
+
+class IncrementalPipeline:
+	"""
+		Processes a raw load estimate with the steps of DataFrame_Approach.LoadEstimatePipeline but only recalculates
+		the GSP blocks which have changed since the previous call to run.  A GSP without an aggregate demand is kept in
+		the same block as the GSP before it, whose diversity factor it takes (see
+		DataFrame_Approach.independent_block_ids), so the result is the same as processing the whole load estimate.
+	"""
+	def __init__(self, config=None):
+		"""
+		:param approach.PipelineConfig config:  (optional) Configuration, defaults to all filling turned on
+		"""
+		self.pipeline = approach.LoadEstimatePipeline(config=config)
+		self.config = self.pipeline.config
+		# Processed blocks from the previous run keyed by fingerprint
+		self.blocks = dict()
+		# Number of blocks in the last run and how many of them were recalculated
+		self.stats = {'blocks': 0, 'recalculated': 0}
+
+	def block_stages(self):
+		"""
+			Returns the processing steps which only depend on the rows of a single GSP block
+		:return list stages:  List of (name, function)
+		"""
+		return block_stages(pipeline=self.pipeline)
+
+	def process_blocks(self, df_raw, starts, ends, changed, fingerprints):
+		"""
+			Function processes the changed blocks together and stores the result for each block
+		:param pd.DataFrame df_raw:  Raw load estimate with a default index
+		:param np.ndarray starts:  Position of the first row of each block
+		:param np.ndarray ends:  Position after the last row of each block
+		:param list changed:  Block numbers which need to be processed
+		:param list fingerprints:  Fingerprint of each block
+		:return None:
+		"""
+		positions = np.concatenate([np.arange(starts[n], ends[n]) for n in changed])
+		# Blocks are independent of each other (see DataFrame_Approach.independent_block_ids) so all of the changed
+		# blocks are processed in one go
+		df = df_raw.iloc[positions].copy()
+		for _, stage in self.block_stages():
+			df = stage(df_raw=df)
+
+		# Block number of each row remaining after processing
+		block_numbers = np.searchsorted(starts, df.index.values, side='right') - 1
+		for n in changed:
+			df_block = df.loc[block_numbers == n]
+			df_block.index = df_block.index - starts[n]
+			self.blocks[fingerprints[n]] = ProcessedBlock(
+				df=df_block,
+				available_values=common.season_summary(df_raw=df_block, sketch_error=self.config.season_sketch_error))
+
+		return None
+
+	def season_fill(self, df_out, fingerprints):
+		"""
+			Function fills the missing season loads using the quantiles of the season summaries of all blocks
+		:param pd.DataFrame df_out:  Combined processed blocks
+		:param list fingerprints:  Fingerprint of each block
+		:return pd.DataFrame df_out:
+		"""
+		available_values = common.merge_season_summaries(
+			summaries=[self.blocks[x].available_values for x in fingerprints])
+		season_fill = common.season_quantiles(
+			df_raw=df_out, quantiles=self.config.season_quantiles, available_values=available_values)
+
+		return season_fill.apply(df_raw=df_out)
+
+	def run(self, df_raw):
+		"""
+			Processes the raw load estimate, the DataFrame passed in is not changed
+		:param pd.DataFrame df_raw: Raw load estimate (as returned by common.import_raw_load_estimates)
+		:return pd.DataFrame df_out:  Output DataFrame after processing
+		"""
+		df = df_raw.reset_index(drop=True)
+		# Blocks which depend on the block before them are kept together so each group can be processed on its own
+		block_ids = approach.independent_block_ids(df_raw=df, per_year=self.config.diversity_per_year)
+		starts = np.flatnonzero(np.r_[True, block_ids[1:] != block_ids[:-1]]) if len(block_ids) else np.array([], int)
+		ends = np.r_[starts[1:], len(block_ids)].astype(int)
+
+		# All rows hashed in one go, which is much quicker than hashing each block separately
+		hashes = row_hashes(df_raw=df)
+		fingerprints = [block_fingerprint(hashes=hashes[s:e], columns=df.columns) for s, e in zip(starts, ends)]
+		changed = [n for n, x in enumerate(fingerprints) if x not in self.blocks]
+		if changed:
+			self.process_blocks(df_raw=df, starts=starts, ends=ends, changed=changed, fingerprints=fingerprints)
+		# Blocks which are no longer in the load estimate are discarded
+		self.blocks = {x: self.blocks[x] for x in fingerprints}
+		self.stats = {'blocks': len(fingerprints), 'recalculated': len(changed)}
+
+		if not fingerprints:
+			return self.pipeline.run(df_raw=df_raw)
+
+		parts = [self.blocks[x].df for x in fingerprints]
+		df_out = pd.concat(parts, sort=False)
+		# Rows of each block moved to the current position of the block and labelled with the original index
+		offsets = np.repeat(starts, [len(x.index) for x in parts])
+		df_out.index = df_raw.index[df_out.index.values + offsets]
+
+		for name, stage in self.pipeline.stages():
+			if name not in GLOBAL_STAGES:
+				continue
+			if name == 'season_load_filler':
+				# Quantiles are found from the season summaries kept for each block
+				if self.config.fill_seasons:
+					df_out = self.season_fill(df_out=df_out, fingerprints=fingerprints)
+			else:
+				df_out = stage(df_raw=df_out)
+
+		return df_out
@@ -0,0 +1,178 @@
+"""
+#######################################################################################################################
+###											Output Formats															###
+###																													###
+###		Writing and reading of the processed load estimate DataFrames in excel or one of the faster formats			###
+###		(Parquet, Feather, pickle) selected by OUTPUT_FORMAT														###
+###																													###
+#######################################################################################################################
+"""
+
+# Generic Imports
+import os
+import datetime
+import numpy as np
+import pandas as pd
+
+# Unique imports
+import common_functions as common
+
+
+# noinspection PyClassHasNoInit
+class OutputFormat:
+	"""
+		Formats available for the processed DataFrames and the file extension used for each
+	"""
+	excel = 'excel'
+	parquet = 'parquet'
+	feather = 'feather'
+	pickle = 'pickle'
+
+	extensions = {
+		excel: '.xlsx',
+		parquet: '.parquet',
+		feather: '.feather',
+		pickle: '.pkl'
+	}
+
+
+# Format used for the processed DataFrames (Parquet and Feather require pyarrow to be installed)
+OUTPUT_FORMAT = OutputFormat.excel
+
+# Name given to an unnamed index when it needs to be stored as a column
+INDEX_COLUMN = '__index_level_0__'
+
+# Types inferred by pandas for object columns which can be stored in a columnar format without any conversion
+COLUMNAR_TYPES = ('string', 'floating', 'integer', 'mixed-integer-float', 'boolean', 'datetime', 'date', 'empty')
+
+# Name of the column holding the values which are not numbers of a mixed column when stored in a columnar format
+RAW_TEXT_COLUMN = '{} (text)'
+
+
+def output_file_name(file_name, output_format=OUTPUT_FORMAT):
+	"""
+		Function returns the file name with the extension for the output format
+	:param str file_name:  File name (i.e. common.excel_file_names.df_raw_excel_name)
+	:param str output_format:  (optional) One of OutputFormat
+	:return str file_name:
+	"""
+	if output_format not in OutputFormat.extensions:
+		raise ValueError('Output format {} is not one of {}'.format(output_format, list(OutputFormat.extensions)))
+
+	return '{}{}'.format(os.path.splitext(file_name)[0], OutputFormat.extensions[output_format])
+
+
+def output_file_path(file_name, output_format=OUTPUT_FORMAT, output_dir=None):
+	"""
+		Function returns the full path of an output file, in output_dir if given otherwise in the folder containing
+		these scripts
+	:param str file_name:  File name, the extension is replaced to match the output format
+	:param str output_format:  (optional) One of OutputFormat
+	:param str output_dir:  (optional) Folder the file is in
+	:return str file_pth:
+	"""
+	file_name = output_file_name(file_name, output_format=output_format)
+	if output_dir is None:
+		return common.get_local_file_path(file_name=file_name)
+
+	return os.path.join(output_dir, file_name)
+
+
+def columnar_safe(df):
+	"""
+		Function returns a DataFrame which can be stored in a columnar format (Parquet / Feather) and read back with
+		the same dtypes.  Object columns which only contain numbers are given a numeric dtype.  Object columns
+		containing a mix of types (i.e. numbers and text) cannot be represented, so the numbers (or dates) are kept
+		as a numeric (or date) column and the other values are stored as text in a separate column (see RAW_TEXT_COLUMN) which
+		restore_mixed_columns combines again.
+	:param pd.DataFrame df:
+	:return pd.DataFrame df_out:
+	"""
+	df_out = df.infer_objects()
+	mixed_columns = [
+		x for x in df_out.columns
+		if df_out[x].dtype == object and pd.api.types.infer_dtype(df_out[x], skipna=True) not in COLUMNAR_TYPES
+	]
+	for x in mixed_columns:
+		raw_text = RAW_TEXT_COLUMN.format(x)
+		if raw_text in df_out.columns:
+			raise ValueError('Column {} cannot be stored as the column {} already exists'.format(x, raw_text))
+		is_number = df_out[x].notna() & df_out[x].map(
+			lambda v: pd.api.types.is_number(v) and not pd.api.types.is_bool(v)).astype(bool)
+		is_date = df_out[x].map(lambda v: isinstance(v, (datetime.datetime, np.datetime64))).astype(bool)
+		# Dates are kept as dates if there are no numbers in the column
+		is_value = is_number if is_number.any() or not is_date.any() else is_date
+		is_text = ~is_value & df_out[x].notna()
+		df_out.insert(df_out.columns.get_loc(x) + 1, raw_text, df_out[x].astype(str).where(is_text))
+		if is_value is is_date:
+			df_out[x] = pd.to_datetime(df_out[x].where(is_date), errors='coerce')
+		else:
+			df_out[x] = pd.to_numeric(df_out[x].where(is_number), errors='coerce')
+
+	return df_out
+
+
+def restore_mixed_columns(df):
+	"""
+		Function combines the numeric and text columns of the mixed columns split by columnar_safe so the DataFrame
+		read back has the same columns as the DataFrame written
+	:param pd.DataFrame df:
+	:return pd.DataFrame df:
+	"""
+	mixed_columns = [x for x in df.columns if RAW_TEXT_COLUMN.format(x) in df.columns]
+	for x in mixed_columns:
+		raw_text = RAW_TEXT_COLUMN.format(x)
+		df[x] = df[x].astype(object).where(df[raw_text].isna(), df[raw_text])
+
+	return df.drop(columns=[RAW_TEXT_COLUMN.format(x) for x in mixed_columns])
+
+
+def write_output(df, file_name, output_format=OUTPUT_FORMAT, output_dir=None):
+	"""
+		Function writes a processed DataFrame (including its index) to the folder containing these scripts
+	:param pd.DataFrame df:  DataFrame to write
+	:param str file_name:  File name, the extension is replaced to match the output format
+	:param str output_format:  (optional) One of OutputFormat
+	:param str output_dir:  (optional) Folder to write the file to instead of the folder containing these scripts
+	:return str file_pth:  Full path to the file written
+	"""
+	file_pth = output_file_path(file_name=file_name, output_format=output_format, output_dir=output_dir)
+
+	if output_format == OutputFormat.excel:
+		df.to_excel(file_pth)
+	elif output_format == OutputFormat.pickle:
+		df.to_pickle(file_pth)
+	elif output_format == OutputFormat.parquet:
+		columnar_safe(df).to_parquet(file_pth)
+	elif output_format == OutputFormat.feather:
+		# Feather only supports a default index so the index is stored as the first column
+		df_out = columnar_safe(df)
+		df_out = df_out.rename_axis(df_out.index.name or INDEX_COLUMN).reset_index()
+		df_out.to_feather(file_pth)
+
+	return file_pth
+
+
+def read_output(file_name, output_format=OUTPUT_FORMAT, output_dir=None):
+	"""
+		Function reads a processed DataFrame written by write_output
+	:param str file_name:  File name, the extension is replaced to match the output format
+	:param str output_format:  (optional) One of OutputFormat
+	:param str output_dir:  (optional) Folder the file was written to
+	:return pd.DataFrame df:
+	"""
+	file_pth = output_file_path(file_name=file_name, output_format=output_format, output_dir=output_dir)
+
+	if output_format == OutputFormat.excel:
+		df = common.import_excel(pth_load_est=file_pth)
+	elif output_format == OutputFormat.pickle:
+		df = pd.read_pickle(file_pth)
+	elif output_format == OutputFormat.parquet:
+		df = restore_mixed_columns(pd.read_parquet(file_pth))
+	else:
+		df = pd.read_feather(file_pth)
+		df = restore_mixed_columns(df.set_index(df.columns[0]))
+		if df.index.name == INDEX_COLUMN:
+			df.index.name = None
+
+	return df
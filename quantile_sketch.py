@@ -0,0 +1,213 @@
+"""
+#######################################################################################################################
+###											Quantile Sketch															###
+###																													###
+###		Mergeable streaming sketch (KLL style) used to approximate the quantiles of the season loads without		###
+###		keeping all of the values.  Sketches of separate chunks, files or processes can be merged and the sketch	###
+###		can be stored as a dict (i.e. JSON) so running summaries can be kept between releases.						###
+###																													###
+#######################################################################################################################
+"""
+
+# Generic Imports
+import math
+import numpy as np
+
+# Default rank error of the quantiles returned by a sketch (fraction of the number of values)
+DEFAULT_ERROR = 0.01
+
+# Capacity of the top level is KLL_CONSTANT / error, the KLL bound gives a rank error of about sqrt(log(1/delta)) / k
+# with probability 1 - delta so the constant allows for the many compactions of merged and streamed sketches
+KLL_CONSTANT = 5.0
+
+# Seed of the compactions of a new sketch, the random bits are found from the seed so the results are repeatable
+DEFAULT_SEED = 0
+
+# Each level of the sketch can hold this fraction of the values of the level above it
+CAPACITY_DECAY = 2.0 / 3.0
+
+# Smallest number of values a level can hold
+MIN_CAPACITY = 2
+
+
+class QuantileSketch:
+	"""
+		Sketch of a stream of values from which the quantiles can be found to within a rank error of about error * n
+		using space proportional to 1 / error.  The values are held in levels, each value in level h represents 2^h
+		of the values added.  When a level is full it is sorted and every other value is promoted to the level
+		above.  Whether the first or second of each pair is promoted, and whether an odd value left in the level is
+		the lowest or highest, is random so the errors of the compactions cancel rather than add up.  The random
+		bits are a hash of the seed and the number of compactions so the same values always give the same sketch.
+		While no level has been compacted the quantiles are exact.
+	"""
+	def __init__(self, error=DEFAULT_ERROR, seed=DEFAULT_SEED):
+		"""
+		:param float error:  (optional) Rank error of the quantiles as a fraction of the number of values
+		:param int seed:  (optional) Seed of the random bits used by the compactions
+		"""
+		if not 0 < error < 1:
+			raise ValueError('Error must be between 0 and 1, {} given'.format(error))
+		self.error = error
+		self.k = int(math.ceil(KLL_CONSTANT / error))
+		self.seed = int(seed)
+		self.levels = [np.array([], dtype=float)]
+		# Number of compactions so far, each uses the random bits of its own count
+		self.compactions = 0
+		# Number of values added
+		self.n = 0
+
+	def capacity(self, level):
+		"""
+			Returns the number of values a level can hold before it is compacted
+		:param int level:
+		:return int capacity:
+		"""
+		depth = len(self.levels) - level - 1
+		return max(MIN_CAPACITY, int(math.ceil(self.k * CAPACITY_DECAY ** depth)))
+
+	def random_bits(self):
+		"""
+			Returns two random bits for the next compaction (splitmix64 hash of the seed and the number of compactions)
+		:return (int, int) offset, keep_high:
+		"""
+		mask = 0xFFFFFFFFFFFFFFFF
+		x = (self.seed * 0x9E3779B97F4A7C15 + (self.compactions + 1) * 0xBF58476D1CE4E5B9) & mask
+		x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & mask
+		x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & mask
+		x ^= x >> 31
+		self.compactions += 1
+
+		return (x >> 32) & 1, (x >> 33) & 1
+
+	def update(self, values):
+		"""
+			Function adds values to the sketch, NaN values are ignored
+		:param np.ndarray values:
+		:return QuantileSketch self:
+		"""
+		values = np.asarray(values, dtype=float).ravel()
+		values = values[~np.isnan(values)]
+		if len(values):
+			self.levels[0] = np.concatenate((self.levels[0], values))
+			self.n += len(values)
+			self.compress()
+
+		return self
+
+	def compress(self):
+		"""
+			Function compacts the levels which are over their capacity
+		:return None:
+		"""
+		level = 0
+		while level < len(self.levels):
+			if len(self.levels[level]) > self.capacity(level):
+				if level + 1 == len(self.levels):
+					self.levels.append(np.array([], dtype=float))
+				values = np.sort(self.levels[level])
+				offset, keep_high = self.random_bits()
+				# An odd value is kept in this level so the total weight is unchanged
+				n_keep = len(values) % 2
+				if keep_high and n_keep:
+					keep, pairs = values[-n_keep:], values[:-n_keep]
+				else:
+					keep, pairs = values[:n_keep], values[n_keep:]
+				promoted = pairs[offset::2]
+				self.levels[level] = keep
+				self.levels[level + 1] = np.concatenate((self.levels[level + 1], promoted))
+			level += 1
+
+		return None
+
+	def merge(self, other):
+		"""
+			Function adds the values of another sketch to this sketch
+		:param QuantileSketch other:  Sketch with the same error
+		:return QuantileSketch self:
+		"""
+		if other.k != self.k:
+			raise ValueError('Only sketches with the same error can be merged ({} and {})'.format(
+				self.error, other.error))
+		while len(self.levels) < len(other.levels):
+			self.levels.append(np.array([], dtype=float))
+		for level, values in enumerate(other.levels):
+			self.levels[level] = np.concatenate((self.levels[level], values))
+		self.n += other.n
+		self.compress()
+
+		return self
+
+	def weighted_values(self):
+		"""
+			Returns the values held in the sketch in order and the number of values each represents
+		:return (np.ndarray, np.ndarray) values, weights:
+		"""
+		values = np.concatenate(self.levels)
+		weights = np.concatenate([np.full(len(x), 2 ** level, dtype=float) for level, x in enumerate(self.levels)])
+		order = np.argsort(values, kind='mergesort')
+
+		return values[order], weights[order]
+
+	def percentile(self, q):
+		"""
+			Returns the approximate percentile(s) of the values added, the same as np.percentile (linear interpolation)
+			while no level has been compacted
+		:param float q:  Percentile or array of percentiles (0 to 100)
+		:return float value:  NaN if no values have been added
+		"""
+		if self.n == 0:
+			return np.full(np.shape(q), np.nan) if np.ndim(q) else np.nan
+		values, weights = self.weighted_values()
+		# Rank of the middle of the values each held value represents
+		ranks = np.cumsum(weights) - (weights + 1) / 2
+
+		return np.interp(np.asarray(q, dtype=float) / 100 * (self.n - 1), ranks, values)
+
+	def to_dict(self):
+		"""
+			Returns the sketch as a dict which can be stored as JSON
+		:return dict sketch:
+		"""
+		return {
+			'error': self.error, 'n': self.n, 'seed': self.seed, 'compactions': self.compactions,
+			'levels': [x.tolist() for x in self.levels]
+		}
+
+	@classmethod
+	def from_dict(cls, sketch):
+		"""
+			Returns the sketch stored by to_dict
+		:param dict sketch:
+		:return QuantileSketch sketch:
+		"""
+		result = cls(error=sketch['error'], seed=sketch.get('seed', DEFAULT_SEED))
+		result.n = sketch['n']
+		# Sketches stored before the compactions were random have no count
+		result.compactions = sketch.get('compactions', 0)
+		result.levels = [np.array(x, dtype=float) for x in sketch['levels']]
+
+		return result
+
+
+def sketch_of(values, error=DEFAULT_ERROR):
+	"""
+		Function returns a sketch of the values
+	:param np.ndarray values:
+	:param float error:  (optional) Rank error of the quantiles as a fraction of the number of values
+	:return QuantileSketch sketch:
+	"""
+	return QuantileSketch(error=error).update(values)
+
+
+def merge_sketches(sketches):
+	"""
+		Function merges several sketches into a new sketch, the sketches passed in are not changed
+	:param list sketches:  Sketches with the same error
+	:return QuantileSketch sketch:
+	"""
+	sketches = list(sketches)
+	result = QuantileSketch(error=sketches[0].error)
+	for x in sketches:
+		result.merge(x)
+
+	return result
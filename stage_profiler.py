@@ -0,0 +1,184 @@
+"""
+#######################################################################################################################
+###											Stage Profiler															###
+###																													###
+###		Records the wall time, CPU time, peak memory and size of the DataFrames in and out of each processing		###
+###		stage so that the slow stages can be found and regressions caught.  The results can be exported as JSON	###
+###		or CSV and each stage can optionally be run under cProfile.													###
+###																													###
+#######################################################################################################################
+"""
+
+# Generic Imports
+import collections
+import cProfile
+import json
+import pstats
+import time
+import tracemalloc
+import pandas as pd
+
+
+StageProfile = collections.namedtuple('StageProfile', [
+	'group', 'name', 'wall_time', 'cpu_time', 'peak_memory', 'rows_in', 'columns_in', 'rows_out', 'columns_out'
+])
+StageProfile.__doc__ = """
+	Measurements for a single call of a stage
+	group:  Name of the group the stage belongs to (i.e. the fill configuration) or None
+	name:  Name of the stage
+	wall_time:  Elapsed time (s)
+	cpu_time:  CPU time used by this process (s)
+	peak_memory:  Peak memory allocated during the stage (bytes) or None if memory is not being traced
+	rows_in, columns_in:  Shape of the DataFrame passed to the stage or None if it was not a DataFrame
+	rows_out, columns_out:  Shape of the DataFrame returned by the stage or None if it was not a DataFrame
+"""
+
+
+def frame_shape(df):
+	"""
+		Function returns the number of rows and columns of a DataFrame or (None, None) for anything else
+	:param df:
+	:return (int, int) shape:
+	"""
+	if isinstance(df, pd.DataFrame):
+		return df.shape
+
+	return None, None
+
+
+class StageProfiler:
+	"""
+		Runs functions as named stages and records a StageProfile for each call
+	"""
+	def __init__(self, enabled=True, trace_memory=False, use_cprofile=False):
+		"""
+		:param bool enabled:  (optional) If False then the stages are run without being profiled
+		:param bool trace_memory:  (optional) If True then the peak memory of each stage is traced with tracemalloc,
+									this slows down the stages so the times should be taken from a separate run
+									without it
+		:param bool use_cprofile:  (optional) If True then each stage is also run under cProfile
+		"""
+		self.enabled = enabled
+		self.trace_memory = trace_memory
+		self.records = []
+		# Reports recorded by the stages (i.e. the dtype memory report of normalise_dtypes) as (group, name, report)
+		self.reports = []
+		self.profile = cProfile.Profile() if enabled and use_cprofile else None
+
+	def call(self, name, func, df_in=None, group=None, **kwargs):
+		"""
+			Function runs a stage and records its profile
+		:param str name:  Name of the stage
+		:param function func:  Function to run
+		:param pd.DataFrame df_in:  (optional) DataFrame passed to the stage, this is passed to func as df_raw
+		:param str group:  (optional) Name of the group the stage belongs to
+		:param kwargs:  Other arguments passed to func
+		:return result:  Value returned by func
+		"""
+		if df_in is not None:
+			kwargs['df_raw'] = df_in
+		if not self.enabled:
+			return func(**kwargs)
+
+		rows_in, columns_in = frame_shape(df_in)
+
+		started_tracing = False
+		if self.trace_memory:
+			if not tracemalloc.is_tracing():
+				tracemalloc.start()
+				started_tracing = True
+			# Clearing the traces also resets the peak so the peak only includes this stage
+			tracemalloc.clear_traces()
+
+		if self.profile is not None:
+			self.profile.enable()
+		wall_start = time.perf_counter()
+		cpu_start = time.process_time()
+		try:
+			result = func(**kwargs)
+		finally:
+			cpu_time = time.process_time() - cpu_start
+			wall_time = time.perf_counter() - wall_start
+			if self.profile is not None:
+				self.profile.disable()
+			peak_memory = None
+			if self.trace_memory:
+				peak_memory = tracemalloc.get_traced_memory()[1]
+				if started_tracing:
+					tracemalloc.stop()
+
+		rows_out, columns_out = frame_shape(result)
+		self.records.append(StageProfile(
+			group=group, name=name, wall_time=wall_time, cpu_time=cpu_time, peak_memory=peak_memory,
+			rows_in=rows_in, columns_in=columns_in, rows_out=rows_out, columns_out=columns_out
+		))
+
+		return result
+
+	def add_report(self, name, report, group=None):
+		"""
+			Function records a report produced alongside a stage, nothing is recorded if the profiler is not enabled
+		:param str name:  Name of the stage the report belongs to
+		:param pd.DataFrame report:
+		:param str group:  (optional) Name of the group the stage belongs to
+		:return None:
+		"""
+		if self.enabled:
+			self.reports.append((group, name, report))
+
+		return None
+
+	def to_dataframe(self):
+		"""
+			Returns the profile of every stage called as a DataFrame
+		:return pd.DataFrame df:
+		"""
+		return pd.DataFrame(self.records, columns=StageProfile._fields)
+
+	def summary(self):
+		"""
+			Returns the total and mean time and the maximum peak memory of each stage over all calls, ordered with the
+			slowest stage first
+		:return pd.DataFrame df:
+		"""
+		df = self.to_dataframe()
+		df_summary = df.groupby('name', sort=False).agg(collections.OrderedDict((
+			('wall_time', ['count', 'sum', 'mean']),
+			('cpu_time', ['sum']),
+			('peak_memory', ['max'])
+		)))
+
+		return df_summary.sort_values(('wall_time', 'sum'), ascending=False)
+
+	def write_json(self, pth_file):
+		"""
+			Function writes the profile of every stage called to a JSON file
+		:param str pth_file:  Full path to the file
+		:return None:
+		"""
+		with open(pth_file, 'w') as f:
+			json.dump([x._asdict() for x in self.records], f, indent=2)
+
+		return None
+
+	def write_csv(self, pth_file):
+		"""
+			Function writes the profile of every stage called to a CSV file
+		:param str pth_file:  Full path to the file
+		:return None:
+		"""
+		self.to_dataframe().to_csv(pth_file, index=False)
+
+		return None
+
+	def write_cprofile(self, pth_file):
+		"""
+			Function writes the cProfile statistics of all stages called so they can be examined with pstats
+		:param str pth_file:  Full path to the file
+		:return None:
+		"""
+		if self.profile is None:
+			raise ValueError('Stages have not been run under cProfile, use_cprofile must be True')
+		pstats.Stats(self.profile).dump_stats(pth_file)
+
+		return None
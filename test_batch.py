@@ -0,0 +1,75 @@
+"""
+#######################################################################################################################
+###											Batch Tests																###
+###																													###
+###		Checks that a batch of synthetic workbooks in several folders is processed into a mirrored results tree	###
+###		and that a broken workbook is recorded as failed without stopping the others.								###
+###																													###
+#######################################################################################################################
+"""
+
+# Generic Imports
+import os
+import shutil
+import tempfile
+import unittest
+import pandas as pd
+
+# Unique imports
+import batch
+import benchmark
+import common_functions as common
+import output_formats as output
+
+# Number of GSPs in each synthetic workbook
+N_GSP = 4
+
+
+class TestBatch(unittest.TestCase):
+	"""
+		Batch of two synthetic workbooks and a corrupt workbook
+	"""
+	def setUp(self):
+		self.tmp_dir = tempfile.mkdtemp()
+		self.releases_dir = os.path.join(self.tmp_dir, 'releases')
+		self.results_dir = os.path.join(self.tmp_dir, 'results')
+		for folder, file_name in (('2019', 'release.xlsx'), ('2020', 'release.xlsx')):
+			os.makedirs(os.path.join(self.releases_dir, folder), exist_ok=True)
+			benchmark.write_synthetic_workbook(
+				pth_workbook=os.path.join(self.releases_dir, folder, file_name),
+				df_sheet=benchmark.synthetic_sheet(n_gsp=N_GSP))
+		with open(os.path.join(self.releases_dir, '2020', 'broken.xlsx'), 'wb') as f:
+			f.write(b'not a workbook')
+
+	def tearDown(self):
+		shutil.rmtree(self.tmp_dir)
+
+	def testBatch(self):
+		df_index = batch.run_batch(
+			pattern=os.path.join(self.releases_dir, '**', '*.xlsx'), results_dir=self.results_dir, max_workers=2,
+			output_format=output.OutputFormat.pickle)
+
+		self.assertEqual(
+			[os.path.relpath(x, self.releases_dir) for x in df_index['workbook']],
+			[os.path.join('2019', 'release.xlsx'), os.path.join('2020', 'broken.xlsx'),
+			 os.path.join('2020', 'release.xlsx')])
+		self.assertEqual(df_index['status'].tolist(), [batch.Status.ok, batch.Status.failed, batch.Status.ok])
+		self.assertIsInstance(df_index['error'].iloc[1], str)
+		self.assertTrue((df_index['rows'].iloc[[0, 2]] > 0).all())
+
+		# Results tree mirrors the folders of the workbooks
+		for folder in (os.path.join('2019', 'release'), os.path.join('2020', 'release')):
+			output_dir = os.path.join(self.results_dir, folder)
+			self.assertTrue(os.path.isfile(output.output_file_path(
+				file_name=common.excel_file_names.df_modified_excel_name, output_format=output.OutputFormat.pickle,
+				output_dir=output_dir)))
+			self.assertTrue(os.path.isfile(os.path.join(
+				output_dir, common.excel_file_names.data_comparison_excel_name)))
+
+		df_csv = pd.read_csv(os.path.join(self.results_dir, common.excel_file_names.batch_index_csv_name))
+		self.assertEqual(df_csv['status'].tolist(), df_index['status'].tolist())
+		self.assertEqual(df_csv['workbook'].tolist(), df_index['workbook'].tolist())
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,98 @@
+"""
+#######################################################################################################################
+###											Chunked Processing Tests												###
+###																													###
+###		Checks that processing a load estimate in partitions, either from a DataFrame or streamed from a			###
+###		workbook, gives the same result as processing the whole load estimate.										###
+###																													###
+#######################################################################################################################
+"""
+
+# Generic Imports
+import os
+import shutil
+import tempfile
+import unittest
+import pandas as pd
+
+# Unique imports
+import benchmark
+import chunked
+import common_functions as common
+import DataFrame_Approach as approach
+import output_formats as output
+
+# Number of GSPs in the synthetic load estimates
+N_GSP = 12
+# GSPs whose aggregate demand is missing so they take the diversity factor of the GSP before them
+MISSING_AGGREGATES = (5, 6)
+# Partitions are small enough that every GSP block would start a new partition
+PARTITION_ROWS = 20
+
+
+def without_categories(df):
+	"""
+		Function converts the category columns to object so that DataFrames normalised in parts can be compared with
+		one normalised as a whole (the categories of each part differ)
+	:param pd.DataFrame df:
+	:return pd.DataFrame df:
+	"""
+	df = df.copy()
+	for x in df.columns[(df.dtypes == 'category').values]:
+		df[x] = df[x].astype(object)
+
+	return df
+
+
+class TestChunkedPipeline(unittest.TestCase):
+	"""
+		Chunked and streamed processing against processing the whole load estimate
+	"""
+	@classmethod
+	def setUpClass(cls):
+		cls.tmp_dir = tempfile.mkdtemp()
+		cls.pth_workbook = os.path.join(cls.tmp_dir, 'synthetic.xlsx')
+		benchmark.write_synthetic_workbook(
+			pth_workbook=cls.pth_workbook,
+			df_sheet=benchmark.synthetic_sheet(n_gsp=N_GSP, missing_aggregates=MISSING_AGGREGATES))
+		cls.df_raw = common.import_raw_load_estimates(pth_load_est=cls.pth_workbook)
+
+	@classmethod
+	def tearDownClass(cls):
+		shutil.rmtree(cls.tmp_dir)
+
+	def testPartitionBounds(self):
+		""" Confirms that a partition never starts at a GSP without an aggregate demand """
+		bounds = chunked.partition_bounds(df_raw=self.df_raw, partition_rows=PARTITION_ROWS)
+		self.assertEqual(len(bounds), N_GSP - len(MISSING_AGGREGATES))
+		gsp_positions = approach.gsp_rows(df_raw=self.df_raw).values.nonzero()[0]
+		starts = [x[0] for x in bounds]
+		for gsp_number in MISSING_AGGREGATES:
+			self.assertNotIn(gsp_positions[gsp_number], starts)
+
+	def testChunked(self):
+		for config in (approach.PipelineConfig.from_fill(fill=False), approach.PipelineConfig(),
+					   approach.PipelineConfig(diversity_per_year=True)):
+			expected = approach.run(self.df_raw, config=config)
+			self.assertFalse(expected[common.Headers.diverse_factor].isna().any())
+			for processes in (1, 2):
+				pipeline = chunked.ChunkedPipeline(config=config, processes=processes, partition_rows=PARTITION_ROWS)
+				pd.testing.assert_frame_equal(pipeline.run(df_raw=self.df_raw), expected)
+				self.assertGreater(pipeline.stats['partitions'], 1)
+
+	def testStreamed(self):
+		""" Confirms that the partitions written by the streamed backend make up the full result """
+		expected = without_categories(approach.run(self.df_raw))
+		output_dir = os.path.join(self.tmp_dir, 'streamed')
+		file_pths = chunked.run_workbook(
+			pth_load_est=self.pth_workbook, output_dir=output_dir, processes=1, partition_rows=PARTITION_ROWS,
+			output_format=output.OutputFormat.pickle)
+
+		self.assertEqual(len(file_pths), N_GSP - len(MISSING_AGGREGATES))
+		self.assertEqual(sorted(os.listdir(output_dir)), sorted(os.path.basename(x) for x in file_pths))
+		df_out = without_categories(pd.concat([pd.read_pickle(x) for x in file_pths], sort=False))
+		pd.testing.assert_frame_equal(df_out, expected, check_dtype=False)
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,50 @@
+"""
+#######################################################################################################################
+###											Common Functions Tests													###
+###																													###
+###		Checks the reading of the load estimate workbook using a synthetic workbook written by benchmark.			###
+###																													###
+#######################################################################################################################
+"""
+
+# Generic Imports
+import os
+import shutil
+import tempfile
+import unittest
+import pandas as pd
+
+# Unique imports
+import benchmark
+import common_functions as common
+
+# Number of GSPs in the synthetic workbook
+N_GSP = 12
+
+
+class TestLoadEstimateBlocks(unittest.TestCase):
+	"""
+		Reading the load estimate one GSP block at a time
+	"""
+	@classmethod
+	def setUpClass(cls):
+		cls.tmp_dir = tempfile.mkdtemp()
+		cls.pth_workbook = os.path.join(cls.tmp_dir, 'synthetic.xlsx')
+		benchmark.write_synthetic_workbook(
+			pth_workbook=cls.pth_workbook, df_sheet=benchmark.synthetic_sheet(n_gsp=N_GSP))
+
+	@classmethod
+	def tearDownClass(cls):
+		shutil.rmtree(cls.tmp_dir)
+
+	def testBlocksMatchImport(self):
+		""" Confirms that the GSP blocks read one at a time make up the same DataFrame as the full import """
+		blocks = list(common.iter_load_estimate_blocks(pth_load_est=self.pth_workbook))
+		self.assertEqual(len(blocks), N_GSP)
+		pd.testing.assert_frame_equal(
+			pd.concat(blocks, sort=False), common.import_raw_load_estimates(pth_load_est=self.pth_workbook),
+			check_dtype=False)
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,125 @@
+"""
+#######################################################################################################################
+###											Data Comparison Tests													###
+###																													###
+###		Checks the differences found between two DataFrames and between two releases of the load estimate and		###
+###		the comparison workbook written from them.																	###
+###																													###
+#######################################################################################################################
+"""
+
+# Generic Imports
+import datetime
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+import openpyxl
+
+# Unique imports
+import benchmark
+import common_functions as common
+import data_comparison as comparison
+import DataFrame_Approach as approach
+
+
+class TestDiffDataFrames(unittest.TestCase):
+	"""
+		Differences between two DataFrames of the same dimensions
+	"""
+	def setUp(self):
+		self.df1 = pd.DataFrame({'Load': [1.0, 2.0, np.nan, 4.0], 'Name': ['A', 'B', 'C', 'D']})
+		self.df2 = pd.DataFrame({'Load': [1.0 + 1e-12, 3.0, 5.0, 4.0], 'Name': ['A', 'B', None, 'E']})
+
+	def testDiff(self):
+		diff = comparison.diff_dataframes(df1=self.df1, df2=self.df2)
+		self.assertEqual(
+			list(zip(diff.changes['row'], diff.changes['col'], diff.changes['kind'])),
+			[(1, 0, comparison.DataFrameDiff.modified), (2, 0, comparison.DataFrameDiff.filled),
+			 (2, 1, comparison.DataFrameDiff.cleared), (3, 1, comparison.DataFrameDiff.modified)])
+		np.testing.assert_array_equal(np.argwhere(diff.mask(kinds=(comparison.DataFrameDiff.cleared, ))), [[2, 1]])
+
+	def testCompareDataFrames(self):
+		""" Confirms that compare_dataframes keeps the new value of each changed cell """
+		df_diff, _ = comparison.compare_dataframes(df1=self.df1, df2=self.df2)
+		pd.testing.assert_frame_equal(
+			df_diff, pd.DataFrame({'Load': [np.nan, 3.0, 5.0, np.nan], 'Name': [np.nan, np.nan, np.nan, 'E']}))
+
+		with self.assertRaises(ValueError):
+			comparison.compare_dataframes(df1=self.df1, df2=self.df2.iloc[:2])
+
+
+
+class TestCompareReleases(unittest.TestCase):
+	"""
+		Comparison of two releases of the processed load estimate
+	"""
+	def testShuffledRelease(self):
+		""" Confirms that substations are matched irrespective of their order and added and removed ones found """
+		df_old = approach.run(df_raw=benchmark.synthetic_raw_load_estimates(n_gsp=4))
+		primaries = np.flatnonzero(df_old[common.Headers.sub_primary].values)
+		load = common.column_layout(df_raw=df_old).labels['forecast_years'][0]
+
+		# New release in a different order with one Primary removed, one added, one changed and a new column
+		df_added = df_old.iloc[[primaries[0]]].copy()
+		df_added[common.Headers.nrn] = 99999
+		df_new = pd.concat([df_old.drop(index=df_old.index[primaries[1]]), df_added])
+		df_new = df_new.sample(frac=1, random_state=benchmark.SEED)
+		df_new.loc[df_old.index[primaries[2]], load] += 1
+		df_new['New Column'] = 1.0
+
+		result = comparison.compare_releases(df_old=df_old, df_new=df_new)
+		self.assertEqual(result.added[common.Headers.nrn].tolist(), [99999])
+		self.assertEqual(result.removed.index.tolist(), [df_old.index[primaries[1]]])
+		self.assertEqual(result.added_columns, ['New Column'])
+		self.assertEqual(result.removed_columns, [])
+		self.assertEqual(len(result.diff), 1)
+		self.assertEqual(result.diff.changes['column'].tolist(), [load])
+		self.assertEqual(result.changed_substations.tolist(), [('Primary', '{}/{}'.format(
+			df_old[common.Headers.gsp].iloc[primaries[2]], df_old[common.Headers.nrn].iloc[primaries[2]]), 0)])
+
+		# Dropping a column from the new release shows it as removed
+		result = comparison.compare_releases(df_old=df_old, df_new=df_new.drop(columns=[load]))
+		self.assertEqual(result.removed_columns, [load])
+		self.assertEqual(len(result.diff), 0)
+
+
+class TestComparisonWorkbook(unittest.TestCase):
+	"""
+		Comparison workbook written straight to the worksheets
+	"""
+	def setUp(self):
+		self.tmp_dir = tempfile.mkdtemp()
+
+	def tearDown(self):
+		shutil.rmtree(self.tmp_dir)
+
+	def testModifiedSheet(self):
+		""" Confirms that the modified data is written with its types and only the new values are highlighted """
+		df_raw = pd.DataFrame({
+			'Load': [1.0, np.nan, 3.0, 4.0], 'Count': [1, 2, 3, 4], 'Name': ['A', 'B', '=C', np.nan],
+			'Peak': [datetime.datetime(2020, 1, x) for x in range(1, 5)], 'Sub_GSP': [True, False, False, False]})
+		df_modified = df_raw.copy()
+		df_modified.loc[1, 'Load'] = 2.0
+		df_modified.loc[2, 'Count'] = 5
+		df_modified.loc[3, 'Name'] = 'D'
+		df_modified.loc[0, 'Load'] = np.inf
+		comparison.excel_data_comparison_writer(
+			df_raw=df_raw, df_modified=df_modified, df_bad=df_raw, df_good=df_modified, output_dir=self.tmp_dir)
+
+		worksheet = openpyxl.load_workbook(
+			os.path.join(self.tmp_dir, common.excel_file_names.data_comparison_excel_name))['Modified Data']
+		rows = list(worksheet.iter_rows(values_only=True))
+		self.assertEqual(rows[0], (None, 'Load', 'Count', 'Name', 'Peak', 'Sub_GSP'))
+		self.assertEqual(rows[1], (0, 'inf', 1, 'A', datetime.datetime(2020, 1, 1), True))
+		self.assertEqual(rows[3], (2, 3, 5, '=C', datetime.datetime(2020, 1, 3), False))
+		highlighted = [
+			(cell.row - 2, cell.column - 2) for row in worksheet.iter_rows(min_row=2, min_col=2) for cell in row
+			if cell.fill.fgColor.rgb not in (None, '00000000')]
+		self.assertEqual(highlighted, [(0, 0), (1, 0), (2, 1), (3, 2)])
+
+
+if __name__ == '__main__':
+	unittest.main()
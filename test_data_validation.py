@@ -0,0 +1,126 @@
+"""
+#######################################################################################################################
+###											Data Validation Tests													###
+###																													###
+###		Checks the rule registry, the bitmask of rule violations and that the bad data rules flag the same rows		###
+###		as the original bad_data_identifier.																		###
+###																													###
+#######################################################################################################################
+"""
+
+# Generic Imports
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+
+# Unique imports
+import benchmark
+import common_functions as common
+import data_validation as validation
+import DataFrame_Approach as approach
+import output_formats as output
+
+# Number of GSPs in the synthetic load estimates
+N_GSP = 12
+
+
+def reference_bad_data(df_raw):
+	"""
+		Original version of DataFrame_Approach.bad_data_identifier (without writing the files)
+	:param pd.DataFrame df_raw:
+	:return np.ndarray idx:  True for each row of bad data
+	"""
+	forecast_years = common.adjust_years(headers_list=list(df_raw.columns))
+	bus_list = list(filter(lambda x: x.startswith('PS'), df_raw.columns))
+
+	idx = (
+		df_raw[forecast_years].isna().all(axis='columns') |
+		df_raw[forecast_years].le(0).all(axis='columns') |
+		df_raw[bus_list].isna().all(axis='columns') | df_raw[bus_list].le(0).all(axis='columns'))
+
+	return idx.values
+
+
+class TestValidation(unittest.TestCase):
+	"""
+		Rules evaluated over a processed load estimate with rows broken in known ways
+	"""
+	@classmethod
+	def setUpClass(cls):
+		cls.df = approach.run(df_raw=benchmark.synthetic_raw_load_estimates(n_gsp=N_GSP))
+		layout = common.column_layout(df_raw=cls.df)
+		forecast_years = layout.labels['forecast_years']
+		bus = layout.labels['bus']
+		primaries = cls.df.index[cls.df[common.Headers.sub_primary].values]
+
+		# Row label for each rule that is broken on purpose
+		cls.broken = dict(zip(validation.RULES, primaries[:len(validation.RULES)]))
+		cls.df.loc[cls.broken['forecast_missing'], forecast_years] = np.nan
+		cls.df.loc[cls.broken['forecast_not_positive'], forecast_years] = 0.0
+		cls.df.loc[cls.broken['bus_missing'], bus] = np.nan
+		cls.df.loc[cls.broken['bus_not_positive'], bus] = 0
+		cls.df.loc[cls.broken['negative_load'], forecast_years[-1]] = -1.0
+		cls.df.loc[cls.broken['percentage_sum'], layout.labels['percentage'][0]] = 5.0
+		cls.df.loc[cls.broken['missing_nrn'], common.Headers.nrn] = np.nan
+		cls.df.loc[cls.broken['discontinuous_years'], forecast_years[3]] = np.nan
+		gsp = cls.df.index[cls.df[common.Headers.sub_gsp].values][0]
+		cls.broken['diversity_factor'] = gsp
+		cls.df.loc[gsp, forecast_years[0]] = 2 * cls.df.loc[gsp, layout.labels['aggregate'][0]]
+
+	def testRegistry(self):
+		""" Confirms that each rule has its own bit in order of registration and names cannot be registered twice """
+		self.assertEqual([x.bit for x in validation.RULES.values()], list(range(len(validation.RULES))))
+		self.assertTrue(set(validation.BAD_DATA_RULES).issubset(validation.RULES))
+		with self.assertRaises(ValueError):
+			validation.register_rule('missing_nrn', 'Registered twice')(lambda df, columns: np.zeros(len(df.index)))
+
+	def testViolations(self):
+		""" Confirms that each rule flags the row broken for it and the bad data rules flag no other rows """
+		result = validation.validate(df=self.df)
+		for name, label in self.broken.items():
+			self.assertTrue(result.violations.loc[label, name], name)
+		expected = {
+			'forecast_missing': {self.broken['forecast_missing']},
+			'forecast_not_positive': {self.broken['forecast_not_positive']},
+			'bus_missing': {self.broken['bus_missing']},
+		}
+		for name, labels in expected.items():
+			self.assertEqual(set(self.df.index[result.violations[name].values]), labels, name)
+
+	def testBitmask(self):
+		""" Confirms that the bitmask of each row holds the rules it breaks and describe_bitmask reads them back """
+		result = validation.validate(df=self.df)
+		for label in self.df.index:
+			self.assertEqual(
+				validation.describe_bitmask(result.bitmask[label]),
+				[x for x in validation.RULES if result.violations.loc[label, x]])
+		self.assertEqual(validation.describe_bitmask(0), [])
+		self.assertEqual(
+			validation.describe_bitmask(result.bitmask[self.broken['missing_nrn']]), ['missing_nrn'])
+
+		# Only evaluating some of the rules keeps the same bits
+		subset = validation.validate(df=self.df, rules=['missing_nrn'])
+		self.assertEqual(list(subset.violations.columns), ['missing_nrn'])
+		self.assertEqual(
+			subset.bitmask[self.broken['missing_nrn']], 1 << validation.RULES['missing_nrn'].bit)
+
+	def testBadData(self):
+		""" Confirms that bad_data_identifier flags the same rows as the original version """
+		tmp_dir = tempfile.mkdtemp()
+		try:
+			bad_data, good_data = approach.bad_data_identifier(
+				df_raw=self.df, output_format=output.OutputFormat.pickle, output_dir=tmp_dir)
+		finally:
+			shutil.rmtree(tmp_dir)
+
+		idx_bad = reference_bad_data(df_raw=self.df)
+		self.assertEqual(idx_bad.sum(), 4)
+		pd.testing.assert_index_equal(bad_data.index, self.df.index[idx_bad])
+		pd.testing.assert_frame_equal(good_data, self.df[~idx_bad])
+		pd.testing.assert_frame_equal(bad_data.drop(columns=[validation.VIOLATIONS]), self.df[idx_bad])
+
+
+if __name__ == '__main__':
+	unittest.main()
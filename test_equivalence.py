@@ -0,0 +1,254 @@
+"""
+#######################################################################################################################
+###											Equivalence Tests														###
+###																													###
+###		Checks that the vectorised processing steps give the same DataFrames as simple row by row versions of		###
+###		them.  The synthetic load estimates from benchmark are used so no workbook is needed.						###
+###																													###
+#######################################################################################################################
+"""
+
+# Generic Imports
+import unittest
+import pandas as pd
+import numpy as np
+
+# Unique imports
+import benchmark
+import common_functions as common
+import DataFrame_Approach as approach
+
+# Number of GSPs in the synthetic load estimates, large enough to include every kind of missing data
+N_GSP = 12
+# GSPs whose aggregate demand is missing so they take the diversity factor of the GSP before them
+MISSING_AGGREGATES = (5, 6)
+
+
+def stage_input(df_raw, stage_name, config=None):
+	"""
+		Function runs the processing steps before stage_name so the DataFrame is the one passed to that step
+	:param pd.DataFrame df_raw:  Raw load estimate
+	:param str stage_name:  Name of the step (see DataFrame_Approach.LoadEstimatePipeline.stages)
+	:param approach.PipelineConfig config:  (optional) Configuration, defaults to all filling turned on
+	:return pd.DataFrame df:
+	"""
+	df = df_raw.copy()
+	for name, stage in approach.LoadEstimatePipeline(config=config).stages():
+		if name == stage_name:
+			return df
+		df = stage(df_raw=df)
+
+	raise ValueError('No stage named {}'.format(stage_name))
+
+
+def reference_missing_years(df_raw, fill):
+	"""
+		Row by row version of DataFrame_Approach.missing_year_load_estimator using common.interpolator for each row
+	:param pd.DataFrame df_raw:
+	:param bool fill:
+	:return pd.DataFrame df_raw:
+	"""
+	layout = common.column_layout(df_raw=df_raw)
+	forecast_years = layout.labels['forecast_years']
+	estimate_list = layout.labels[common.Headers.estimate]
+	df_raw = df_raw.reindex(columns=list(df_raw.columns) + ['available_years', 'year_forecasted'] + estimate_list)
+
+	df_raw['available_years'] = df_raw[forecast_years].notna().sum(axis=1)
+	df_raw['year_forecasted'] = (df_raw['available_years'] > 1) & (df_raw['available_years'] < len(forecast_years))
+
+	if fill:
+		for row in np.flatnonzero(df_raw['year_forecasted'].values):
+			loads = df_raw[forecast_years].iloc[row].astype(float)
+			estimated = common.interpolator(pd.DataFrame(loads.values)).iloc[:, 0].values
+			for n, year in enumerate(np.flatnonzero(loads.isna().values)):
+				df_raw.iloc[row, df_raw.columns.get_loc(forecast_years[year])] = estimated[n]
+				df_raw.iloc[row, df_raw.columns.get_loc(estimate_list[year])] = estimated[n]
+
+	return df_raw
+
+
+def number(value):
+	"""
+		Function returns a cell as a float, NaN for anything which is not a number
+	:param value:
+	:return float value:
+	"""
+	return float(pd.to_numeric(value, errors='coerce'))
+
+
+def reference_bus_percentages(df_raw, fill):
+	"""
+		Row by row version of DataFrame_Approach.bus_percentage_adder_modified
+	:param pd.DataFrame df_raw:
+	:param bool fill:
+	:return pd.DataFrame df_raw:
+	"""
+	layout = common.column_layout(df_raw=df_raw)
+	bus_positions = layout.positions('bus')
+	n_rows = len(df_raw.index)
+	is_sub = (df_raw[common.Headers.sub_gsp].notna() | df_raw[common.Headers.sub_primary].notna()).values
+
+	sum_percentages = np.zeros(n_rows)
+	percentages = np.full((n_rows, len(bus_positions)), np.nan)
+	for row in range(n_rows):
+		if not is_sub[row]:
+			continue
+		missing = []
+		for n, col in enumerate(bus_positions):
+			if pd.isna(df_raw.iat[row, col]):
+				continue
+			# The percentage of each bus is in the row below
+			value = number(df_raw.iat[row + 1, col]) if row + 1 < n_rows else np.nan
+			if np.isnan(value):
+				missing.append(n)
+			else:
+				percentages[row, n] = value
+				sum_percentages[row] += value
+		if fill and missing:
+			percentages[row, missing] = (1 - sum_percentages[row]) / len(missing)
+
+	df_raw[common.Headers.sum_percentages] = sum_percentages
+	for n, x in enumerate(layout.labels[common.Headers.percentage]):
+		df_raw[x] = percentages[:, n]
+
+	return df_raw
+
+
+def reference_aggregate_demand(df_raw):
+	"""
+		Row by row version of DataFrame_Approach.extract_aggregate_demand
+	:param pd.DataFrame df_raw:
+	:return pd.DataFrame df_raw:
+	"""
+	layout = common.column_layout(df_raw=df_raw)
+	year_positions = layout.positions('forecast_years')
+	aggregate = np.full((len(df_raw.index), len(year_positions)), np.nan)
+	for row in np.flatnonzero((df_raw[common.Headers.sub_gsp] == True).values):
+		# The aggregate demand of each GSP is in the row below
+		if row + 1 < len(df_raw.index):
+			aggregate[row] = [number(df_raw.iat[row + 1, col]) for col in year_positions]
+
+	df_aggregate = pd.DataFrame(aggregate, index=df_raw.index, columns=layout.labels[common.Headers.aggregate])
+
+	return pd.concat([df_raw, df_aggregate], axis=1)
+
+
+def reference_season_fill(df_raw):
+	"""
+		Version of DataFrame_Approach.season_load_filler which finds each fill value with np.percentile
+	:param pd.DataFrame df_raw:
+	:return pd.DataFrame df_raw:
+	"""
+	df_out = df_raw.copy()
+	for season, quantile in common.default_season_quantiles().items():
+		values = pd.to_numeric(df_raw[season], errors='coerce').values.astype(float)
+		for substation_type in (common.Headers.sub_gsp, common.Headers.sub_primary):
+			idx_type = (df_raw[substation_type] == True).values
+			available = values[idx_type & (values > 0)]
+			fill_value = np.percentile(available, quantile) if len(available) else np.nan
+			df_out.loc[idx_type & ~(values > 0), season] = fill_value
+
+	return df_out
+
+
+def reference_diversity(df_raw):
+	"""
+		Row by row version of DataFrame_Approach.primary_diversload_adder (with the factor of the first forecast year)
+	:param pd.DataFrame df_raw:
+	:return pd.DataFrame df_raw:
+	"""
+	layout = common.column_layout(df_raw=df_raw)
+	forecast_years = layout.labels['forecast_years']
+	aggregate_list = layout.labels[common.Headers.aggregate]
+	is_gsp = (df_raw[common.Headers.sub_gsp] == True).values
+
+	factors = np.full(len(df_raw.index), np.nan)
+	factor = np.nan
+	for row in range(len(df_raw.index)):
+		if is_gsp[row]:
+			diversified = number(df_raw[forecast_years[0]].iat[row])
+			aggregate = number(df_raw[aggregate_list[0]].iat[row])
+			if not diversified > 0:
+				# Factor of 1 assumed for a zero or NA peak load
+				factor = 1.0
+			elif aggregate == 0:
+				factor = 1.0
+			elif not np.isnan(aggregate):
+				factor = min(diversified / aggregate, 1.0)
+			# Otherwise the factor of the GSP before is kept
+		factors[row] = factor
+
+	df_raw[common.Headers.diverse_factor] = factors
+	for row in np.flatnonzero(df_raw[common.Headers.sub_gsp].isna().values):
+		for year, aggregate in zip(forecast_years, aggregate_list):
+			load = number(df_raw[year].iat[row])
+			df_raw.iloc[row, df_raw.columns.get_loc(aggregate)] = load
+			df_raw.iloc[row, df_raw.columns.get_loc(year)] = load * factors[row]
+
+	return df_raw
+
+
+class TestVectorisedStages(unittest.TestCase):
+	"""
+		Each vectorised step against its row by row version
+	"""
+	def setUp(self):
+		self.df_raw = benchmark.synthetic_raw_load_estimates(n_gsp=N_GSP)
+
+	def testMissingYears(self):
+		for fill in (False, True):
+			df = stage_input(df_raw=self.df_raw, stage_name='missing_year_load_estimator')
+			pd.testing.assert_frame_equal(
+				approach.missing_year_load_estimator(df_raw=df.copy(), fill=fill),
+				reference_missing_years(df_raw=df.copy(), fill=fill), check_dtype=False)
+
+	def testBatchInterpolator(self):
+		""" Confirms that batch_interpolator gives the same values as interpolator on each row """
+		values = np.random.RandomState(benchmark.SEED).uniform(1, 10, size=(200, 8))
+		values[np.random.RandomState(benchmark.SEED + 1).uniform(size=values.shape) < 0.4] = np.nan
+		filled = common.batch_interpolator(values)
+
+		for row in range(len(values)):
+			missing = np.isnan(values[row])
+			if (~missing).sum() < 2:
+				np.testing.assert_array_equal(filled[row], values[row])
+			elif missing.any():
+				estimated = common.interpolator(pd.DataFrame(values[row])).iloc[:, 0].values
+				np.testing.assert_allclose(filled[row, missing], estimated, rtol=1e-12)
+				np.testing.assert_array_equal(filled[row, ~missing], values[row, ~missing])
+
+	def testBusPercentages(self):
+		for fill in (False, True):
+			df = stage_input(df_raw=self.df_raw, stage_name='bus_percentage_adder_modified')
+			pd.testing.assert_frame_equal(
+				approach.bus_percentage_adder_modified(df_raw=df.copy(), fill=fill),
+				reference_bus_percentages(df_raw=df.copy(), fill=fill))
+
+	def testAggregateDemand(self):
+		df = stage_input(df_raw=self.df_raw, stage_name='extract_aggregate_demand')
+		pd.testing.assert_frame_equal(
+			approach.extract_aggregate_demand(df_raw=df.copy()), reference_aggregate_demand(df_raw=df.copy()))
+
+	def testSeasonFill(self):
+		df = stage_input(df_raw=self.df_raw, stage_name='season_load_filler')
+		pd.testing.assert_frame_equal(
+			approach.season_load_filler(df_raw=df.copy(), fill=True), reference_season_fill(df_raw=df))
+
+	def testAssignGsp(self):
+		df = stage_input(df_raw=self.df_raw, stage_name='assign_gsp')
+		expected = df.copy()
+		expected[common.Headers.gsp] = expected[common.Headers.gsp].where(
+			expected[common.Headers.sub_gsp] == True).ffill()
+		pd.testing.assert_frame_equal(approach.assign_gsp(df_raw=df.copy()), expected)
+
+	def testDiversity(self):
+		df_missing = benchmark.synthetic_raw_load_estimates(n_gsp=N_GSP, missing_aggregates=MISSING_AGGREGATES)
+		for df_raw in (self.df_raw, df_missing):
+			df = stage_input(df_raw=df_raw, stage_name='primary_diversload_adder')
+			pd.testing.assert_frame_equal(
+				approach.primary_diversload_adder(df_raw=df.copy()), reference_diversity(df_raw=df.copy()),
+				check_dtype=False)
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,79 @@
+"""
+#######################################################################################################################
+###											Incremental Processing Tests											###
+###																													###
+###		Checks that the incremental pipeline gives the same result as processing the whole load estimate, both		###
+###		on the first run and after some of the GSP blocks have changed.												###
+###																													###
+#######################################################################################################################
+"""
+
+# Generic Imports
+import unittest
+import pandas as pd
+import numpy as np
+
+# Unique imports
+import benchmark
+import common_functions as common
+import DataFrame_Approach as approach
+import incremental
+
+# Number of GSPs in the synthetic load estimates
+N_GSP = 12
+# GSPs whose aggregate demand is missing so they take the diversity factor of the GSP before them
+MISSING_AGGREGATES = (5, 6)
+
+
+def changed_load(df_raw, gsp_number, value=123.456):
+	"""
+		Function returns a copy of the raw load estimate with the first year load of the last row of a GSP block changed
+	:param pd.DataFrame df_raw:
+	:param int gsp_number:  Number of the GSP (0 for the first GSP)
+	:param float value:  (optional) New load
+	:return pd.DataFrame df_changed:
+	"""
+	df_changed = df_raw.copy()
+	block_ids = approach.gsp_block_ids(df_raw=df_changed)
+	row = np.flatnonzero(block_ids == block_ids[approach.gsp_rows(df_raw=df_changed).values][gsp_number])[-1]
+	year = common.column_layout(df_raw=df_changed).labels['forecast_years'][0]
+	df_changed.loc[row, year] = value
+
+	return df_changed
+
+
+class TestIncrementalPipeline(unittest.TestCase):
+	"""
+		Incremental processing against processing the whole load estimate
+	"""
+	def setUp(self):
+		self.df_raw = benchmark.synthetic_raw_load_estimates(n_gsp=N_GSP)
+
+	def testChangedBlock(self):
+		for fill in (False, True):
+			config = approach.PipelineConfig.from_fill(fill=fill)
+			pipeline = incremental.IncrementalPipeline(config=config)
+			pd.testing.assert_frame_equal(pipeline.run(df_raw=self.df_raw), approach.run(self.df_raw, config=config))
+
+			# Only the changed block is processed again
+			df_changed = changed_load(df_raw=self.df_raw, gsp_number=N_GSP // 2)
+			pd.testing.assert_frame_equal(pipeline.run(df_raw=df_changed), approach.run(df_changed, config=config))
+			self.assertEqual(pipeline.stats['recalculated'], 1)
+
+	def testMissingAggregate(self):
+		""" Confirms that a GSP without an aggregate demand takes the diversity factor of the unchanged GSP before it """
+		df_raw = benchmark.synthetic_raw_load_estimates(n_gsp=N_GSP, missing_aggregates=MISSING_AGGREGATES)
+		for per_year in (False, True):
+			config = approach.PipelineConfig(diversity_per_year=per_year)
+			pipeline = incremental.IncrementalPipeline(config=config)
+			pd.testing.assert_frame_equal(pipeline.run(df_raw=df_raw), approach.run(df_raw, config=config))
+
+			for gsp_number in MISSING_AGGREGATES:
+				df_changed = changed_load(df_raw=df_raw, gsp_number=gsp_number)
+				df_out = pipeline.run(df_raw=df_changed)
+				pd.testing.assert_frame_equal(df_out, approach.run(df_changed, config=config))
+				self.assertFalse(df_out[common.Headers.diverse_factor].isna().any())
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,72 @@
+"""
+#######################################################################################################################
+###											Output Formats Tests													###
+###																													###
+###		Checks that the processed DataFrames read back from each output format are the same as those written,		###
+###		including columns with a mix of numbers and text such as the NRN.											###
+###																													###
+#######################################################################################################################
+"""
+
+# Generic Imports
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+
+# Unique imports
+import benchmark
+import common_functions as common
+import output_formats as output
+
+
+class TestOutputFormats(unittest.TestCase):
+	"""
+		Writing and reading the processed DataFrames
+	"""
+	def setUp(self):
+		self.tmp_dir = tempfile.mkdtemp()
+		# Mostly integer NRN column with a few floats and a text value as found in the load estimates
+		nrn = np.arange(1000, 1442).astype(object)
+		nrn[[10, 20, 30, 40]] = [1010.5, 1020.5, 1030.5, 1040.5]
+		nrn[50] = 'T1'
+		self.df = pd.DataFrame({
+			common.Headers.nrn: nrn, common.Headers.name: ['Primary {}'.format(x) for x in range(len(nrn))],
+			'Load': np.linspace(0, 1, len(nrn))
+		})
+		self.df.loc[5, common.Headers.nrn] = np.nan
+
+	def tearDown(self):
+		shutil.rmtree(self.tmp_dir)
+
+	def testColumnarSafe(self):
+		""" Confirms that the numbers of a mixed column stay numbers and the text is kept in a separate column """
+		df_out = output.columnar_safe(df=self.df)
+		nrn_text = output.RAW_TEXT_COLUMN.format(common.Headers.nrn)
+		self.assertTrue(pd.api.types.is_float_dtype(df_out[common.Headers.nrn]))
+		self.assertEqual(df_out[common.Headers.nrn].notna().sum(), len(self.df.index) - 2)
+		self.assertEqual(df_out[nrn_text].dropna().tolist(), ['T1'])
+		pd.testing.assert_frame_equal(output.restore_mixed_columns(df=df_out), self.df, check_dtype=False)
+
+	def testRoundTrip(self):
+		for output_format in (output.OutputFormat.parquet, output.OutputFormat.feather, output.OutputFormat.pickle):
+			output.write_output(
+				df=self.df, file_name='synthetic.xlsx', output_format=output_format, output_dir=self.tmp_dir)
+			df = output.read_output(file_name='synthetic.xlsx', output_format=output_format, output_dir=self.tmp_dir)
+			pd.testing.assert_frame_equal(df, self.df, check_dtype=False)
+			self.assertIsInstance(df.loc[0, common.Headers.nrn], float if output_format != output.OutputFormat.pickle else int)
+
+	def testLoadEstimates(self):
+		""" Confirms that the numbers in the raw load estimates are read back from Parquet as the same numbers """
+		df_raw = benchmark.synthetic_raw_load_estimates(n_gsp=4)
+		output.write_output(
+			df=df_raw, file_name='raw.xlsx', output_format=output.OutputFormat.parquet, output_dir=self.tmp_dir)
+		df = output.read_output(file_name='raw.xlsx', output_format=output.OutputFormat.parquet, output_dir=self.tmp_dir)
+		self.assertEqual(list(df.columns), list(df_raw.columns))
+		pd.testing.assert_frame_equal(
+			df.apply(pd.to_numeric, errors='coerce'), df_raw.apply(pd.to_numeric, errors='coerce'), check_dtype=False)
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,86 @@
+"""
+#######################################################################################################################
+###											Quantile Sketch Tests													###
+###																													###
+###		Checks that the quantiles of quantile_sketch are exact for few values and within the rank error of the		###
+###		sketch when many values are added in one batch, merged from many sketches or streamed in small chunks.		###
+###																													###
+#######################################################################################################################
+"""
+
+# Generic Imports
+import json
+import unittest
+import numpy as np
+
+# Unique imports
+import benchmark
+import quantile_sketch
+
+# Rank error of the sketches tested
+ERROR = 0.01
+# Number of values added to the sketches which are compacted
+N_VALUES = 200000
+
+
+def rank_error(sketch, values):
+	"""
+		Function returns the largest difference between the rank of each percentile returned by the sketch and the
+		rank asked for, as a fraction of the number of values
+	:param quantile_sketch.QuantileSketch sketch:
+	:param np.ndarray values:  Values added to the sketch
+	:return float error:
+	"""
+	values = np.sort(values)
+	q = np.arange(1, 100) / 100.0
+	estimates = sketch.percentile(q * 100)
+	low = np.searchsorted(values, estimates, side='left') / float(len(values))
+	high = np.searchsorted(values, estimates, side='right') / float(len(values))
+
+	return np.max(np.maximum(0, np.maximum(low - q, q - high)))
+
+
+class TestQuantileSketch(unittest.TestCase):
+	"""
+		Quantiles of the sketch against np.percentile
+	"""
+	def setUp(self):
+		self.values = np.random.RandomState(benchmark.SEED).lognormal(size=N_VALUES)
+
+	def testExact(self):
+		""" Confirms that the quantiles are exact while no level has been compacted, including after a merge """
+		values = self.values[:250]
+		q = np.linspace(0, 100, 21)
+		np.testing.assert_allclose(quantile_sketch.sketch_of(values=values).percentile(q), np.percentile(values, q))
+		merged = quantile_sketch.merge_sketches(
+			sketches=[quantile_sketch.sketch_of(values=x) for x in np.array_split(values, 2)])
+		np.testing.assert_allclose(merged.percentile(q), np.percentile(values, q))
+
+	def testSingleBatch(self):
+		self.assertLessEqual(rank_error(quantile_sketch.sketch_of(values=self.values, error=ERROR), self.values), ERROR)
+
+	def testMerged(self):
+		""" Confirms that the rank error holds for a sketch merged from many small sketches """
+		sketches = [quantile_sketch.sketch_of(values=x, error=ERROR) for x in np.array_split(self.values, 1000)]
+		self.assertLessEqual(rank_error(quantile_sketch.merge_sketches(sketches=sketches), self.values), ERROR)
+
+	def testStreamed(self):
+		""" Confirms that the rank error holds for a sketch updated with many small chunks """
+		sketch = quantile_sketch.QuantileSketch(error=ERROR)
+		for x in np.array_split(self.values, 2000):
+			sketch.update(values=x)
+		self.assertEqual(sketch.n, N_VALUES)
+		self.assertLessEqual(rank_error(sketch, self.values), ERROR)
+
+	def testStored(self):
+		""" Confirms that a sketch stored as JSON carries on the same as the sketch it was stored from """
+		sketch = quantile_sketch.sketch_of(values=self.values[:N_VALUES // 2], error=ERROR)
+		stored = quantile_sketch.QuantileSketch.from_dict(json.loads(json.dumps(sketch.to_dict())))
+		for x in (sketch, stored):
+			x.update(values=self.values[N_VALUES // 2:])
+		q = np.arange(1, 100)
+		np.testing.assert_array_equal(stored.percentile(q), sketch.percentile(q))
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -0,0 +1,48 @@
+"""
+#######################################################################################################################
+###											Stage Profiler Tests													###
+###																													###
+###		Checks that the stages are only slowed by tracing their memory when asked for.								###
+###																													###
+#######################################################################################################################
+"""
+
+# Generic Imports
+import tracemalloc
+import unittest
+import numpy as np
+import pandas as pd
+
+# Unique imports
+import stage_profiler
+
+
+def double(df_raw):
+	return df_raw * 2
+
+
+class TestStageProfiler(unittest.TestCase):
+	"""
+		Profiles of a single stage with and without the memory traced
+	"""
+	def setUp(self):
+		self.df = pd.DataFrame({'Load': np.arange(1000, dtype=float)})
+
+	def testTimingOnly(self):
+		""" Confirms that by default the memory is not traced so the times are not slowed by tracemalloc """
+		profiler = stage_profiler.StageProfiler()
+		pd.testing.assert_frame_equal(profiler.call(name='double', func=double, df_in=self.df), self.df * 2)
+		record = profiler.records[0]
+		self.assertIsNone(record.peak_memory)
+		self.assertEqual((record.rows_in, record.rows_out), (1000, 1000))
+		self.assertFalse(tracemalloc.is_tracing())
+
+	def testMemory(self):
+		profiler = stage_profiler.StageProfiler(trace_memory=True)
+		profiler.call(name='double', func=double, df_in=self.df)
+		self.assertGreater(profiler.records[0].peak_memory, self.df.memory_usage().sum())
+		self.assertFalse(tracemalloc.is_tracing())
+
+
+if __name__ == '__main__':
+	unittest.main()
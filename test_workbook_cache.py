@@ -0,0 +1,140 @@
+"""
+#######################################################################################################################
+###											Workbook Cache Tests													###
+###																													###
+###		Checks that the parsed workbook cache returns stored DataFrames, reads the workbook again once it has		###
+###		changed and removes the least recently used entries when it is too large.									###
+###																													###
+#######################################################################################################################
+"""
+
+# Generic Imports
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+
+# Unique imports
+import workbook_cache
+
+
+class TestParsedWorkbookCache(unittest.TestCase):
+	"""
+		Loading through a cache in a temporary folder with a reader which counts the number of reads
+	"""
+	def setUp(self):
+		self.tmp_dir = tempfile.mkdtemp()
+		self.cache = workbook_cache.ParsedWorkbookCache(cache_dir=os.path.join(self.tmp_dir, 'cache'))
+		self.pth_workbook = self.write_workbook(file_name='workbook.xlsx', contents=b'release 1')
+		self.reads = 0
+
+	def tearDown(self):
+		shutil.rmtree(self.tmp_dir)
+
+	def write_workbook(self, file_name, contents):
+		"""
+			Function writes a file to stand in for a workbook, only its contents are used by the cache
+		:param str file_name:
+		:param bytes contents:
+		:return str pth_workbook:
+		"""
+		pth_workbook = os.path.join(self.tmp_dir, file_name)
+		with open(pth_workbook, 'wb') as f:
+			f.write(contents)
+
+		return pth_workbook
+
+	def reader(self, rows=10):
+		"""
+			Function stands in for parsing the workbook
+		:param int rows:  (optional) Number of rows in the DataFrame returned
+		:return pd.DataFrame df:
+		"""
+		self.reads += 1
+		return pd.DataFrame({'Load': np.arange(rows, dtype=float) + self.reads})
+
+	def load(self, pth_workbook=None, rows=10):
+		"""
+			Function loads the DataFrame for a workbook through the cache
+		:param str pth_workbook:  (optional) Full path to the workbook, defaults to the workbook written by setUp
+		:param int rows:  (optional) Number of rows, used as the read option
+		:return pd.DataFrame df:
+		"""
+		return self.cache.load(
+			pth_file=pth_workbook or self.pth_workbook, reader_name='reader', read_options={'rows': rows},
+			reader=lambda: self.reader(rows=rows))
+
+	def entry_path(self, pth_workbook):
+		"""
+			Function returns the full path of the only cache entry for a workbook
+		:param str pth_workbook:
+		:return str pth_entry:
+		"""
+		prefix = '{}_'.format(workbook_cache.file_hash(pth_file=pth_workbook))
+		pth_entries = [x[2] for x in self.cache.entries() if os.path.basename(x[2]).startswith(prefix)]
+		self.assertEqual(len(pth_entries), 1)
+
+		return pth_entries[0]
+
+	def testHit(self):
+		""" Confirms that the second load returns the stored DataFrame without reading the workbook again """
+		df = self.load()
+		pd.testing.assert_frame_equal(self.load(), df)
+		self.assertEqual(self.reads, 1)
+		self.assertEqual(len(self.cache.entries()), 1)
+		# No temporary files are left behind
+		self.assertEqual(len(os.listdir(self.cache.cache_dir)), 1)
+
+		# Different read options are a different entry
+		self.load(rows=5)
+		self.assertEqual(self.reads, 2)
+
+	def testChangedWorkbook(self):
+		""" Confirms that the workbook is read again once its contents change and that invalidate removes entries """
+		self.load()
+		self.write_workbook(file_name='workbook.xlsx', contents=b'release 2')
+		df = self.load()
+		self.assertEqual(self.reads, 2)
+		self.assertEqual(df['Load'].iloc[0], 2)
+
+		self.assertEqual(self.cache.invalidate(pth_file=self.pth_workbook), 1)
+		self.load()
+		self.assertEqual(self.reads, 3)
+		self.assertEqual(self.cache.invalidate(), 2)
+		self.assertEqual(self.cache.entries(), [])
+
+	def testEviction(self):
+		""" Confirms that the least recently used entries are removed once the cache is over its size limit """
+		workbooks = [self.write_workbook(file_name='{}.xlsx'.format(n), contents=str(n).encode()) for n in range(3)]
+		for n, pth_workbook in enumerate(workbooks):
+			self.load(pth_workbook=pth_workbook, rows=1000)
+			# Modified times set explicitly so the order does not depend on the resolution of the file system clock
+			os.utime(self.entry_path(pth_workbook=pth_workbook), (n, n))
+		entry_size = self.cache.entries()[0][1]
+
+		# Loading the first workbook makes it the most recently used so the second is removed
+		self.load(pth_workbook=workbooks[0], rows=1000)
+		self.assertEqual(self.reads, 3)
+		self.cache.max_size_mb = 2.5 * entry_size / 2 ** 20
+		self.assertEqual(self.cache.evict(), 1)
+		self.reads = 0
+		self.load(pth_workbook=workbooks[0], rows=1000)
+		self.load(pth_workbook=workbooks[2], rows=1000)
+		self.assertEqual(self.reads, 0)
+		self.load(pth_workbook=workbooks[1], rows=1000)
+		self.assertEqual(self.reads, 1)
+
+	def testDisabled(self):
+		""" Confirms that the default cache is only used once turned on """
+		self.assertFalse(workbook_cache.default_cache.enabled)
+		self.cache.enabled = False
+		self.load()
+		self.load()
+		self.assertEqual(self.reads, 2)
+		self.assertFalse(os.path.isdir(self.cache.cache_dir))
+
+
+if __name__ == '__main__':
+	unittest.main()
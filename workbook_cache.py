@@ -0,0 +1,263 @@
+"""
+#######################################################################################################################
+###											Parsed Workbook Cache													###
+###																													###
+###		Persistent on-disk cache of the DataFrames produced when importing the load estimate workbooks so that		###
+###		repeated runs against an unchanged workbook do not need to parse the excel file again						###
+###																													###
+#######################################################################################################################
+"""
+
+# Generic Imports
+import os
+import hashlib
+import pickle
+import inspect
+import functools
+import tempfile
+import pandas as pd
+
+# Default location of the cache (next to this script) and the maximum size it is allowed to grow to
+CACHE_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), '.load_estimate_cache')
+MAX_CACHE_SIZE_MB = 512
+# The import functions in common_functions only use the cache if this is True (or default_cache.enabled is set) so
+# that nothing is written next to the scripts unless asked for
+CACHE_ENABLED = False
+CACHE_EXTENSION = '.pkl'
+# Included in every cache key, must be increased whenever the import functions change the DataFrames they return so
+# that entries from older code are not used
+CACHE_VERSION = 1
+
+
+def file_hash(pth_file, block_size=2 ** 20):
+	"""
+		Function returns a hash of the contents of a file so that a cached entry is only used whilst the file remains
+		unchanged
+	:param str pth_file:  Full path to file
+	:param int block_size:  (optional) Number of bytes read at a time
+	:return str file_hash:  Hex digest of the file contents
+	"""
+	h = hashlib.sha1()
+	with open(pth_file, 'rb') as f:
+		for block in iter(lambda: f.read(block_size), b''):
+			h.update(block)
+
+	return h.hexdigest()
+
+
+class ParsedWorkbookCache:
+	"""
+		Stores the DataFrames produced from reading a workbook as pickle files keyed by the hash of the file contents,
+		the function used to read it and the read options (i.e. sheet name).  The least recently used entries are
+		removed once the total size exceeds the limit.
+	"""
+	def __init__(self, cache_dir=CACHE_DIR, max_size_mb=MAX_CACHE_SIZE_MB, enabled=True):
+		"""
+		:param str cache_dir:  (optional) Folder to store the cached DataFrames in
+		:param float max_size_mb:  (optional) Maximum total size of the cache before entries are evicted
+		:param bool enabled:  (optional) If False then every read goes straight to the workbook
+		"""
+		self.cache_dir = cache_dir
+		self.max_size_mb = max_size_mb
+		self.enabled = enabled
+
+	def key(self, pth_file, reader_name, read_options):
+		"""
+			Function returns the cache key for a workbook read, the key includes CACHE_VERSION and the pandas version so
+			that entries written by other versions of the code or of pandas are never used
+		:param str pth_file:  Full path to the workbook
+		:param str reader_name:  Name of the function used to read the workbook
+		:param dict read_options:  Options passed to the function (other than the file path)
+		:return str key:
+		"""
+		options = repr(sorted(read_options.items()))
+		options_hash = hashlib.sha1('{}|{}|{}|{}'.format(
+			CACHE_VERSION, pd.__version__, reader_name, options).encode('utf-8')).hexdigest()
+		# File hash used as the prefix so that all entries for a workbook can be found again
+		key = '{}_{}'.format(file_hash(pth_file=pth_file), options_hash)
+
+		return key
+
+	def entry_path(self, key):
+		"""
+			Function returns the full path to the file storing a cache entry
+		:param str key:
+		:return str pth_entry:
+		"""
+		return os.path.join(self.cache_dir, '{}{}'.format(key, CACHE_EXTENSION))
+
+	def get(self, key):
+		"""
+			Function returns the cached DataFrame or None if there is no entry for this key.  An entry which cannot be
+			unpickled (i.e. it is corrupt or was written by an incompatible version of a library) is treated as missing
+			and removed so that it is replaced by the next read.
+		:param str key:
+		:return pd.DataFrame df:
+		"""
+		pth_entry = self.entry_path(key=key)
+		try:
+			f = open(pth_entry, 'rb')
+		except (IOError, OSError):
+			return None
+
+		try:
+			with f:
+				df = pickle.load(f)
+		except Exception:
+			try:
+				os.remove(pth_entry)
+			except OSError:
+				pass
+			return None
+
+		# Update the modified time so that this entry is treated as the most recently used
+		try:
+			os.utime(pth_entry, None)
+		except OSError:
+			pass
+
+		return df
+
+	def put(self, key, df):
+		"""
+			Function stores a DataFrame in the cache and then evicts old entries if the cache is too large
+		:param str key:
+		:param pd.DataFrame df:
+		:return None:
+		"""
+		if not os.path.isdir(self.cache_dir):
+			os.makedirs(self.cache_dir)
+
+		# Written to a uniquely named temporary file first so that an interrupted write never leaves a corrupt entry
+		# behind and threads or processes storing the same entry do not write to the same file
+		pth_entry = self.entry_path(key=key)
+		with tempfile.NamedTemporaryFile(dir=self.cache_dir, prefix=key, suffix='.tmp', delete=False) as f:
+			pth_tmp = f.name
+			try:
+				pickle.dump(df, f, protocol=pickle.HIGHEST_PROTOCOL)
+			except Exception:
+				f.close()
+				os.remove(pth_tmp)
+				raise
+		os.replace(pth_tmp, pth_entry)
+
+		self.evict()
+		return None
+
+	def entries(self):
+		"""
+			Function returns details of all entries in the cache ordered from least to most recently used
+		:return list entries:  List of (modified time, size in bytes, full path)
+		"""
+		if not os.path.isdir(self.cache_dir):
+			return []
+
+		entries = []
+		for file_name in os.listdir(self.cache_dir):
+			if not file_name.endswith(CACHE_EXTENSION):
+				continue
+			pth_entry = os.path.join(self.cache_dir, file_name)
+			try:
+				stat = os.stat(pth_entry)
+			except OSError:
+				continue
+			entries.append((stat.st_mtime, stat.st_size, pth_entry))
+
+		return sorted(entries)
+
+	def evict(self):
+		"""
+			Function removes the least recently used entries until the cache is within its size limit
+		:return int removed:  Number of entries removed
+		"""
+		entries = self.entries()
+		total_size = sum(x[1] for x in entries)
+		max_size = self.max_size_mb * 2 ** 20
+
+		removed = 0
+		for _, size, pth_entry in entries:
+			if total_size <= max_size:
+				break
+			try:
+				os.remove(pth_entry)
+			except OSError:
+				continue
+			total_size -= size
+			removed += 1
+
+		return removed
+
+	def invalidate(self, pth_file=None):
+		"""
+			Function removes cached entries, either for a single workbook or the whole cache
+		:param str pth_file:  (optional) Full path to the workbook, if None then all entries are removed
+		:return int removed:  Number of entries removed
+		"""
+		prefix = None
+		if pth_file is not None:
+			if not os.path.isfile(pth_file):
+				return 0
+			prefix = '{}_'.format(file_hash(pth_file=pth_file))
+
+		removed = 0
+		for _, _, pth_entry in self.entries():
+			if prefix and not os.path.basename(pth_entry).startswith(prefix):
+				continue
+			try:
+				os.remove(pth_entry)
+			except OSError:
+				continue
+			removed += 1
+
+		return removed
+
+	def load(self, pth_file, reader_name, read_options, reader):
+		"""
+			Function returns the DataFrame from the cache if available, otherwise it is produced by reader and stored
+		:param str pth_file:  Full path to the workbook
+		:param str reader_name:  Name of the function used to read the workbook
+		:param dict read_options:  Options passed to the function (other than the file path)
+		:param function reader:  Function taking no arguments which reads the workbook
+		:return pd.DataFrame df:
+		"""
+		if not self.enabled or not isinstance(pth_file, str) or not os.path.isfile(pth_file):
+			return reader()
+
+		key = self.key(pth_file=pth_file, reader_name=reader_name, read_options=read_options)
+		df = self.get(key=key)
+		if df is None:
+			df = reader()
+			self.put(key=key, df=df)
+
+		return df
+
+
+# Cache used by the import functions in common_functions
+default_cache = ParsedWorkbookCache(enabled=CACHE_ENABLED)
+
+
+def cached_import(func):
+	"""
+		Decorator which routes an import function through the default cache.  The first argument of the function must
+		be the path to the workbook and all other arguments are used as the read options in the cache key.
+	:param function func:  Function to wrap
+	:return function wrapper:
+	"""
+	signature = inspect.signature(func)
+	pth_arg = list(signature.parameters)[0]
+
+	@functools.wraps(func)
+	def wrapper(*args, **kwargs):
+		bound = signature.bind(*args, **kwargs)
+		bound.apply_defaults()
+		read_options = dict(bound.arguments)
+		pth_file = read_options.pop(pth_arg)
+
+		return default_cache.load(
+			pth_file=pth_file,
+			reader_name=func.__name__,
+			read_options=read_options,
+			reader=lambda: func(*args, **kwargs)
+		)
+
+	return wrapper